@@ -0,0 +1,77 @@
+"""
+Lookup latency of the in-process LRU cache against the SQLite cache
+shared by worker processes.
+
+    python benchmarks/cache_lookup.py [--entries 10000] [--lookups 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from leads_crud.domain.lead import Lead  # noqa: E402
+from leads_crud.infraestructure.cache.lead_cache import LRUTTLCache  # noqa: E402
+from leads_crud.infraestructure.cache.sqlite_cache import SqliteLeadCache  # noqa: E402
+
+
+def make_lead(id: int) -> Lead:
+    return Lead(
+        id=str(id),
+        email=f"lead{id}@example.com",
+        first_name="Ada",
+        last_name="Lovelace",
+        position="Engineer",
+        company="Analytical Engines",
+    )
+
+
+def measure(cache, entries: int, lookups: int, hit_ratio: float):
+    for id in range(entries):
+        cache.set(str(id), make_lead(id))
+    rng = random.Random(0)
+    # Ids past `entries` miss.
+    keys = [str(rng.randrange(int(entries / hit_ratio))) for _ in range(lookups)]
+
+    samples = []
+    for key in keys:
+        started = time.perf_counter_ns()
+        cache.get(key)
+        samples.append(time.perf_counter_ns() - started)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples) / 1000,
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1000,
+        "hit_ratio": cache.stats()["hit_ratio"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--hit-ratio", type=float, default=0.9)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": LRUTTLCache(max_entries=args.entries),
+            "sqlite": SqliteLeadCache(path=os.path.join(directory, "cache.sqlite3"), max_entries=args.entries),
+        }
+        print(f"{'backend':<8} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'hit ratio':>10}")
+        for name, cache in backends.items():
+            result = measure(cache, args.entries, args.lookups, args.hit_ratio)
+            print(
+                f"{name:<8} {result['mean_us']:>9.2f} {result['p50_us']:>9.2f} "
+                f"{result['p99_us']:>9.2f} {result['hit_ratio']:>10.3f}"
+            )
+        backends["sqlite"].db.close()
+
+
+if __name__ == "__main__":
+    main()
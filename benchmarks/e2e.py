@@ -0,0 +1,323 @@
+"""
+End-to-end benchmark of the leads_crud app and the legacy app against the
+fake Hunter API: throughput, latency percentiles and allocations per endpoint.
+
+    python benchmarks/e2e.py [--requests 500] [--concurrency 20] [--apps leads_crud,legacy]
+    python benchmarks/e2e.py --compare benchmarks/results/baseline.json [--threshold 0.1]
+
+Both apps and the fake Hunter run in-process over ASGI transports, so the
+numbers cover routing, validation, the Hunter client and serialization but
+no sockets. Point `--base-url` at a running fake Hunter (`task fake_hunter`)
+to include the upstream network hop. The apps read their usual LEAD_* and
+HUNTER_* variables; the Hunter rate limiter is disabled unless
+HUNTER_RATE_LIMIT_RPS is set.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+os.environ.setdefault("BASE_URL", "http://fake-hunter/v2")
+os.environ.setdefault("API_KEY", "bench")
+os.environ.setdefault("HUNTER_RATE_LIMIT_RPS", "0")
+
+import httpx  # noqa: E402
+
+import api as legacy  # noqa: E402
+from fake_hunter.server import FakeHunter, create_app  # noqa: E402
+from leads_crud.infraestructure.hunter import hunter  # noqa: E402
+from leads_crud.infraestructure.hunter.client import pool  # noqa: E402
+from leads_crud.presentation import endpoints  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+# Lower is better for every metric but throughput.
+COMPARED_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib")
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def make_lead(index: int) -> Dict[str, Any]:
+    return {
+        "email": f"bench{index}@example.com",
+        "first_name": "Ada",
+        "last_name": str(index),
+        "position": "Engineer",
+        "company": "Analytical Engines",
+    }
+
+
+class State:
+    """Lead ids created by the create scenario, used by the ones after it."""
+    def __init__(self):
+        self.ids: List[str] = []
+        self.created = 0
+
+    def id(self, index: int) -> str:
+        return self.ids[index % len(self.ids)]
+
+
+def record_id(state: State, response: httpx.Response):
+    if response.is_success:
+        body = response.json()
+        state.ids.append(str(body.get("data", body)["id"]))
+
+
+def create(state: State, index: int) -> Request:
+    state.created += 1
+    return "post", "/leads", make_lead(state.created)
+
+
+def retrieve(state: State, index: int) -> Request:
+    return "get", f"/leads/{state.id(index)}", None
+
+
+def update(state: State, index: int) -> Request:
+    return "put", f"/leads/{state.id(index)}", {**make_lead(index), "position": f"Engineer {index}"}
+
+
+def multi_get(state: State, index: int) -> Request:
+    ids = ",".join(state.id(index + offset) for offset in range(10))
+    return "get", f"/leads?ids={ids}", None
+
+
+def list_all(state: State, index: int) -> Request:
+    return "get", "/leads?page_size=1000", None
+
+
+def delete(state: State, index: int) -> Request:
+    return "delete", f"/leads/{state.ids.pop()}", None
+
+
+# (endpoint, request builder, response hook); each app runs its scenarios in order.
+SCENARIOS: Dict[str, List[Tuple[str, Callable[[State, int], Request], Optional[Callable]]]] = {
+    "leads_crud": [
+        ("POST /leads", create, record_id),
+        ("GET /leads/{id}", retrieve, None),
+        ("PUT /leads/{id}", update, None),
+        ("GET /leads?ids=", multi_get, None),
+        ("GET /leads", list_all, None),
+        ("DELETE /leads/{id}", delete, None),
+    ],
+    "legacy": [
+        ("POST /leads", create, record_id),
+        ("GET /leads/{id}", retrieve, None),
+        ("PUT /leads/{id}", update, None),
+        ("DELETE /leads/{id}", delete, None),
+    ],
+}
+
+APPS = {
+    "leads_crud": endpoints.app,
+    "legacy": legacy.app,
+}
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def send(client: httpx.AsyncClient, request: Request) -> httpx.Response:
+    method, url, body = request
+    return await client.request(method, url, json=body)
+
+
+async def drive(client: httpx.AsyncClient, state: State, build, hook, requests: int, concurrency: int):
+    """Sends `requests` requests from `concurrency` workers; returns latencies in ns, errors and wall time."""
+    latencies: List[int] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            request = build(state, index)
+            started = time.perf_counter_ns()
+            response = await send(client, request)
+            latencies.append(time.perf_counter_ns() - started)
+            if response.status_code >= 400:
+                errors += 1
+            if hook is not None:
+                hook(state, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def measure_allocations(client: httpx.AsyncClient, state: State, build, hook, requests: int):
+    """Peak and retained traced memory per request, sending one request at a time."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for index in range(requests):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            response = await send(client, build(state, index))
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            if hook is not None:
+                hook(state, response)
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return statistics.fmean(peaks), retained / requests
+
+
+async def bench_app(name: str, args) -> Dict[str, Any]:
+    app = APPS[name]
+    if not args.base_url:
+        fake = FakeHunter(latency=args.hunter_latency, random_seed=0)
+        pool._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(fake)))
+
+    results = {}
+    state = State()
+    async with app.router.lifespan_context(app):
+        # Unhandled exceptions become 500s and count as errors.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint, build, hook in SCENARIOS[name]:
+                for index in range(args.warmup):
+                    response = await send(client, build(state, index))
+                    if hook is not None:
+                        hook(state, response)
+                latencies, errors, elapsed = await drive(
+                    client, state, build, hook, args.requests, args.concurrency,
+                )
+                alloc_peak, alloc_retained = await measure_allocations(
+                    client, state, build, hook, args.alloc_requests,
+                )
+                latencies.sort()
+                results[endpoint] = {
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "throughput_rps": round(len(latencies) / elapsed, 1),
+                    "mean_ms": round(statistics.fmean(latencies) / 1e6, 3),
+                    "p50_ms": round(percentile(latencies, 0.50) / 1e6, 3),
+                    "p95_ms": round(percentile(latencies, 0.95) / 1e6, 3),
+                    "p99_ms": round(percentile(latencies, 0.99) / 1e6, 3),
+                    "max_ms": round(latencies[-1] / 1e6, 3),
+                    "alloc_peak_kib": round(alloc_peak / 1024, 2),
+                    "alloc_retained_kib": round(alloc_retained / 1024, 2),
+                }
+    pool._client = None
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Endpoints whose metrics got worse than `baseline` by more than `threshold` (a fraction)."""
+    regressions = []
+    for app, app_results in results["apps"].items():
+        for endpoint, metrics in app_results.items():
+            before = baseline.get("apps", {}).get(app, {}).get(endpoint)
+            if before is None:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = before.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if metric == "throughput_rps":
+                    change = -change
+                if change > threshold:
+                    regressions.append(f"{app} {endpoint} {metric}: {old} -> {new} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]):
+    print(
+        f"{'app':<11} {'endpoint':<19} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'peak KiB':>9} {'kept KiB':>9}"
+    )
+    for app, app_results in results["apps"].items():
+        for endpoint, m in app_results.items():
+            print(
+                f"{app:<11} {endpoint:<19} {m['throughput_rps']:>9.1f} {m['p50_ms']:>8.2f} {m['p95_ms']:>8.2f} "
+                f"{m['p99_ms']:>8.2f} {m['errors']:>7} {m['alloc_peak_kib']:>9.1f} {m['alloc_retained_kib']:>9.2f}"
+            )
+
+
+async def run(args) -> Dict[str, Any]:
+    if args.base_url:
+        hunter.BASE_URL = legacy.BASE_URL = args.base_url.rstrip("/")
+    apps = {}
+    for name in args.apps.split(","):
+        apps[name] = await bench_app(name, args)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "alloc_requests": args.alloc_requests,
+            "hunter": args.base_url or f"in-process, latency {args.hunter_latency}",
+            "env": {key: value for key, value in sorted(os.environ.items()) if key.startswith(("LEAD_", "HUNTER_"))},
+        },
+        "apps": apps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", default="leads_crud,legacy", help="comma separated, from: " + ", ".join(APPS))
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint")
+    parser.add_argument("--alloc-requests", type=int, default=50, help="sequential requests traced for allocations")
+    parser.add_argument("--hunter-latency", default="constant:0", help="latency spec of the in-process fake Hunter")
+    parser.add_argument("--base-url", help="Hunter base URL of a running fake Hunter, instead of the in-process one")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/e2e-<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated change against the baseline")
+    args = parser.parse_args()
+    unknown = set(args.apps.split(",")) - set(APPS)
+    if unknown:
+        parser.error("unknown apps: " + ", ".join(sorted(unknown)))
+
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, "e2e-" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+        print(f"No regression over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
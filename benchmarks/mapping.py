@@ -0,0 +1,114 @@
+"""
+CPU cost of the lead mapping pipeline of a create request: the previous
+mapping (dump and validate at every step) against the current one
+(validate each object once from a plain dict, cached timestamp). Also
+compares the read path, from the Hunter body to the response bytes,
+through the models against the LEAD_FAST_READS passthrough.
+
+    python benchmarks/mapping.py [--repeat 7] [--number 20000]
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from leads_crud.domain.lead import Lead  # noqa: E402
+from leads_crud.infraestructure.hunter.mappers import HunterMapper  # noqa: E402
+from leads_crud.infraestructure.json_codec import loads  # noqa: E402
+from leads_crud.presentation.mappers import EndpointMapper  # noqa: E402
+from leads_crud.presentation.serializers import LeadInput, LeadOutput  # noqa: E402
+
+FIELDS = {
+    "email": "ada@example.com",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "position": "Engineer",
+    "company": "Analytical Engines",
+}
+# A retrieve answer carries every Hunter lead attribute, most of them unused.
+HUNTER_BODY = json.dumps({"data": {
+    "id": 1, **FIELDS, "website": None, "country_code": None, "company_industry": None,
+    "company_size": None, "linkedin_url": None, "phone_number": None, "twitter": None,
+    "notes": None, "source": None, "sync_status": None, "created_at": "2024-01-01 10:00:00 UTC",
+    "leads_list": {"id": 1, "name": "My leads", "leads_count": 3},
+}, "meta": {}}).encode()
+# What FastAPI does with a response_model return value.
+output_adapter = TypeAdapter(LeadOutput)
+
+
+# The previous mapping, kept here as the reference.
+def previous_to_entity(input: LeadInput) -> Lead:
+    lead = Lead.model_validate(input.model_dump())
+    if all(value is None for value in lead.model_dump().values()):
+        raise ValueError("All fields are None")
+    return lead
+
+
+def previous_to_client(lead: Lead) -> LeadOutput:
+    output = LeadOutput.model_validate(lead.model_dump())
+    output.datetime = datetime.now().strftime("%d/%m/%Y, %H:%M:%S")
+    return output
+
+
+# Without the metrics and tracing decorators, which are measured separately.
+current_to_entity = inspect.unwrap(EndpointMapper.to_entity)
+current_to_client = inspect.unwrap(EndpointMapper.to_client)
+current_to_entity_hunter = inspect.unwrap(HunterMapper.to_entity)
+current_to_fields = inspect.unwrap(HunterMapper.to_fields)
+current_to_client_json = inspect.unwrap(EndpointMapper.to_client_json)
+
+
+def read_through_models() -> bytes:
+    lead = current_to_entity_hunter(json.loads(HUNTER_BODY))
+    return output_adapter.dump_json(output_adapter.validate_python(current_to_client(lead)))
+
+
+def read_passthrough() -> bytes:
+    return current_to_client_json(current_to_fields(loads(HUNTER_BODY)))
+
+
+def measure(fn, repeat: int, number: int) -> float:
+    """Best time per call in microseconds."""
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    input = LeadInput(**FIELDS)
+    lead = Lead(id="1", **FIELDS)
+    steps = {
+        "EndpointMapper.to_entity": (lambda: previous_to_entity(input), lambda: current_to_entity(input)),
+        "EndpointMapper.to_client": (lambda: previous_to_client(lead), lambda: current_to_client(lead)),
+    }
+
+    print(f"{'step':<26} {'previous us':>12} {'current us':>11} {'speedup':>8}")
+    total_previous = total_current = 0.0
+    for name, (previous, current) in steps.items():
+        before = measure(previous, args.repeat, args.number)
+        after = measure(current, args.repeat, args.number)
+        total_previous += before
+        total_current += after
+        print(f"{name:<26} {before:>12.2f} {after:>11.2f} {before / after:>7.1f}x")
+    print(f"{'mapping per create':<26} {total_previous:>12.2f} {total_current:>11.2f} {total_previous / total_current:>7.1f}x")
+
+    models = measure(read_through_models, args.repeat, args.number)
+    passthrough = measure(read_passthrough, args.repeat, args.number)
+    print(f"{'read response':<26} {models:>12.2f} {passthrough:>11.2f} {models / passthrough:>7.1f}x")
+
+    instrumented = measure(lambda: EndpointMapper.to_client(lead), args.repeat, args.number)
+    print(f"\nto_client with metrics and tracing decorators: {instrumented:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,6 @@ sys.path.insert(0, project_root)
 # Optional: Also add src directory if your modules are in a src folder
 src_path = os.path.join(project_root, 'src')
 sys.path.insert(0, src_path)
+
+# Jobs of the app under test must not outlive the test run.
+os.environ.setdefault('LEAD_JOB_STORE_PATH', ':memory:')
@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
+
 import httpx
 from decouple import config
 from fastapi import Body, FastAPI, HTTPException, Path
 from pydantic import BaseModel
 
-BASE_URL = "https://api.hunter.io/v2"
+from leads_crud.infraestructure.hunter.client import pool
+
+BASE_URL = config("BASE_URL", default="https://api.hunter.io/v2")
+API_KEY = config("API_KEY")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool.open()
+    yield
+    await pool.close()
+
 
 app = FastAPI(
     title="Hunter.io API Integration",
     description="API service for email discovery and verification using Hunter.io",
     version="1.0.0",
     docs_url="/docs",  # Custom docs URL
+    lifespan=lifespan,
 )
 
 class Lead(BaseModel):
@@ -25,7 +39,9 @@ def validated_response(response : httpx.Response):
             status_code=response.status_code,
             detail= response.json()['details']
         )
-
+    # Hunter answers updates and deletes with an empty 204.
+    if response.status_code == 204:
+        return None
     return response.json()
 
 def parse_lead(lead:Lead):
@@ -33,24 +49,17 @@ def parse_lead(lead:Lead):
     return data
 
 
-def call_hunter(method:str ,url:str, **kwargs):
-    if(method=="get"):
-        return httpx.get(url, **kwargs)
-    elif(method=="post"):
-        return httpx.post(url, **kwargs)
-    elif(method=="put"):
-        return httpx.put(url, **kwargs)
-    elif(method=="delete"):
-        return httpx.delete(url, **kwargs)
-    else:
+async def call_hunter(method:str ,url:str, **kwargs) -> httpx.Response:
+    if method not in ("get", "post", "put", "delete"):
         raise Exception("Invalid http method")
+    return await pool.request(method, url, **kwargs)
 
 
 @app.post("/leads",
     description = "Create new lead",
 )
 
-def create_lead(
+async def create_lead(
     lead : Lead= Body(
         title="Fields of the lead",
         examples={
@@ -62,11 +71,11 @@ def create_lead(
         }
     ),
 ):
-    response = call_hunter(
+    response = await call_hunter(
         "post",
         BASE_URL+"/leads",
         json=parse_lead(lead),
-        headers={"X-API-KEY" : config("API_KEY")}
+        headers={"X-API-KEY" : API_KEY}
     )
     return validated_response(response)
 
@@ -75,16 +84,16 @@ def create_lead(
     "/leads/{id}" ,
     description="Retrieves all the fields of a lead"
 )
-def retrieve_lead(
+async def retrieve_lead(
     id:int = Path(
         title="lead id",
         gt=0
     ),
 ):
-    response = call_hunter(
+    response = await call_hunter(
         "get",
         BASE_URL+"/leads/"+str(id),
-        headers={"X-API-KEY" : config("API_KEY")}
+        headers={"X-API-KEY" : API_KEY}
     )
     return validated_response(response)
 
@@ -93,7 +102,7 @@ def retrieve_lead(
     "/leads/{id}",
     description = "Modify specified fields of a lead",
 )
-def update_lead(
+async def update_lead(
     id:int = Path(
         title="lead id",
         gt=0
@@ -109,11 +118,11 @@ def update_lead(
         }
     ),
 ):
-    response = call_hunter(
+    response = await call_hunter(
         "put",
         BASE_URL+"/leads/"+str(id),
         json=parse_lead(lead),
-        headers={"X-API-KEY" : config("API_KEY")}
+        headers={"X-API-KEY" : API_KEY}
     )
     return validated_response(response)
 
@@ -122,24 +131,15 @@ def update_lead(
     "/leads/{id}",
     description = "Modify specified fields of a lead"
 )
-def delete_lead(
+async def delete_lead(
     id:int = Path(
         title="lead id",
         gt=0
     ),
 ):
-    response = call_hunter(
+    response = await call_hunter(
         "delete",
         BASE_URL+"/leads/"+str(id),
-        headers={"X-API-KEY" : config("API_KEY")}
+        headers={"X-API-KEY" : API_KEY}
     )
     return validated_response(response)
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,247 @@
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from decouple import config
+from fastapi import APIRouter, Body, Depends, FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+# Latency spec: constant:<s> | uniform:<min>:<max> | exponential:<mean> | lognormal:<median>:<sigma>
+LATENCY = config("FAKE_HUNTER_LATENCY", default="constant:0")
+ERROR_RATE = config("FAKE_HUNTER_ERROR_RATE", default=0.0, cast=float)
+THROTTLE_RATE = config("FAKE_HUNTER_THROTTLE_RATE", default=0.0, cast=float)
+RATE_LIMIT_RPS = config("FAKE_HUNTER_RATE_LIMIT_RPS", default=0.0, cast=float)
+RATE_LIMIT_BURST = config("FAKE_HUNTER_RATE_LIMIT_BURST", default=10, cast=int)
+RETRY_AFTER = config("FAKE_HUNTER_RETRY_AFTER", default=1.0, cast=float)
+SEED_LEADS = config("FAKE_HUNTER_SEED_LEADS", default=0, cast=int)
+RANDOM_SEED = config("FAKE_HUNTER_RANDOM_SEED", default=0, cast=int)
+API_KEY = config("FAKE_HUNTER_API_KEY", default="")
+
+LEAD_FIELDS = ("email", "first_name", "last_name", "position", "company")
+MAX_PAGE_SIZE = 1000
+MAX_KEPT_SPANS = 10000
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler of response delays in seconds described by `spec`."""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+    if kind == "constant" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec {spec!r}")
+
+
+def hunter_error(status_code: int, id: str, details: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"errors": [{"id": id, "code": status_code, "details": details}]},
+        headers=headers,
+    )
+
+
+class FakeHunter:
+    """
+    In-memory stand-in for the leads endpoints of the Hunter API.
+    Every request is delayed by a sample of `latency`; it then fails with a
+    500 with probability `error_rate` and with a 429 with probability
+    `throttle_rate`. With `rate_limit_rps`, requests beyond the token bucket
+    also get a 429, and every response carries X-RateLimit-* headers.
+    Random draws come from a seeded generator, so a run can be replayed.
+    """
+    def __init__(
+        self,
+        latency: str = LATENCY,
+        error_rate: float = ERROR_RATE,
+        throttle_rate: float = THROTTLE_RATE,
+        rate_limit_rps: float = RATE_LIMIT_RPS,
+        rate_limit_burst: int = RATE_LIMIT_BURST,
+        retry_after: float = RETRY_AFTER,
+        seed_leads: int = SEED_LEADS,
+        random_seed: int = RANDOM_SEED,
+        api_key: str = API_KEY,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit_rps = rate_limit_rps
+        self.rate_limit_burst = max(1, rate_limit_burst)
+        self.retry_after = retry_after
+        self.api_key = api_key
+        self.rng = random.Random(random_seed)
+        self._clock = clock
+        self._tokens = float(self.rate_limit_burst)
+        self._refilled_at = clock()
+        self.leads: Dict[int, Dict[str, Any]] = {}
+        self.next_id = 1
+        self.counters = {"requests": 0, "traced": 0, "errors": 0, "throttled": 0, "unauthorized": 0}
+        # Spans received on the OTLP endpoint, newest last.
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=MAX_KEPT_SPANS)
+        for index in range(seed_leads):
+            self.add_lead({
+                "email": f"lead{index}@example.com",
+                "first_name": "Lead",
+                "last_name": str(index),
+                "position": "Engineer",
+                "company": "Example",
+            })
+
+    def add_lead(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        lead = {"id": self.next_id, **{field: fields.get(field) for field in LEAD_FIELDS}}
+        self.leads[self.next_id] = lead
+        self.next_id += 1
+        return lead
+
+    async def admit(self, request: Request) -> Optional[Response]:
+        """Applies latency and fault injection; returns the response replacing the real one, if any."""
+        self.counters["requests"] += 1
+        if "traceparent" in request.headers:
+            self.counters["traced"] += 1
+        key = request.headers.get("x-api-key") or request.query_params.get("api_key")
+        if not key or (self.api_key and key != self.api_key):
+            self.counters["unauthorized"] += 1
+            return hunter_error(401, "authentication_failed", "No user found for the API key supplied")
+
+        delay = self.latency(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.rate_limit_rps and not self._take_token():
+            self.counters["throttled"] += 1
+            return hunter_error(429, "too_many_requests", "You have reached the rate limit", self._throttle_headers())
+        if self.throttle_rate and self.rng.random() < self.throttle_rate:
+            self.counters["throttled"] += 1
+            return hunter_error(429, "too_many_requests", "You have reached the rate limit", self._throttle_headers())
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.counters["errors"] += 1
+            return hunter_error(500, "internal_error", "Something went wrong on our side")
+        return None
+
+    def rate_limit_headers(self) -> Dict[str, str]:
+        if not self.rate_limit_rps:
+            return {}
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit_burst),
+            "X-RateLimit-Remaining": str(int(self._tokens)),
+        }
+
+    def _throttle_headers(self) -> Dict[str, str]:
+        return {**self.rate_limit_headers(), "Retry-After": f"{self.retry_after:g}"}
+
+    def _take_token(self) -> bool:
+        now = self._clock()
+        self._tokens = min(
+            float(self.rate_limit_burst),
+            self._tokens + (now - self._refilled_at) * self.rate_limit_rps,
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def get_hunter(request: Request) -> FakeHunter:
+    return request.app.state.hunter
+
+
+router = APIRouter()
+
+
+async def inject_faults(request: Request, call_next):
+    if request.url.path.startswith("/v2/"):
+        hunter = get_hunter(request)
+        response = await hunter.admit(request)
+        if response is None:
+            response = await call_next(request)
+            response.headers.update(hunter.rate_limit_headers())
+        return response
+    return await call_next(request)
+
+
+@router.post("/v2/leads", status_code=201)
+async def create(fields: Dict[str, Any] = Body(default={}), hunter: FakeHunter = Depends(get_hunter)):
+    if not fields.get("email"):
+        return hunter_error(400, "wrong_params", "You are missing the email parameter")
+    return {"data": hunter.add_lead(fields)}
+
+
+@router.get("/v2/leads")
+async def list_leads(
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=MAX_PAGE_SIZE),
+    hunter: FakeHunter = Depends(get_hunter),
+):
+    leads = list(hunter.leads.values())
+    return {
+        "data": {"leads": leads[offset:offset + limit]},
+        "meta": {
+            "count": len(leads[offset:offset + limit]),
+            "total": len(leads),
+            "params": {"offset": offset, "limit": limit},
+        },
+    }
+
+
+@router.get("/v2/leads/{id}")
+async def retrieve(id: int, hunter: FakeHunter = Depends(get_hunter)):
+    if id not in hunter.leads:
+        return hunter_error(404, "not_found", "This lead does not exist")
+    return {"data": hunter.leads[id]}
+
+
+@router.put("/v2/leads/{id}")
+async def update(id: int, fields: Dict[str, Any] = Body(default={}), hunter: FakeHunter = Depends(get_hunter)):
+    if id not in hunter.leads:
+        return hunter_error(404, "not_found", "This lead does not exist")
+    hunter.leads[id].update({field: fields[field] for field in LEAD_FIELDS if field in fields})
+    return Response(status_code=204)
+
+
+@router.delete("/v2/leads/{id}")
+async def delete(id: int, hunter: FakeHunter = Depends(get_hunter)):
+    if hunter.leads.pop(id, None) is None:
+        return hunter_error(404, "not_found", "This lead does not exist")
+    return Response(status_code=204)
+
+
+@router.post("/v1/traces")
+async def receive_traces(export: Dict[str, Any] = Body(default={}), hunter: FakeHunter = Depends(get_hunter)):
+    """OTLP/HTTP JSON trace receiver, so the lead API can export spans here."""
+    for resource in export.get("resourceSpans", []):
+        for scope in resource.get("scopeSpans", []):
+            hunter.spans.extend(scope.get("spans", []))
+    return {}
+
+
+@router.get("/_fake/traces")
+async def traces(trace_id: Optional[str] = None, hunter: FakeHunter = Depends(get_hunter)) -> List[Dict[str, Any]]:
+    return [span for span in hunter.spans if trace_id is None or span.get("traceId") == trace_id]
+
+
+@router.get("/_fake/stats")
+async def stats(hunter: FakeHunter = Depends(get_hunter)):
+    return {**hunter.counters, "leads": len(hunter.leads), "spans": len(hunter.spans)}
+
+
+def create_app(hunter: Optional[FakeHunter] = None) -> FastAPI:
+    app = FastAPI(
+        title="Fake Hunter API",
+        description="Local stand-in for the Hunter leads API, for tests and benchmarks",
+    )
+    app.state.hunter = hunter if hunter is not None else FakeHunter()
+    app.middleware("http")(inject_faults)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional
+
+from decouple import config
+
+from leads_crud.domain.lead import Lead
+from leads_crud.domain.repositories import ILeadCRUD
+
+logger = logging.getLogger(__name__)
+
+WRITE_COALESCE_WINDOW = config("LEAD_WRITE_COALESCE_WINDOW", default=0.0, cast=float)
+SKIP_NOOP_UPDATES = config("LEAD_SKIP_NOOP_UPDATES", default=False, cast=bool)
+
+
+def changed_fields(known: Optional[Lead], lead: Lead) -> Lead:
+    """The fields set in `lead` that differ from `known`, as a partial lead."""
+    fields = lead.model_dump(exclude={"id"}, exclude_none=True)
+    if known is not None:
+        fields = {field: value for field, value in fields.items() if getattr(known, field) != value}
+    return Lead(**fields)
+
+
+class _Batch:
+    __slots__ = ("id", "lead", "updates", "due", "task")
+
+    def __init__(self, id, lead: Lead):
+        self.id = id
+        self.lead = lead
+        self.updates = 1
+        self.due = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def merge(self, lead: Lead):
+        self.lead = self.lead.model_copy(update=lead.model_dump(exclude_none=True))
+        self.updates += 1
+
+
+class WriteCoalescer:
+    """
+    Write-behind buffer merging partial updates of the same lead.
+    The first update of a lead opens a batch that is sent upstream `window`
+    seconds later; updates arriving meanwhile are merged into it, later
+    non-None fields winning. Batches of a lead are sent one at a time and in
+    order, so updates made while a batch is being sent land in the next one.
+    Failed batches are logged and counted, their callers already got a reply.
+    A `window` of 0 disables buffering: updates are sent right away.
+
+    With `skip_noop`, updates are first compared with the state the
+    repository holds locally (see `ILeadCRUD.peek`) overlaid with the
+    pending batch: only the fields that change are sent, and an update that
+    changes nothing is dropped.
+    """
+    def __init__(
+        self,
+        repo: ILeadCRUD,
+        window: float = WRITE_COALESCE_WINDOW,
+        skip_noop: bool = SKIP_NOOP_UPDATES,
+    ):
+        self.repo = repo
+        self.window = window
+        self.skip_noop = skip_noop
+        self.closed = False
+        self._pending: Dict[str, _Batch] = {}
+        self._tails: Dict[str, asyncio.Task] = {}
+        self._sending: Dict[str, int] = {}
+        self.submitted = 0
+        self.merged = 0
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.trimmed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and not self.closed
+
+    async def update(self, id, lead: Lead) -> bool:
+        """Applies or buffers an update; returns whether it was deferred."""
+        key = str(id)
+        if self.skip_noop:
+            changes = changed_fields(self._known(key, id), lead)
+            if changes == Lead():
+                self.skipped += 1
+                return False
+            if changes != changed_fields(None, lead):
+                self.trimmed += 1
+            lead = changes
+
+        if not self.enabled:
+            with self._in_flight(key):
+                await self.repo.update(id, lead)
+            return False
+
+        self.submitted += 1
+        batch = self._pending.get(key)
+        if batch is not None:
+            batch.merge(lead)
+            self.merged += 1
+            return True
+
+        batch = self._pending[key] = _Batch(id, lead)
+        previous = self._tails.get(key)
+        batch.task = asyncio.get_running_loop().create_task(self._send(key, batch, previous))
+        self._tails[key] = batch.task
+        batch.task.add_done_callback(lambda task: self._finish(key, task))
+        return True
+
+    async def flush(self, ids: Optional[Iterable] = None):
+        """
+        Sends the buffered updates of `ids` (every lead when None) without
+        waiting for their window, and waits until they are applied.
+        """
+        keys = list(self._tails) if ids is None else [str(id) for id in ids]
+        tails = []
+        for key in keys:
+            batch = self._pending.get(key)
+            if batch is not None:
+                batch.due.set()
+            tail = self._tails.get(key)
+            if tail is not None:
+                tails.append(tail)
+        if tails:
+            await asyncio.wait(tails)
+
+    async def close(self):
+        """Stops buffering and sends everything still pending."""
+        self.closed = True
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "merged": self.merged,
+            "sent": self.sent,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "trimmed": self.trimmed,
+        }
+
+    def _known(self, key: str, id) -> Optional[Lead]:
+        # An update being sent is not reflected by the repository yet.
+        if self._sending.get(key):
+            return None
+        known = self.repo.peek(id)
+        batch = self._pending.get(key)
+        if batch is not None:
+            base = known or Lead()
+            known = base.model_copy(update=batch.lead.model_dump(exclude_none=True))
+        return known
+
+    async def _send(self, key: str, batch: _Batch, previous: Optional[asyncio.Task]):
+        try:
+            await asyncio.wait_for(batch.due.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        with self._in_flight(key):
+            try:
+                if previous is not None:
+                    await asyncio.wait([previous])
+                await self.repo.update(batch.id, batch.lead)
+                self.sent += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Coalesced update of lead %s (%d updates) failed", key, batch.updates)
+
+    @contextmanager
+    def _in_flight(self, key: str):
+        """Counts an update of `key` being sent upstream."""
+        self._sending[key] = self._sending.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            self._sending[key] -= 1
+            if not self._sending[key]:
+                del self._sending[key]
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._tails.get(key) is task:
+            del self._tails[key]
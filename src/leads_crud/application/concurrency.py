@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(
+    items: Iterable[T],
+    fn: Callable[[T], Awaitable[Any]],
+    limit: int,
+) -> List[Any]:
+    """
+    Applies `fn` to every item with at most `limit` calls in flight.
+    Results keep the order of `items`; a failing call yields its exception
+    in place of a result instead of aborting the others.
+    """
+    items = list(items)
+    results: List[Any] = [None] * len(items)
+    pending = iter(enumerate(items))
+
+    async def worker():
+        for index, item in pending:
+            try:
+                results[index] = await fn(item)
+            except Exception as exc:
+                results[index] = exc
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(limit, len(items))))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    return results
+
+
+_INPUT_DONE = object()
+
+
+async def map_unordered(
+    items: AsyncIterable[T],
+    fn: Callable[[T], Awaitable[Any]],
+    limit: int,
+) -> AsyncIterator[Tuple[T, Any]]:
+    """
+    Applies `fn` to items of an async iterable and yields `(item, result)`
+    pairs as soon as each call completes; a failing call yields its exception.
+    Items are pulled from the input only while fewer than `limit` results
+    are running or waiting to be consumed, so memory stays bounded however
+    long the input is.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(limit)
+    tasks = set()
+    outstanding = 0
+
+    async def run(item):
+        try:
+            result = await fn(item)
+        except Exception as exc:
+            result = exc
+        results.put_nowait((item, result))
+
+    async def produce():
+        nonlocal outstanding
+        try:
+            async for item in items:
+                await slots.acquire()
+                outstanding += 1
+                task = asyncio.create_task(run(item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            results.put_nowait(_INPUT_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        input_done = False
+        while not input_done or outstanding:
+            entry = await results.get()
+            if entry is _INPUT_DONE:
+                input_done = True
+                continue
+            outstanding -= 1
+            slots.release()
+            yield entry
+        # Surfaces errors raised while reading the input.
+        await producer
+    finally:
+        producer.cancel()
+        for task in list(tasks):
+            task.cancel()
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from decouple import config
+
+from leads_crud.application.concurrency import map_unordered
+from leads_crud.domain.job import COMPLETED, FAILED, SUCCEEDED, Job, JobItem
+from leads_crud.domain.repositories import IJobStore
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = config("LEAD_JOB_WORKERS", default=2, cast=int)
+JOB_CONCURRENCY = config("LEAD_JOB_CONCURRENCY", default=20, cast=int)
+JOB_CHECKPOINT_EVERY = config("LEAD_JOB_CHECKPOINT_EVERY", default=100, cast=int)
+JOB_LEASE_SECONDS = config("LEAD_JOB_LEASE_SECONDS", default=30.0, cast=float)
+JOB_RETENTION_SECONDS = config("LEAD_JOB_RETENTION_SECONDS", default=86400.0, cast=float)
+
+
+class ItemJob:
+    """
+    A job applying `fn` to each of its items; the value returned for an
+    item is stored as its result.
+    """
+    def __init__(self, fn: Callable[[Any], Awaitable[Any]]):
+        self.fn = fn
+
+
+class TaskJob:
+    """
+    A job running `fn(job, progress)` once. `fn` reports progress by calling
+    `progress(count)` and returns the location of its output. `discard(job)`
+    removes that output once the job expires.
+    """
+    def __init__(
+        self,
+        fn: Callable[[Job, Callable[[int], None]], Awaitable[Optional[str]]],
+        discard: Optional[Callable[[Job], None]] = None,
+    ):
+        self.fn = fn
+        self.discard = discard
+
+
+class JobRunner:
+    """
+    Runs jobs in the background on `workers` workers, each job applying its
+    handler to at most `concurrency` items at a time.
+    Item outcomes are checkpointed to the store every `checkpoint_every`
+    items. Jobs left queued or running by a previous process are resumed
+    on start with the items that had no outcome yet, so an item may run
+    twice if the process stopped while it was in flight.
+    A job is claimed in the store before it runs, so runners sharing a store
+    never run it twice at once. Claims are leases renewed every third of
+    `lease` seconds; the jobs of a runner that stopped without handing them
+    back are picked up by the others once their lease expires.
+    Finished jobs are deleted, with the output of their task, `retention`
+    seconds after they finished.
+    """
+    def __init__(
+        self,
+        store: IJobStore,
+        handlers: Dict[str, Any],
+        describe_error: Callable[[Exception], Dict[str, Any]],
+        workers: int = JOB_WORKERS,
+        concurrency: int = JOB_CONCURRENCY,
+        checkpoint_every: int = JOB_CHECKPOINT_EVERY,
+        lease: float = JOB_LEASE_SECONDS,
+        retention: float = JOB_RETENTION_SECONDS,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.describe_error = describe_error
+        self.workers = max(1, workers)
+        self.concurrency = max(1, concurrency)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.lease = lease
+        self.retention = retention
+        self.owner = uuid.uuid4().hex
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+
+    def submit(self, kind: str, payloads: Iterable[Any] = (), params: Optional[Dict[str, Any]] = None) -> Job:
+        payloads = list(payloads)
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=params or {},
+            total=len(payloads),
+            created_at=time.time(),
+        )
+        self.store.create(job, payloads)
+        self._enqueue(job.id)
+        return job
+
+    def get(self, id: str) -> Optional[Job]:
+        return self.store.get(id)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._expire()
+        for id in self.store.claimable():
+            self._enqueue(id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+
+    async def close(self):
+        """Stops the workers and queues the jobs they were running again, to be resumed by any runner."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.store.release(self.owner)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self._tasks else 0,
+            "owner": self.owner,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+        }
+
+    def _enqueue(self, id: str):
+        if self._queue is not None and id not in self._queued:
+            self._queued.add(id)
+            self._queue.put_nowait(id)
+
+    async def _keep_leases(self):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            # A failed round, e.g. a locked store, must not stop the renewals.
+            try:
+                self.store.renew(self.owner, time.time() + self.lease)
+                # Jobs submitted to other runners, or left by runners that stopped.
+                for id in self.store.claimable():
+                    self._enqueue(id)
+                self._expire()
+            except Exception:
+                logger.exception("Job lease renewal failed")
+
+    def _expire(self):
+        for job in self.store.expire(time.time() - self.retention):
+            handler = self.handlers.get(job.kind)
+            if isinstance(handler, TaskJob) and handler.discard is not None:
+                try:
+                    handler.discard(job)
+                except Exception:
+                    logger.exception("Could not discard the output of job %s (%s)", job.id, job.kind)
+
+    async def _work(self):
+        while True:
+            id = await self._queue.get()
+            self._queued.discard(id)
+            job = self.store.claim(id, self.owner, time.time() + self.lease)
+            if job is None:
+                continue
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+
+    async def _run(self, job: Job):
+        try:
+            handler = self.handlers[job.kind]
+            if isinstance(handler, ItemJob):
+                await self._run_items(job, handler)
+            else:
+                # A task starts over when resumed, and so does its progress.
+                self.store.advance(job.id, -self.store.get(job.id).succeeded)
+                job.result = await handler.fn(job, lambda count: self.store.advance(job.id, count))
+            job.status = COMPLETED
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = FAILED
+            job.error = self.describe_error(exc)
+        job.finished_at = time.time()
+        self.store.save(job)
+
+    async def _run_items(self, job: Job, handler: ItemJob):
+        async def pending():
+            for item in self.store.pending_items(job.id):
+                yield item
+
+        async def run(item: JobItem):
+            return await handler.fn(item.payload)
+
+        outcomes: List[JobItem] = []
+        try:
+            async for item, result in map_unordered(pending(), run, self.concurrency):
+                if isinstance(result, Exception):
+                    outcomes.append(JobItem(index=item.index, status=FAILED, error=self.describe_error(result)))
+                else:
+                    outcomes.append(JobItem(index=item.index, status=SUCCEEDED, result=result))
+                if len(outcomes) >= self.checkpoint_every:
+                    self.store.record(job.id, outcomes)
+                    outcomes = []
+        finally:
+            if outcomes:
+                self.store.record(job.id, outcomes)
@@ -1,35 +1,157 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import inject
+
 from base_lead_crud.service import BaseLeadService
+from leads_crud.application.coalescing import WriteCoalescer
+from leads_crud.application.concurrency import gather_bounded
 from leads_crud.domain.lead import Lead
+from leads_crud.infraestructure.tracing import traced
 
 
 class CreateLeadService(BaseLeadService):
+    @traced()
     def __init__(self):
         super().__init__()
 
+    @traced()
     async def execute(self, lead: Lead) -> Lead:
         return await self.repo_instance.create(lead)
 
 
+class BulkCreateLeadService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+    @traced()
+    async def execute(self, leads: List[Lead], concurrency: int) -> List[Union[Lead, Exception]]:
+        return await gather_bounded(leads, self.repo_instance.create, concurrency)
+
+
 class RetrieveLeadService(BaseLeadService):
+    @traced()
     def __init__(self):
         super().__init__()
 
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
     async def execute(self, id: int) -> Lead:
+        # Buffered updates are applied first so a read sees its own writes.
+        await self.writes.flush([id])
         return await self.repo_instance.retrieve(id)
 
 
+class RetrieveLeadFieldsService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
+    async def execute(self, id: int) -> Dict[str, Any]:
+        """The lead as a plain dict, built straight from the Hunter answer on a miss."""
+        await self.writes.flush([id])
+        return await self.repo_instance.retrieve_fields(id)
+
+
+class PeekLeadService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
+    async def execute(self, id: int) -> Optional[Lead]:
+        """The lead as known locally (cache or mirror), None when only Hunter knows it."""
+        await self.writes.flush([id])
+        return self.repo_instance.peek(id)
+
+
+class RetrieveManyLeadsService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
+    async def execute(self, ids: List[int]) -> Dict[int, Union[Lead, Exception]]:
+        await self.writes.flush(ids)
+        return await self.repo_instance.retrieve_many(ids)
+
+
+class ListLeadsService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+    async def execute(self, page_size: int) -> AsyncIterator[List[Lead]]:
+        async for page in self.repo_instance.list(page_size):
+            yield page
+
+
+class SearchLeadsService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+    @traced()
+    async def execute(
+        self,
+        email: Optional[str],
+        company: Optional[str],
+        position: Optional[str],
+        text: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[Lead]:
+        return await self.repo_instance.search(
+            email=email,
+            company=company,
+            position=position,
+            text=text,
+            limit=limit,
+            offset=offset,
+        )
+
+
 class UpdateLeadService(BaseLeadService):
+    @traced()
     def __init__(self):
         super().__init__()
 
-    async def execute(self, id: int, lead: Lead):
-        await self.repo_instance.update(id, lead)
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
+    async def execute(self, id: int, lead: Lead) -> bool:
+        """Returns whether the update was buffered rather than applied."""
+        return await self.writes.update(id, lead)
 
 
 class DeleteLeadService(BaseLeadService):
+    @traced()
     def __init__(self):
         super().__init__()
 
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
     async def execute(self, id: int):
+        await self.writes.flush([id])
         await self.repo_instance.delete(id)
 
+
+class RepositoryStatsService(BaseLeadService):
+    @traced()
+    def __init__(self):
+        super().__init__()
+
+        self.writes = inject.instance(WriteCoalescer)
+
+    @traced()
+    async def execute(self) -> Dict[str, Any]:
+        return {**self.repo_instance.stats(), "write_coalescing": self.writes.stats()}
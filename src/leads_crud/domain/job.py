@@ -0,0 +1,34 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+PENDING = "pending"
+SUCCEEDED = "succeeded"
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str = QUEUED
+    params: Dict[str, Any] = {}
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    result: Optional[str] = None
+    error: Optional[Dict[str, Any]] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobItem(BaseModel):
+    index: int
+    status: str = PENDING
+    payload: Any = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
@@ -1,3 +1,6 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from leads_crud.domain.job import Job, JobItem
 from leads_crud.domain.lead import Lead
 
 
@@ -6,7 +9,62 @@ class ILeadCRUD:
         pass
     def retrieve(id : int) -> Lead:
         pass
+    async def retrieve_fields(self, id : int) -> Dict[str, Any]:
+        # The fields of a lead as a plain dict; overridden where they are
+        # available without building a Lead.
+        return dict((await self.retrieve(id)).__dict__)
+    def retrieve_many(self, ids : List[int]) -> Dict[int, Union[Lead, Exception]]:
+        pass
     def update(id : int, lead : Lead):
         pass
     def delete(id : int):
         pass
+    def list(self, page_size : int) -> AsyncIterator[List[Lead]]:
+        pass
+    def peek(self, id : int) -> Optional[Lead]:
+        return None
+    async def search(
+        self,
+        email : Optional[str] = None,
+        company : Optional[str] = None,
+        position : Optional[str] = None,
+        text : Optional[str] = None,
+        limit : int = 100,
+        offset : int = 0,
+    ) -> List[Lead]:
+        pass
+    def stats(self) -> Dict[str, Any]:
+        return {}
+    async def start(self):
+        pass
+    async def close(self):
+        pass
+
+
+class IJobStore:
+    def create(self, job : Job, payloads : List[Any]):
+        pass
+    def get(self, id : str) -> Optional[Job]:
+        pass
+    def save(self, job : Job):
+        pass
+    def advance(self, id : str, succeeded : int):
+        pass
+    def record(self, id : str, outcomes : List[JobItem]):
+        pass
+    def pending_items(self, id : str) -> List[JobItem]:
+        pass
+    def items(self, id : str, status : Optional[str] = None, offset : int = 0, limit : int = 100) -> List[JobItem]:
+        pass
+    def expire(self, before : float) -> List[Job]:
+        pass
+    def claimable(self) -> List[str]:
+        pass
+    def claim(self, id : str, owner : str, lease_until : float) -> Optional[Job]:
+        pass
+    def renew(self, owner : str, lease_until : float):
+        pass
+    def release(self, owner : str):
+        pass
+    def close(self):
+        pass
@@ -0,0 +1,257 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from decouple import config
+from fastapi import HTTPException
+
+from leads_crud.domain.lead import Lead
+from leads_crud.domain.repositories import ILeadCRUD
+
+CACHE_ENABLED = config("LEAD_CACHE_ENABLED", default=False, cast=bool)
+CACHE_MAX_ENTRIES = config("LEAD_CACHE_MAX_ENTRIES", default=10000, cast=int)
+CACHE_TTL = config("LEAD_CACHE_TTL", default=30.0, cast=float)
+CACHE_STALE_TTL = config("LEAD_CACHE_STALE_TTL", default=300.0, cast=float)
+CACHE_BACKEND = config("LEAD_CACHE_BACKEND", default="memory")
+
+
+class _Entry:
+    __slots__ = ("lead", "fresh_until", "stale_until")
+
+    def __init__(self, lead: Lead, fresh_until: float, stale_until: float):
+        self.lead = lead
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class LRUTTLCache:
+    """
+    Bounded LRU map of lead ids to leads with a per-entry time to live.
+    Entries past their TTL keep being served as stale until `stale_ttl`
+    seconds later, after which they are dropped.
+    """
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        stale_ttl: float = CACHE_STALE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Optional[Lead], bool]:
+        """Returns the cached lead (or None) and whether it is stale."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+
+        now = self._clock()
+        if now >= entry.stale_until:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        if now >= entry.fresh_until:
+            self.stale_hits += 1
+            return entry.lead, True
+        self.hits += 1
+        return entry.lead, False
+
+    def peek(self, key: str) -> Optional[Lead]:
+        """Returns the lead if it is cached and fresh, without counting a lookup."""
+        entry = self._entries.get(key)
+        if entry is None or self._clock() >= entry.fresh_until:
+            return None
+        return entry.lead
+
+    def set(self, key: str, lead: Lead, since: Optional[float] = None):
+        # `since` matters to caches shared across processes only; in process,
+        # CachedLeadCrud already drops reads that raced an invalidation.
+        now = self._clock()
+        self._entries[key] = _Entry(lead, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+class CachedLeadCrud(ILeadCRUD):
+    """
+    Read-through cache around any ILeadCRUD.
+    Fresh entries are served directly, stale entries are served while a
+    background refresh fetches the current version. Writes invalidate.
+    """
+    def __init__(self, inner: ILeadCRUD, cache: Optional[Any] = None):
+        self.inner = inner
+        self.cache = cache if cache is not None else LRUTTLCache()
+        self.refreshes = 0
+        self.refresh_errors = 0
+        # Keys with an upstream read in flight, and those of them invalidated
+        # meanwhile: their result may predate the write and must not be stored.
+        self._fetching: Dict[str, int] = {}
+        self._dirty = set()
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    async def create(self, lead: Lead) -> Lead:
+        created = await self.inner.create(lead)
+        if created.id is not None:
+            self.cache.set(str(created.id), created)
+        return created
+
+    async def retrieve(self, id) -> Lead:
+        key = str(id)
+        lead = self._lookup(key, id)
+        if lead is None:
+            return await self._fetch(key, id)
+        return lead
+
+    async def retrieve_many(self, ids: List[int]) -> Dict[int, Union[Lead, Exception]]:
+        results: Dict[int, Union[Lead, Exception]] = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            lead = self._lookup(str(id), id)
+            if lead is None:
+                missing.append(id)
+            else:
+                results[id] = lead
+        if missing:
+            results.update(await self._fetch_many(missing))
+        return results
+
+    async def update(self, id, lead):
+        try:
+            await self.inner.update(id, lead)
+        finally:
+            self._invalidate(str(id))
+
+    async def delete(self, id):
+        try:
+            await self.inner.delete(id)
+        finally:
+            self._invalidate(str(id))
+
+    def list(self, page_size: int) -> AsyncIterator[List[Lead]]:
+        # Listing bypasses the cache: a full walk would evict the hot set.
+        return self.inner.list(page_size)
+
+    def peek(self, id) -> Optional[Lead]:
+        return self.cache.peek(str(id)) or self.inner.peek(id)
+
+    async def search(self, **criteria) -> List[Lead]:
+        return await self.inner.search(**criteria)
+
+    def stats(self) -> Dict[str, Any]:
+        cache_stats = self.cache.stats()
+        cache_stats["refreshes"] = self.refreshes
+        cache_stats["refresh_errors"] = self.refresh_errors
+        return {**self.inner.stats(), "cache": cache_stats}
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        await self.inner.close()
+
+    def _lookup(self, key: str, id) -> Optional[Lead]:
+        lead, stale = self.cache.get(key)
+        if stale and key not in self._refresh_tasks:
+            task = asyncio.get_running_loop().create_task(self._refresh(key, id))
+            self._refresh_tasks[key] = task
+            task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+        return lead
+
+    async def _fetch(self, key: str, id) -> Lead:
+        self._begin_fetch(key)
+        since = time.time()
+        try:
+            lead = await self.inner.retrieve(id)
+            self._store(key, lead, since)
+            return lead
+        finally:
+            self._end_fetch(key)
+
+    async def _fetch_many(self, ids: List[int]) -> Dict[int, Union[Lead, Exception]]:
+        keys = [str(id) for id in ids]
+        for key in keys:
+            self._begin_fetch(key)
+        since = time.time()
+        try:
+            results = await self.inner.retrieve_many(ids)
+            for id, lead in results.items():
+                if isinstance(lead, Lead):
+                    self._store(str(id), lead, since)
+            return results
+        finally:
+            for key in keys:
+                self._end_fetch(key)
+
+    def _begin_fetch(self, key: str):
+        self._fetching[key] = self._fetching.get(key, 0) + 1
+
+    def _end_fetch(self, key: str):
+        self._fetching[key] -= 1
+        if not self._fetching[key]:
+            del self._fetching[key]
+            self._dirty.discard(key)
+
+    def _store(self, key: str, lead: Lead, since: float):
+        if key not in self._dirty:
+            self.cache.set(key, lead, since)
+
+    async def _refresh(self, key: str, id):
+        try:
+            await self._fetch(key, id)
+            self.refreshes += 1
+        except HTTPException as exc:
+            self.refresh_errors += 1
+            if exc.status_code == 404:
+                self.cache.invalidate(key)
+        except Exception:
+            # The stale entry stays in place until its stale window closes.
+            self.refresh_errors += 1
+
+    def _invalidate(self, key: str):
+        self.cache.invalidate(key)
+        if key in self._fetching:
+            self._dirty.add(key)
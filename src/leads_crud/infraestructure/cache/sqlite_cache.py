@@ -0,0 +1,171 @@
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from decouple import config
+
+from leads_crud.domain.lead import Lead
+from leads_crud.infraestructure.cache.lead_cache import CACHE_MAX_ENTRIES, CACHE_STALE_TTL, CACHE_TTL
+from leads_crud.infraestructure.sqlite.connection import connect
+
+CACHE_PATH = config("LEAD_CACHE_PATH", default=os.path.join(tempfile.gettempdir(), "leads-cache.sqlite3"))
+CACHE_PRUNE_EVERY = config("LEAD_CACHE_PRUNE_EVERY", default=100, cast=int)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads_cache (
+    key TEXT PRIMARY KEY,
+    lead TEXT,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    invalidated_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS leads_cache_fresh_until ON leads_cache (fresh_until);
+"""
+
+# `invalidated_at` holds the latest invalidation or write time of a key. A read
+# only replaces the entry if it started after both, so a read that began
+# before an invalidation, or before a newer stored read, cannot win.
+UPSERT = (
+    "INSERT INTO leads_cache (key, lead, fresh_until, stale_until, invalidated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET lead = excluded.lead, fresh_until = excluded.fresh_until, "
+    "stale_until = excluded.stale_until, "
+    "invalidated_at = MAX(COALESCE(leads_cache.invalidated_at, 0), excluded.invalidated_at) "
+    "WHERE leads_cache.invalidated_at IS NULL OR leads_cache.invalidated_at < excluded.invalidated_at"
+)
+
+# Invalidated keys keep a tombstone with the invalidation time, so reads
+# that were in flight in any process cannot store the old lead back.
+TOMBSTONE = (
+    "INSERT INTO leads_cache (key, lead, fresh_until, stale_until, invalidated_at) VALUES (?, NULL, 0, ?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET lead = NULL, fresh_until = 0, "
+    "stale_until = excluded.stale_until, invalidated_at = excluded.invalidated_at"
+)
+
+
+class SqliteLeadCache:
+    """
+    Lead cache kept in a SQLite file in WAL mode, shared by every process
+    opening the same `path`: an entry stored or invalidated by one uvicorn
+    worker is seen by all of them. Same interface as LRUTTLCache.
+    Expiry uses wall-clock time since processes do not share a monotonic
+    clock. Every `prune_every` stores, expired entries are removed and the
+    oldest ones are evicted down to `max_entries`. Counters are per process.
+    """
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        stale_ttl: float = CACHE_STALE_TTL,
+        prune_every: int = CACHE_PRUNE_EVERY,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prune_every = max(1, prune_every)
+        self._clock = clock
+        self.db = connect(path)
+        self.db.executescript(SCHEMA)
+        self._stores = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM leads_cache WHERE lead IS NOT NULL").fetchone()[0]
+
+    def get(self, key: str) -> Tuple[Optional[Lead], bool]:
+        """Returns the cached lead (or None) and whether it is stale."""
+        row = self._select(key)
+        if row is None or row[0] is None:
+            self.misses += 1
+            return None, False
+
+        data, fresh_until, stale_until = row
+        now = self._clock()
+        if now >= stale_until:
+            self.expirations += 1
+            self.misses += 1
+            return None, False
+        if now >= fresh_until:
+            self.stale_hits += 1
+            return Lead.model_validate_json(data), True
+        self.hits += 1
+        return Lead.model_validate_json(data), False
+
+    def peek(self, key: str) -> Optional[Lead]:
+        """Returns the lead if it is cached and fresh, without counting a lookup."""
+        row = self._select(key)
+        if row is None or row[0] is None or self._clock() >= row[1]:
+            return None
+        return Lead.model_validate_json(row[0])
+
+    def set(self, key: str, lead: Lead, since: Optional[float] = None):
+        """Stores `lead`, read from the upstream at `since` (now by default)."""
+        now = self._clock()
+        self.db.execute(UPSERT, (
+            key,
+            lead.model_dump_json(),
+            now + self.ttl,
+            now + self.ttl + self.stale_ttl,
+            now if since is None else since,
+        ))
+        self._stores += 1
+        if self._stores % self.prune_every == 0:
+            self.prune()
+
+    def invalidate(self, key: str):
+        now = self._clock()
+        self.db.execute(TOMBSTONE, (key, now + self.ttl + self.stale_ttl, now))
+        self.invalidations += 1
+
+    def clear(self):
+        self.db.execute("DELETE FROM leads_cache")
+
+    def prune(self):
+        """
+        Drops expired entries and tombstones, then the oldest entries over
+        `max_entries`. Tombstones are never evicted early: until they expire
+        they keep reads started before an invalidation from being stored.
+        """
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute("DELETE FROM leads_cache WHERE stale_until <= ?", (self._clock(),))
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self.db.execute(
+                    "DELETE FROM leads_cache WHERE key IN "
+                    "(SELECT key FROM leads_cache WHERE lead IS NOT NULL ORDER BY fresh_until LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "sqlite",
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def _select(self, key: str):
+        return self.db.execute(
+            "SELECT lead, fresh_until, stale_until FROM leads_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
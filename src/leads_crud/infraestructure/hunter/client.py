@@ -0,0 +1,135 @@
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+from decouple import config
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # HTTP/2 support is optional (pip install httpx[http2])
+    h2 = None
+
+from leads_crud.infraestructure.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = config("HUNTER_MAX_CONNECTIONS", default=100, cast=int)
+MAX_KEEPALIVE_CONNECTIONS = config("HUNTER_MAX_KEEPALIVE_CONNECTIONS", default=100, cast=int)
+KEEPALIVE_EXPIRY = config("HUNTER_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+CONNECT_TIMEOUT = config("HUNTER_CONNECT_TIMEOUT", default=5.0, cast=float)
+READ_TIMEOUT = config("HUNTER_READ_TIMEOUT", default=10.0, cast=float)
+WRITE_TIMEOUT = config("HUNTER_WRITE_TIMEOUT", default=10.0, cast=float)
+POOL_TIMEOUT = config("HUNTER_POOL_TIMEOUT", default=5.0, cast=float)
+HTTP2 = config("HUNTER_HTTP2", default=False, cast=bool)
+
+
+class ClientPool:
+    """
+    Owns the httpx.AsyncClient shared by every Hunter call.
+    The client is opened and closed by the application lifespan; it is
+    also created on first use so code running outside a lifespan works.
+    """
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        timeout: Optional[httpx.Timeout] = None,
+        http2: bool = HTTP2,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout or httpx.Timeout(
+            connect=CONNECT_TIMEOUT,
+            read=READ_TIMEOUT,
+            write=WRITE_TIMEOUT,
+            pool=POOL_TIMEOUT,
+        )
+        if http2 and h2 is None:
+            logger.warning("HUNTER_HTTP2 is set but the h2 package is missing, using HTTP/1.1")
+        self.http2 = http2 and h2 is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+        return self._client
+
+    async def open(self) -> httpx.AsyncClient:
+        return self.client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.client
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await getattr(client, method)(url, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.limits.max_connections, 3)
+            if self.limits.max_connections else 0.0,
+        }
+        # httpx does not expose its pool, read it from httpcore when possible.
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = idle
+            stats["active_connections"] = len(connections) - idle
+        return stats
+
+
+pool = ClientPool()
+
+
+def _pool_connections():
+    stats = pool.stats()
+    if "connections" not in stats:
+        return []
+    return [(("active",), stats["active_connections"]), (("idle",), stats["idle_connections"])]
+
+
+registry.gauge(
+    "hunter_requests_in_flight",
+    "Requests to Hunter waiting for their response",
+    lambda: [((), pool.in_flight)],
+)
+registry.gauge(
+    "hunter_pool_saturation",
+    "Requests in flight over HUNTER_MAX_CONNECTIONS",
+    lambda: [((), pool.stats()["saturation"])],
+)
+registry.gauge(
+    "hunter_pool_connections",
+    "Open connections to Hunter by state",
+    _pool_connections,
+    ("state",),
+)
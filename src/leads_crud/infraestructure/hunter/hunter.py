@@ -1,28 +1,203 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
 import httpx
 from decouple import config
 from fastapi import HTTPException
 
 from leads_crud.domain.lead import Lead
 from leads_crud.domain.repositories import ILeadCRUD
+from leads_crud.infraestructure.hunter.client import pool
 from leads_crud.infraestructure.hunter.mappers import HunterMapper
+from leads_crud.infraestructure.hunter.ratelimit import TokenBucket
+from leads_crud.infraestructure.hunter.resilience import CircuitBreaker, RetryPolicy, is_retryable
+from leads_crud.infraestructure.hunter.singleflight import SingleFlight
+from leads_crud.infraestructure.json_codec import loads
+from leads_crud.infraestructure.metrics import registry
+from leads_crud.infraestructure.tracing import CLIENT, tracer
 
 BASE_URL = config("BASE_URL")
 header = {"X-API-KEY": config("API_KEY")}
+MULTI_GET_CONCURRENCY = config("HUNTER_MULTI_GET_CONCURRENCY", default=20, cast=int)
+# Hunter returns at most 1000 leads per listing page.
+LIST_PAGE_SIZE = config("HUNTER_LIST_PAGE_SIZE", default=100, cast=int)
+COALESCE_READS = config("HUNTER_COALESCE_READS", default=True, cast=bool)
+# Hunter allows 10 requests per second per key on the leads endpoints.
+RATE_LIMIT_RPS = config("HUNTER_RATE_LIMIT_RPS", default=10.0, cast=float)
+RATE_LIMIT_BURST = config("HUNTER_RATE_LIMIT_BURST", default=10, cast=int)
+RATE_LIMIT_RETRIES = config("HUNTER_RATE_LIMIT_RETRIES", default=3, cast=int)
+RATE_LIMIT_MAX_PAUSE = config("HUNTER_RATE_LIMIT_MAX_PAUSE", default=60.0, cast=float)
+RETRY_ATTEMPTS = config("HUNTER_RETRY_ATTEMPTS", default=2, cast=int)
+RETRY_BASE_DELAY = config("HUNTER_RETRY_BASE_DELAY", default=0.1, cast=float)
+RETRY_MAX_DELAY = config("HUNTER_RETRY_MAX_DELAY", default=2.0, cast=float)
+BREAKER_FAILURE_RATE = config("HUNTER_BREAKER_FAILURE_RATE", default=0.5, cast=float)
+BREAKER_WINDOW = config("HUNTER_BREAKER_WINDOW", default=20, cast=int)
+BREAKER_MIN_CALLS = config("HUNTER_BREAKER_MIN_CALLS", default=10, cast=int)
+BREAKER_OPEN_SECONDS = config("HUNTER_BREAKER_OPEN_SECONDS", default=30.0, cast=float)
+
+# Only these are retried after a 5xx or a transport error: repeating them
+# cannot create a second lead.
+IDEMPOTENT_METHODS = frozenset({"get", "put", "delete"})
+
+limiter = TokenBucket(rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST, max_pause=RATE_LIMIT_MAX_PAUSE)
+retry_policy = RetryPolicy(
+    attempts=RETRY_ATTEMPTS,
+    base_delay=RETRY_BASE_DELAY,
+    max_delay=RETRY_MAX_DELAY,
+)
+breaker = CircuitBreaker(
+    failure_rate=BREAKER_FAILURE_RATE,
+    window=BREAKER_WINDOW,
+    min_calls=BREAKER_MIN_CALLS,
+    open_seconds=BREAKER_OPEN_SECONDS,
+)
+
+upstream_duration = registry.histogram(
+    "hunter_request_duration_seconds",
+    "Duration of each request sent to Hunter, retries included one by one",
+    ("operation",),
+)
+upstream_responses = registry.counter(
+    "hunter_responses_total",
+    "Hunter responses by status code, or transport error name when there was none",
+    ("operation", "status"),
+)
+registry.gauge(
+    "hunter_rate_limiter_queued",
+    "Requests waiting for the client-side rate limiter",
+    lambda: [((), limiter.queued)],
+)
+registry.gauge(
+    "hunter_rate_limiter_waited_seconds_total",
+    "Time requests spent waiting for the rate limiter",
+    lambda: [((), limiter.waited_seconds)],
+)
+registry.gauge(
+    "hunter_circuit_breaker_state",
+    "1 for the current state of the circuit breaker",
+    lambda: [((state,), breaker.state == state) for state in (breaker.CLOSED, breaker.OPEN, breaker.HALF_OPEN)],
+    ("state",),
+)
+registry.gauge(
+    "hunter_retries_total",
+    "Requests to Hunter sent again after a 5xx or a transport error",
+    lambda: [((), retry_policy.retries)],
+)
+
+
+def operation_of(method: str, url: str) -> str:
+    if url.endswith("/leads"):
+        return "create" if method == "post" else "list"
+    return {"get": "retrieve", "put": "update", "delete": "delete"}.get(method, method)
+
+
+async def request(operation : str, method : str, url : str, **kwargs) -> httpx.Response:
+    """One request to Hunter, recorded as a client span that is propagated in its traceparent header."""
+    with tracer.span("hunter "+operation, CLIENT) as span:
+        if span is None:
+            return await pool.request(method, url, **kwargs)
+        span.set("http.request.method", method.upper())
+        span.set("url.full", url)
+        kwargs["headers"] = {**kwargs.get("headers", {}), "traceparent": span.traceparent}
+        response = await pool.request(method, url, **kwargs)
+        span.set("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.fail(str(response.status_code))
+        return response
+
+
+def _transport_failed(operation : str, exc : httpx.TransportError, started : float, last_attempt : bool):
+    """Records a request that got no response; raises the error of the call once it cannot be retried."""
+    upstream_duration.observe(time.perf_counter() - started, operation)
+    upstream_responses.inc(operation, type(exc).__name__)
+    breaker.record_failure()
+    if last_attempt:
+        raise HTTPException(
+            status_code=504 if isinstance(exc, httpx.TimeoutException) else 502,
+            detail="Hunter API request failed: "+type(exc).__name__
+        ) from exc
+
 
-client = httpx.AsyncClient()
+def _requeue_throttled(throttled : int) -> bool:
+    """Whether a request rejected with 429 for the `throttled`-th time is queued again."""
+    # Not processed by Hunter, so neither a success nor a failure.
+    breaker.release()
+    return throttled < RATE_LIMIT_RETRIES
+
+
+def _retry_answer(response : httpx.Response, last_attempt : bool) -> bool:
+    """Records the outcome of an answer other than 429; whether the request is sent again."""
+    if response.is_success or not is_retryable(response):
+        # Even when the request was wrong, the upstream answered properly.
+        breaker.record_success()
+        return False
+    breaker.record_failure()
+    return not last_attempt
+
+
+async def send(method : str, url : str, **kwargs) -> httpx.Response:
+    """
+    Sends a request to Hunter through the circuit breaker and rate limiter.
+    A 429 means the request was not processed, so it is queued again
+    (up to RATE_LIMIT_RETRIES times) after the pause Hunter asked for.
+    Idempotent requests are retried with jittered backoff on 5xx responses
+    and transport errors.
+    """
+    retries = retry_policy.attempts if method in IDEMPOTENT_METHODS else 0
+    operation = operation_of(method, url)
+    attempt = 0
+    throttled = 0
+    while True:
+        if not breaker.allow():
+            raise HTTPException(
+                status_code=503,
+                detail="Hunter API is unavailable, try again later"
+            )
+        await limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = await request(operation, method, url, **kwargs)
+        except httpx.TransportError as exc:
+            _transport_failed(operation, exc, started, last_attempt=attempt >= retries)
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            upstream_duration.observe(time.perf_counter() - started, operation)
+            upstream_responses.inc(operation, str(response.status_code))
+            limiter.observe(response)
+            if response.status_code == 429:
+                if not _requeue_throttled(throttled):
+                    return response
+                throttled += 1
+                continue
+            if not _retry_answer(response, last_attempt=attempt >= retries):
+                return response
+        await asyncio.sleep(retry_policy.delay(attempt))
+        attempt += 1
 
 async def validated_response(response : httpx.Response):
     if not response.is_success:
-        error_details = await response.json()
+        try:
+            detail = loads(response.content)['errors'][0]['details']
+        except (ValueError, KeyError, IndexError, TypeError):
+            # Not a Hunter error body, e.g. a proxy error page.
+            detail = response.reason_phrase or "Hunter API error"
         raise HTTPException(
             status_code=response.status_code,
-            detail= error_details['errors'][0]['details']
+            detail=detail
         )
 
-    data = await response.json()
-    return data
+    # Updates and deletes answer 204 without a body.
+    if response.status_code == 204 or not response.content:
+        return None
+    return loads(response.content)
 
 class HunterLeadCrud(ILeadCRUD):
+    def __init__(self, coalesce_reads: bool = COALESCE_READS):
+        self.flights = SingleFlight() if coalesce_reads else None
+
     async def create(self,lead:Lead) -> Lead:
         payload = HunterMapper.to_api(lead)
         if("email" not in payload):
@@ -30,7 +205,8 @@ class HunterLeadCrud(ILeadCRUD):
                 status_code=400,
                 detail="required field 'email' missing"
             )
-        response = await client.post(
+        response = await send(
+            "post",
             BASE_URL+"/leads",
             json = HunterMapper.to_api(lead),
             headers=header
@@ -39,26 +215,115 @@ class HunterLeadCrud(ILeadCRUD):
         return HunterMapper.to_entity(response)
 
     async def retrieve(self,id) -> Lead:
-        response = await client.get(
+        return HunterMapper.to_entity(await self._fetch(id))
+
+    async def retrieve_fields(self, id) -> Dict[str, Any]:
+        return HunterMapper.to_fields(await self._fetch(id))
+
+    async def _fetch(self, id) -> Dict[str, Any]:
+        # Coalesced callers share the parsed answer and must not modify it.
+        if self.flights is None:
+            return await self._retrieve(id)
+        return await self.flights.do(str(id), lambda: self._retrieve(id))
+
+    async def _retrieve(self, id) -> Dict[str, Any]:
+        response = await send(
+            "get",
             BASE_URL+"/leads/"+str(id),
             headers=header,
         )
-        response = await validated_response(response)
-        return HunterMapper.to_entity(response)
+        return await validated_response(response)
 
-    async def update(self, id, lead):
-        response = await client.put(
-            BASE_URL+"/leads/"+str(id),
-            json = HunterMapper.to_api(lead),
-            headers=header
+    async def retrieve_many(self, ids: List[int]) -> Dict[int, Union[Lead, Exception]]:
+        semaphore = asyncio.Semaphore(MULTI_GET_CONCURRENCY)
+
+        async def fetch(id):
+            async with semaphore:
+                return await self.retrieve(id)
+
+        unique_ids = list(dict.fromkeys(ids))
+        results = await asyncio.gather(*(fetch(id) for id in unique_ids), return_exceptions=True)
+        return dict(zip(unique_ids, results, strict=True))
+
+    async def list(self, page_size: int = LIST_PAGE_SIZE) -> AsyncIterator[List[Lead]]:
+        """
+        Walks every lead page by page. The next page is requested before
+        the current one is handed out, so its round-trip overlaps with the
+        consumer's work; no more than two pages are held at a time.
+        """
+        offset = 0
+        next_page = asyncio.ensure_future(self._list_page(offset, page_size))
+        try:
+            while next_page is not None:
+                leads, total = await next_page
+                offset += page_size
+                next_page = None
+                if len(leads) == page_size and (total is None or offset < total):
+                    next_page = asyncio.ensure_future(self._list_page(offset, page_size))
+                if leads:
+                    yield leads
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _list_page(self, offset: int, limit: int) -> Tuple[List[Lead], Optional[int]]:
+        response = await send(
+            "get",
+            BASE_URL+"/leads",
+            params={"offset": offset, "limit": limit},
+            headers=header,
         )
         response = await validated_response(response)
+        return HunterMapper.to_entity_page(response)
+
+    async def update(self, id, lead):
+        try:
+            response = await send(
+                "put",
+                BASE_URL+"/leads/"+str(id),
+                json = HunterMapper.to_api(lead),
+                headers=header
+            )
+            response = await validated_response(response)
+        finally:
+            self._forget(id)
 
     async def delete(self, id):
-        response = await client.delete(
-            BASE_URL+"/leads/"+str(id),
-            headers=header,
+        try:
+            response = await send(
+                "delete",
+                BASE_URL+"/leads/"+str(id),
+                headers=header,
+            )
+            await validated_response(response)
+        finally:
+            self._forget(id)
+
+    def peek(self, id) -> Optional[Lead]:
+        # Nothing is kept locally, the state of a lead is only known upstream.
+        return None
+
+    async def search(self, **criteria) -> List[Lead]:
+        # Search runs on the indexes of the local mirror.
+        raise HTTPException(
+            status_code=501,
+            detail="Lead search requires the local mirror (LEAD_MIRROR_PATH)",
         )
-        response = await validated_response(response)
-        print(response)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "rate_limiter": limiter.stats(),
+            "circuit_breaker": breaker.stats(),
+            "retries": retry_policy.stats(),
+            "connection_pool": pool.stats(),
+        }
+        if self.flights is not None:
+            stats["coalescing"] = self.flights.stats()
+        return stats
+
+    def _forget(self, id):
+        # Reads started before the write may return the old lead; later
+        # reads must not join them.
+        if self.flights is not None:
+            self.flights.forget(str(id))
 
@@ -1,11 +1,30 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 
 from leads_crud.domain.lead import Lead
+from leads_crud.infraestructure.metrics import mapping_duration, timed
+from leads_crud.infraestructure.tracing import traced
+
+
+def _to_lead(data : Dict[str,Any]) -> Lead:
+    return Lead(
+        # Hunter sends numeric ids.
+        id=str(data["id"]),
+        email=data["email"],
+        first_name=data["first_name"],
+        last_name=data["last_name"],
+        position=data["position"],
+        company=data["company"],
+    )
+
+
+LEAD_FIELDS = ("email", "first_name", "last_name", "position", "company")
 
 
 class HunterMapper:
+    @traced("HunterMapper.to_api")
+    @timed(mapping_duration, "hunter", "to_api")
     def to_api(lead:Lead) -> Dict[str,Any]:
         result = {}
 
@@ -27,14 +46,25 @@ class HunterMapper:
             )
         return result
 
+    @traced("HunterMapper.to_entity")
+    @timed(mapping_duration, "hunter", "to_entity")
     def to_entity(lead_info : Dict[str,Any]) -> Lead:
-        data=lead_info["data"]
-        lead = Lead(
-            id=data["id"],
-            email=data["email"],
-            first_name=data["first_name"],
-            last_name=data["last_name"],
-            position=data["position"],
-            company=data["company"],
-        )
-        return lead
+        return _to_lead(lead_info["data"])
+
+    @traced("HunterMapper.to_fields")
+    @timed(mapping_duration, "hunter", "to_fields")
+    def to_fields(lead_info : Dict[str,Any]) -> Dict[str,Any]:
+        """The fields of `to_entity` as a plain dict, without building a Lead."""
+        data = lead_info["data"]
+        fields = {"id": str(data["id"])}
+        for name in LEAD_FIELDS:
+            fields[name] = data[name]
+        return fields
+
+    # Leads of a page are mapped without a span or timing each.
+    @traced("HunterMapper.to_entity_page")
+    @timed(mapping_duration, "hunter", "to_entity_page")
+    def to_entity_page(page : Dict[str,Any]) -> Tuple[List[Lead], Optional[int]]:
+        leads = [_to_lead(data) for data in page["data"]["leads"]]
+        total = page.get("meta", {}).get("total")
+        return leads, total
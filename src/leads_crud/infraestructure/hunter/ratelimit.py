@@ -0,0 +1,155 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+# Pause applied on a 429 that does not say how long to wait.
+DEFAULT_RETRY_AFTER = 1.0
+# Longest pause taken from an upstream header, so a bogus one cannot stall every call.
+MAX_PAUSE = 60.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - now)
+
+
+class TokenBucket:
+    """
+    Async token bucket pacing outbound calls to `rate` requests per second,
+    with bursts of up to `burst` requests. Callers are queued in arrival order
+    rather than rejected. The upstream can pause the bucket through
+    Retry-After and X-RateLimit-* response headers.
+    A `rate` of 0 disables pacing but keeps honoring upstream pauses,
+    each one capped at `max_pause` seconds.
+
+    The bucket is kept as the theoretical arrival time of the next call
+    (GCRA), so callers reserve their slot without locks and the limiter can
+    be shared by every event loop of the process.
+    """
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        max_pause: float = MAX_PAUSE,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_pause = max_pause
+        self._interval = 1 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tat = clock()
+        self._paused_until = 0.0
+        # Total time the schedule has been pushed back by pauses so far.
+        self._shift = 0.0
+        self.queued = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    async def acquire(self):
+        started = self._clock()
+        slept = False
+        self.queued += 1
+        try:
+            slot = self._reserve(self._clock())
+            shift = self._shift
+            while True:
+                # A pause that starts while sleeping moves the booked slot back
+                # by its length, so queued callers resume at `rate` afterwards.
+                now = self._clock()
+                ready = max(slot + self._shift - shift, self._paused_until)
+                if ready <= now:
+                    break
+                slept = True
+                await self._sleep(ready - now)
+        finally:
+            self.queued -= 1
+        # The clock always moves a little: only calls that slept were delayed.
+        if slept:
+            self.delayed += 1
+            self.waited_seconds += self._clock() - started
+        self.acquired += 1
+
+    def pause(self, seconds: float):
+        """
+        Holds every caller back for `seconds` from now, at most `max_pause`,
+        and pushes the booked schedule back by the time the pause adds.
+        """
+        now = self._clock()
+        until = now + min(seconds, self.max_pause)
+        if until <= self._paused_until:
+            return
+        added = until - max(self._paused_until, now)
+        self._paused_until = until
+        self._shift += added
+        self._tat += added
+
+    def observe(self, response: httpx.Response):
+        """Adapts to the rate limit state reported by an upstream response."""
+        if response.status_code == 429:
+            self.throttled += 1
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            self.pause(DEFAULT_RETRY_AFTER if retry_after is None else retry_after)
+            return
+
+        headers = response.headers
+        if "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+        except ValueError:
+            return
+        if remaining < self.burst:
+            self._tat = max(self._tat, self._clock() + (self.burst - max(remaining, 0)) * self._interval)
+        if remaining <= 0 and "x-ratelimit-reset" in headers:
+            reset = parse_retry_after(headers["x-ratelimit-reset"])
+            if reset is not None:
+                # Some APIs send an epoch timestamp rather than a delay.
+                if reset > 1e9:
+                    reset = max(0.0, reset - time.time())
+                self.pause(reset)
+
+    def tokens(self) -> float:
+        if not self._interval:
+            return float(self.burst)
+        available = self.burst - (self._tat - self._clock()) / self._interval
+        return min(float(self.burst), max(0.0, available))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens(), 3),
+            "queued": self.queued,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "throttled_responses": self.throttled,
+            "paused_for": round(max(0.0, self._paused_until - self._clock()), 3),
+        }
+
+    def _reserve(self, now: float) -> float:
+        """Books the next free slot and returns when it starts."""
+        slot = max(now, self._paused_until)
+        if self._interval:
+            slot = max(slot, self._tat - (self.burst - 1) * self._interval)
+            self._tat = max(self._tat, slot) + self._interval
+        return slot
@@ -0,0 +1,131 @@
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+import httpx
+
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    return response.status_code in RETRYABLE_STATUS_CODES
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a random
+    time between 0 and min(max_delay, base_delay * 2**n) seconds.
+    """
+    def __init__(
+        self,
+        attempts: int,
+        base_delay: float,
+        max_delay: float,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng
+        self.retries = 0
+
+    def delay(self, retry: int) -> float:
+        self.retries += 1
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** retry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"attempts": self.attempts, "retries": self.retries}
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream is unhealthy.
+    Closed: calls go through and their outcome is recorded in a rolling
+    window; once at least `min_calls` outcomes are known and the failure
+    rate reaches `failure_rate`, the breaker opens.
+    Open: calls are rejected for `open_seconds`, then the breaker goes
+    half-open and lets `half_open_calls` probes through. A successful probe
+    closes it, a failed one opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self._state == self.HALF_OPEN:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def release(self):
+        """Ends a call whose outcome says nothing about upstream health."""
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_failure(self):
+        if self._state == self.HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(False)
+        if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            if self._current_failure_rate() >= self.failure_rate:
+                self._trip()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self._current_failure_rate(), 3),
+            "window_calls": len(self._outcomes),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+    def _current_failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
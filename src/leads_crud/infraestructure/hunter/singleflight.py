@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into a single execution.
+    Callers arriving while a call for their key is in flight wait for its
+    outcome instead of starting their own; errors are raised to all of them.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._finish(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # Shielded so that a cancelled waiter does not cancel the call
+            # the other waiters depend on.
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                # Dropped now, not when the cancellation completes, so that a
+                # caller arriving meanwhile starts a new call.
+                self._finish(key, call)
+                call.task.cancel()
+
+    def forget(self, key: Hashable):
+        """Makes later callers start a new call instead of joining the current one."""
+        self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+    def _finish(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
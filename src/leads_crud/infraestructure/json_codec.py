@@ -0,0 +1,21 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional (pip install orjson), json is used without it
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parses a JSON document; raises a ValueError when it is malformed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON of plain dicts, lists, strings, numbers and None."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
@@ -0,0 +1,176 @@
+import functools
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds, from a cache hit to a slow Hunter round-trip.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        value = int(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Counts observations per bucket. Observing only bumps one bucket count
+    and the sum; counts are made cumulative when rendered.
+    """
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: one count per bucket plus +Inf, then the sum.
+        self.series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self.series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1], strict=True):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """A value read when metrics are rendered: `collect` returns (label values, value) pairs."""
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of the process, rendered in the Prometheus text format.
+    Updates are plain dict and list operations without locks: metrics are
+    only written from the event loop thread.
+    """
+    def __init__(self):
+        self.metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, help, collect, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+def timed(histogram: Histogram, *labels: str):
+    """Decorator observing the duration of each call of a function in `histogram`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+        return wrapper
+    return decorator
+
+
+registry = MetricsRegistry()
+
+mapping_duration = registry.histogram(
+    "lead_mapping_duration_seconds",
+    "Time spent mapping leads between the API, domain and Hunter representations",
+    ("mapper", "operation"),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01),
+)
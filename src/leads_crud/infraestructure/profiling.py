@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+# Leaf of a stack whose task is suspended on something other than a coroutine.
+AWAITING = "<await>"
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _awaited_frame(awaitable) -> Optional[FrameType]:
+    return getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+
+
+def task_stack(task: asyncio.Task, thread_frame: Optional[FrameType]) -> Tuple[str, ...]:
+    """
+    Logical stack of `task`, outermost first. While the task is suspended
+    this is its chain of awaiting coroutines; while it runs, the frames the
+    event loop thread executes inside its innermost coroutine are added.
+    """
+    stack: List[str] = []
+    awaitable = task.get_coro()
+    innermost = None
+    while awaitable is not None:
+        frame = _awaited_frame(awaitable)
+        if frame is None:
+            stack.append(AWAITING)
+            break
+        stack.append(_label(frame))
+        innermost = awaitable
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+    if innermost is not None and getattr(innermost, "cr_running", False) and thread_frame is not None:
+        below: List[str] = []
+        frame = thread_frame
+        target = _awaited_frame(innermost)
+        while frame is not None and frame is not target:
+            below.append(_label(frame))
+            frame = frame.f_back
+        if frame is target:
+            stack.extend(reversed(below))
+    return tuple(stack)
+
+
+class TaskProfile:
+    """Samples of the logical stack of one task, counted per distinct stack."""
+    def __init__(self, task: asyncio.Task, thread_id: int):
+        self.task = task
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def sample(self, frames: Dict[int, FrameType]):
+        stack = task_stack(self.task, frames.get(self.thread_id))
+        if stack:
+            self.samples[stack] += 1
+
+    def folded(self) -> str:
+        """Stacks in the folded format read by flamegraph.pl, speedscope and inferno."""
+        return "".join(
+            ";".join(frame.replace(";", ":") for frame in stack) + f" {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+
+class StackSampler:
+    """
+    Samples the tasks being profiled every `interval` seconds from a
+    daemon thread, so time spent waiting on I/O is seen as well as time
+    spent running. The thread only runs while a profile is active.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: Dict[int, TaskProfile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, task: asyncio.Task) -> TaskProfile:
+        profile = TaskProfile(task, threading.get_ident())
+        with self._lock:
+            self._profiles[id(profile)] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: TaskProfile):
+        """Stops sampling `profile`; no sample is added to it once this returns."""
+        with self._lock:
+            self._profiles.pop(id(profile), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for profile in self._profiles.values():
+                    profile.sample(frames)
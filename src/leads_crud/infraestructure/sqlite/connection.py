@@ -0,0 +1,14 @@
+import sqlite3
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Opens a SQLite database in autocommit mode, with write-ahead logging so
+    readers do not block the writer of another connection or process.
+    The connection may be used from one event loop at a time, which may
+    live in another thread.
+    """
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
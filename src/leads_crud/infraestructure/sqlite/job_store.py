@@ -0,0 +1,204 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, List, Optional
+
+from decouple import config
+
+from leads_crud.domain.job import PENDING, QUEUED, RUNNING, SUCCEEDED, Job, JobItem
+from leads_crud.domain.repositories import IJobStore
+from leads_crud.infraestructure.sqlite.connection import connect
+
+JOB_STORE_PATH = config("LEAD_JOB_STORE_PATH", default=os.path.join(tempfile.gettempdir(), "lead-jobs.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);
+"""
+
+JOB_FIELDS = (
+    "id", "kind", "status", "params", "total", "succeeded", "failed",
+    "result", "error", "created_at", "started_at", "finished_at",
+)
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, separators=(",", ":"))
+
+
+def _loads(value: Optional[str]) -> Any:
+    return None if value is None else json.loads(value)
+
+
+class SqliteJobStore(IJobStore):
+    """
+    Persists jobs and the outcome of each of their items in SQLite, so jobs
+    interrupted by a restart can resume with the items still pending.
+    Item outcomes are written in batches, each in one transaction together
+    with the job counters. Processes sharing the file claim a job before
+    running it and hold it under a lease they keep renewing; a job whose
+    lease expired is claimed again by another process.
+    """
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.db = connect(path)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        # Stores created before jobs were claimed.
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def create(self, job: Job, payloads: List[Any]):
+        with self._transaction():
+            self.db.execute(
+                f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})",
+                self._to_row(job),
+            )
+            self.db.executemany(
+                "INSERT INTO job_items (job_id, idx, status, payload) VALUES (?, ?, ?, ?)",
+                [(job.id, index, PENDING, _dumps(payload)) for index, payload in enumerate(payloads)],
+            )
+
+    def get(self, id: str) -> Optional[Job]:
+        row = self.db.execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?",
+            (id,),
+        ).fetchone()
+        return None if row is None else self._to_job(row)
+
+    def save(self, job: Job):
+        """Stores the state of a job, leaving its counters alone."""
+        self.db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, started_at = ?, finished_at = ? WHERE id = ?",
+            (job.status, job.result, _dumps(job.error), job.started_at, job.finished_at, job.id),
+        )
+
+    def advance(self, id: str, succeeded: int):
+        self.db.execute("UPDATE jobs SET succeeded = succeeded + ? WHERE id = ?", (succeeded, id))
+
+    def record(self, id: str, outcomes: List[JobItem]):
+        succeeded = sum(1 for item in outcomes if item.status == SUCCEEDED)
+        with self._transaction():
+            self.db.executemany(
+                "UPDATE job_items SET status = ?, result = ?, error = ? WHERE job_id = ? AND idx = ?",
+                [(item.status, _dumps(item.result), _dumps(item.error), id, item.index) for item in outcomes],
+            )
+            self.db.execute(
+                "UPDATE jobs SET succeeded = succeeded + ?, failed = failed + ? WHERE id = ?",
+                (succeeded, len(outcomes) - succeeded, id),
+            )
+
+    def pending_items(self, id: str) -> List[JobItem]:
+        rows = self.db.execute(
+            "SELECT idx, payload FROM job_items WHERE job_id = ? AND status = ? ORDER BY idx",
+            (id, PENDING),
+        ).fetchall()
+        return [JobItem(index=index, payload=_loads(payload)) for index, payload in rows]
+
+    def items(self, id: str, status: Optional[str] = None, offset: int = 0, limit: int = 100) -> List[JobItem]:
+        query = "SELECT idx, status, payload, result, error FROM job_items WHERE job_id = ?"
+        params: List[Any] = [id]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        rows = self.db.execute(query + " ORDER BY idx LIMIT ? OFFSET ?", (*params, limit, offset)).fetchall()
+        return [
+            JobItem(index=index, status=status, payload=_loads(payload), result=_loads(result), error=_loads(error))
+            for index, status, payload, result, error in rows
+        ]
+
+    def expire(self, before: float) -> List[Job]:
+        """Deletes the jobs that finished before `before`, with their items, and returns them."""
+        with self._transaction():
+            rows = self.db.execute(
+                f"DELETE FROM jobs WHERE finished_at < ? RETURNING {', '.join(JOB_FIELDS)}",
+                (before,),
+            ).fetchall()
+            self.db.executemany("DELETE FROM job_items WHERE job_id = ?", [(row[0],) for row in rows])
+        return [self._to_job(row) for row in rows]
+
+    def claimable(self) -> List[str]:
+        """Ids of the jobs queued or running under an expired lease, oldest first."""
+        rows = self.db.execute(
+            "SELECT id FROM jobs WHERE status = ? OR (status = ? AND COALESCE(lease_until, 0) < ?) ORDER BY created_at",
+            (QUEUED, RUNNING, time.time()),
+        ).fetchall()
+        return [id for id, in rows]
+
+    def claim(self, id: str, owner: str, lease_until: float) -> Optional[Job]:
+        """Marks a claimable job as run by `owner`; None when it is not claimable, e.g. another process got it first."""
+        now = time.time()
+        claimed = self.db.execute(
+            "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, started_at = COALESCE(started_at, ?)"
+            " WHERE id = ? AND (status = ? OR (status = ? AND COALESCE(lease_until, 0) < ?))",
+            (RUNNING, owner, lease_until, now, id, QUEUED, RUNNING, now),
+        ).rowcount
+        return self.get(id) if claimed else None
+
+    def renew(self, owner: str, lease_until: float):
+        self.db.execute(
+            "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+            (lease_until, owner, RUNNING),
+        )
+
+    def release(self, owner: str):
+        """Queues the running jobs of `owner` again."""
+        self.db.execute(
+            "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL WHERE owner = ? AND status = ?",
+            (QUEUED, owner, RUNNING),
+        )
+
+    def close(self):
+        self.db.close()
+
+    @contextmanager
+    def _transaction(self):
+        self.db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    @staticmethod
+    def _to_row(job: Job):
+        return (
+            job.id, job.kind, job.status, _dumps(job.params), job.total, job.succeeded, job.failed,
+            job.result, _dumps(job.error), job.created_at, job.started_at, job.finished_at,
+        )
+
+    @staticmethod
+    def _to_job(row) -> Job:
+        fields = dict(zip(JOB_FIELDS, row, strict=True))
+        fields["params"] = _loads(fields["params"])
+        fields["error"] = _loads(fields["error"])
+        return Job(**fields)
+
@@ -0,0 +1,407 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from decouple import config
+from fastapi import HTTPException
+
+from leads_crud.domain.lead import Lead
+from leads_crud.domain.repositories import ILeadCRUD
+from leads_crud.infraestructure.sqlite.connection import connect
+
+logger = logging.getLogger(__name__)
+
+MIRROR_PATH = config("LEAD_MIRROR_PATH", default="")
+MIRROR_SYNC_INTERVAL = config("LEAD_MIRROR_SYNC_INTERVAL", default=300.0, cast=float)
+MIRROR_FULL_SYNC_EVERY = config("LEAD_MIRROR_FULL_SYNC_EVERY", default=12, cast=int)
+MIRROR_PAGE_SIZE = config("LEAD_MIRROR_PAGE_SIZE", default=1000, cast=int)
+
+FIELDS = ("id", "email", "first_name", "last_name", "position", "company")
+CONTENT_FIELDS = FIELDS[1:]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    position TEXT,
+    company TEXT,
+    sync_epoch INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL
+);
+-- Leads deleted locally, so a sync reading them from an older page skips them.
+CREATE TABLE IF NOT EXISTS deleted_leads (
+    id TEXT PRIMARY KEY,
+    deleted_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS leads_email ON leads (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS leads_company ON leads (company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS leads_position ON leads (position COLLATE NOCASE);
+"""
+
+# Full-text index over the lead fields, kept in step with `leads` by triggers.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE leads_fts USING fts5(
+    email, first_name, last_name, position, company,
+    content='leads', content_rowid='rowid'
+);
+CREATE TRIGGER leads_fts_insert AFTER INSERT ON leads BEGIN
+    INSERT INTO leads_fts (rowid, email, first_name, last_name, position, company)
+    VALUES (new.rowid, new.email, new.first_name, new.last_name, new.position, new.company);
+END;
+CREATE TRIGGER leads_fts_delete AFTER DELETE ON leads BEGIN
+    INSERT INTO leads_fts (leads_fts, rowid, email, first_name, last_name, position, company)
+    VALUES ('delete', old.rowid, old.email, old.first_name, old.last_name, old.position, old.company);
+END;
+CREATE TRIGGER leads_fts_update AFTER UPDATE OF email, first_name, last_name, position, company ON leads BEGIN
+    INSERT INTO leads_fts (leads_fts, rowid, email, first_name, last_name, position, company)
+    VALUES ('delete', old.rowid, old.email, old.first_name, old.last_name, old.position, old.company);
+    INSERT INTO leads_fts (rowid, email, first_name, last_name, position, company)
+    VALUES (new.rowid, new.email, new.first_name, new.last_name, new.position, new.company);
+END;
+INSERT INTO leads_fts (leads_fts) VALUES ('rebuild');
+"""
+
+# Sorts after any character, so `prefix <= value < prefix + PREFIX_END`
+# selects the values starting with `prefix` through the NOCASE indexes.
+PREFIX_END = "\U0010ffff"
+
+# Inserts new leads and rewrites existing ones only when their content changed,
+# so the row count is what a refresh actually brought in.
+# `updated_at` is the time of the last local write, NULL for rows a sync wrote.
+UPSERT = (
+    "INSERT INTO leads (id, email, first_name, last_name, position, company, sync_epoch, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{field} = excluded.{field}" for field in CONTENT_FIELDS)
+    + ", sync_epoch = excluded.sync_epoch, updated_at = excluded.updated_at WHERE ("
+    + " OR ".join(f"leads.{field} IS NOT excluded.{field}" for field in CONTENT_FIELDS)
+    + ")"
+)
+
+# A sync leaves alone the rows written locally after it started reading,
+# whose content is newer than the page it got.
+SYNC_UPSERT = UPSERT + " AND (leads.updated_at IS NULL OR leads.updated_at < ?)"
+
+
+class SqliteLeadMirror(ILeadCRUD):
+    """
+    Keeps a local SQLite copy of the leads of `inner` and serves reads from it.
+    Writes go through to `inner` first and are then applied locally.
+    A background task pulls every lead on start and refreshes periodically:
+    a refresh upserts the leads whose content changed, and every
+    `full_sync_every`-th refresh also drops leads that disappeared upstream,
+    once a read by id confirms they are gone.
+    Leads missing locally are read through from `inner`.
+    The copy is indexed by email, company, position and full text for `search`.
+    """
+    def __init__(
+        self,
+        inner: ILeadCRUD,
+        path: str = MIRROR_PATH,
+        sync_interval: float = MIRROR_SYNC_INTERVAL,
+        full_sync_every: int = MIRROR_FULL_SYNC_EVERY,
+        page_size: int = MIRROR_PAGE_SIZE,
+    ):
+        self.inner = inner
+        self.sync_interval = sync_interval
+        self.full_sync_every = max(1, full_sync_every)
+        self.page_size = page_size
+        self.db = connect(path)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(leads)")}
+        # Mirrors created before local writes were timestamped.
+        if "updated_at" not in columns:
+            self.db.execute("ALTER TABLE leads ADD COLUMN updated_at REAL")
+        if not self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'leads_fts'").fetchone():
+            self.db.executescript(SEARCH_SCHEMA)
+        self._epoch = int(self._state("epoch") or 0)
+        self.synced = self._state("last_full_sync") is not None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.syncs = 0
+        self.sync_errors = 0
+        self.last_sync_at: Optional[float] = None
+        self.last_sync_seconds: Optional[float] = None
+        self.last_sync_changes = 0
+        self.hits = 0
+        self.misses = 0
+        self.searches = 0
+
+    async def start(self):
+        await self.inner.start()
+        if self._sync_task is None:
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_forever())
+
+    async def close(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        self.db.close()
+        await self.inner.close()
+
+    async def create(self, lead: Lead) -> Lead:
+        created = await self.inner.create(lead)
+        if created.id is not None:
+            self._upsert([created])
+        return created
+
+    async def retrieve(self, id) -> Lead:
+        lead = self.get(id)
+        if lead is not None:
+            return lead
+        lead = await self.inner.retrieve(id)
+        self._upsert([lead])
+        return lead
+
+    async def retrieve_many(self, ids: List[int]) -> Dict[int, Union[Lead, Exception]]:
+        results: Dict[int, Union[Lead, Exception]] = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            lead = self.get(id)
+            if lead is None:
+                missing.append(id)
+            else:
+                results[id] = lead
+        if missing:
+            fetched = await self.inner.retrieve_many(missing)
+            self._upsert([lead for lead in fetched.values() if isinstance(lead, Lead)])
+            results.update(fetched)
+        return results
+
+    async def update(self, id, lead: Lead):
+        await self.inner.update(id, lead)
+        changes = {field: getattr(lead, field) for field in CONTENT_FIELDS if getattr(lead, field) is not None}
+        if changes:
+            assignments = ", ".join(f"{field} = ?" for field in changes)
+            self.db.execute(
+                f"UPDATE leads SET {assignments}, updated_at = ? WHERE id = ?",
+                (*changes.values(), time.time(), str(id)),
+            )
+
+    async def delete(self, id):
+        try:
+            await self.inner.delete(id)
+        except HTTPException as exc:
+            if exc.status_code == 404:
+                self._remove(id)
+            raise
+        self._remove(id)
+
+    async def list(self, page_size: int) -> AsyncIterator[List[Lead]]:
+        if not self.synced:
+            async for page in self.inner.list(page_size):
+                yield page
+            return
+
+        last_rowid = 0
+        while True:
+            rows = self.db.execute(
+                f"SELECT rowid, {', '.join(FIELDS)} FROM leads WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [self._to_lead(row[1:]) for row in rows]
+            if len(rows) < page_size:
+                return
+
+    async def search(
+        self,
+        email: Optional[str] = None,
+        company: Optional[str] = None,
+        position: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Lead]:
+        """
+        Leads matching every given criterion: exact email, company and
+        position prefixes (all case-insensitive) and full-text terms,
+        each term matching the start of a word in any field.
+        """
+        if not self.synced:
+            raise HTTPException(status_code=503, detail="Lead index is still being built")
+
+        conditions, params = [], []
+        if email is not None:
+            conditions.append("email = ? COLLATE NOCASE")
+            params.append(email)
+        for field, prefix in (("company", company), ("position", position)):
+            if prefix is not None:
+                conditions.append(f"{field} >= ? COLLATE NOCASE AND {field} < ? COLLATE NOCASE")
+                params += [prefix, prefix + PREFIX_END]
+        if text is not None:
+            terms = text.split()
+            if not terms:
+                return []
+            conditions.append("rowid IN (SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?)")
+            params.append(" ".join('"' + term.replace('"', '""') + '"*' for term in terms))
+
+        where = " AND ".join(conditions) or "1"
+        rows = self.db.execute(
+            f"SELECT {', '.join(FIELDS)} FROM leads WHERE {where} ORDER BY rowid LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        self.searches += 1
+        return [self._to_lead(row) for row in rows]
+
+    def get(self, id) -> Optional[Lead]:
+        """The local copy of a lead, without touching the upstream."""
+        lead = self.peek(id)
+        if lead is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return lead
+
+    def peek(self, id) -> Optional[Lead]:
+        row = self.db.execute(
+            f"SELECT {', '.join(FIELDS)} FROM leads WHERE id = ?",
+            (str(id),),
+        ).fetchone()
+        return None if row is None else self._to_lead(row)
+
+    async def sync(self, full: bool = False) -> int:
+        """Pulls every lead from `inner`; returns the number of leads inserted or changed."""
+        started = time.monotonic()
+        # `inner.list` may request a page before the previous one is handed
+        # over, so a page can be as old as the start of the walk.
+        since = time.time()
+        self._epoch += 1
+        epoch = self._epoch
+        self._set_state("epoch", epoch)
+        changes = 0
+        async for page in self.inner.list(self.page_size):
+            changes += self._upsert(page, epoch, since)
+            if full:
+                self.db.executemany(
+                    "UPDATE leads SET sync_epoch = ? WHERE id = ?",
+                    [(epoch, str(lead.id)) for lead in page],
+                )
+        if full:
+            # Leads written locally during the walk carry the current epoch too.
+            missing = [row[0] for row in self.db.execute("SELECT id FROM leads WHERE sync_epoch < ?", (epoch,))]
+            changes += await self._drop_deleted(missing, epoch, since)
+            self._set_state("last_full_sync", time.time())
+            self.synced = True
+        # Later syncs read pages requested after these deletes.
+        self.db.execute("DELETE FROM deleted_leads WHERE deleted_at < ?", (since,))
+
+        self.syncs += 1
+        self.last_sync_at = time.time()
+        self.last_sync_seconds = time.monotonic() - started
+        self.last_sync_changes = changes
+        return changes
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.db.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        return {
+            **self.inner.stats(),
+            "mirror": {
+                "leads": rows,
+                "synced": self.synced,
+                "hits": self.hits,
+                "misses": self.misses,
+                "searches": self.searches,
+                "syncs": self.syncs,
+                "sync_errors": self.sync_errors,
+                "last_sync_at": self.last_sync_at,
+                "last_sync_seconds": self.last_sync_seconds,
+                "last_sync_changes": self.last_sync_changes,
+            },
+        }
+
+    async def _sync_forever(self):
+        full = True
+        refreshes = 0
+        while True:
+            try:
+                await self.sync(full=full)
+                refreshes += 1
+                full = refreshes % self.full_sync_every == 0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.sync_errors += 1
+                logger.exception("Lead mirror sync failed")
+            await asyncio.sleep(self.sync_interval)
+
+    async def _drop_deleted(self, ids: List[str], epoch: int, since: float) -> int:
+        """
+        Removes the leads of `ids`, missed by the walk of a full sync, that
+        `inner` no longer has. A lead deleted upstream during the walk shifts
+        the offsets of the later pages, so a live lead can be missed: each one
+        is confirmed by id, and only those answering 404 are removed.
+        """
+        if not ids:
+            return 0
+        found = await self.inner.retrieve_many([int(id) for id in ids])
+        alive = [lead for lead in found.values() if isinstance(lead, Lead)]
+        gone = [
+            (str(id), epoch) for id, result in found.items()
+            if isinstance(result, HTTPException) and result.status_code == 404
+        ]
+        changes = self._upsert(alive, epoch, since)
+        cursor = self.db.executemany("DELETE FROM leads WHERE id = ? AND sync_epoch < ?", gone)
+        return changes + max(cursor.rowcount, 0)
+
+    def _upsert(self, leads: Iterable[Lead], epoch: Optional[int] = None, since: Optional[float] = None) -> int:
+        """
+        Writes `leads` locally, or as read by a sync started at `since`,
+        which skips the rows written or deleted locally after it.
+        """
+        epoch = self._epoch if epoch is None else epoch
+        if since is None:
+            sql, updated_at, guard = UPSERT, time.time(), ()
+        else:
+            sql, updated_at, guard = SYNC_UPSERT, None, (since,)
+            deleted = {
+                row[0] for row in self.db.execute("SELECT id FROM deleted_leads WHERE deleted_at >= ?", (since,))
+            }
+            leads = [lead for lead in leads if str(lead.id) not in deleted]
+        self.db.execute("BEGIN")
+        try:
+            cursor = self.db.executemany(
+                sql,
+                [
+                    (str(lead.id), *(getattr(lead, field) for field in CONTENT_FIELDS), epoch, updated_at, *guard)
+                    for lead in leads
+                ],
+            )
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+        return cursor.rowcount
+
+    def _remove(self, id):
+        self.db.execute("BEGIN")
+        self.db.execute("DELETE FROM leads WHERE id = ?", (str(id),))
+        self.db.execute(
+            "INSERT INTO deleted_leads (id, deleted_at) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET deleted_at = excluded.deleted_at",
+            (str(id), time.time()),
+        )
+        self.db.execute("COMMIT")
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_state(self, key: str, value: Any):
+        self.db.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    @staticmethod
+    def _to_lead(row) -> Lead:
+        return Lead(**dict(zip(FIELDS, row, strict=True)))
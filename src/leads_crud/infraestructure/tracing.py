@@ -0,0 +1,314 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+# none, file or otlp
+TRACE_EXPORTER = config("LEAD_TRACE_EXPORTER", default="none")
+TRACE_SAMPLE_RATE = config("LEAD_TRACE_SAMPLE_RATE", default=1.0, cast=float)
+TRACE_FILE = config("LEAD_TRACE_FILE", default=os.path.join(tempfile.gettempdir(), "lead-traces.jsonl"))
+TRACE_OTLP_ENDPOINT = config("LEAD_TRACE_OTLP_ENDPOINT", default="http://127.0.0.1:4318/v1/traces")
+TRACE_BATCH_SIZE = config("LEAD_TRACE_BATCH_SIZE", default=512, cast=int)
+TRACE_FLUSH_INTERVAL = config("LEAD_TRACE_FLUSH_INTERVAL", default=5.0, cast=float)
+TRACE_MAX_QUEUE = config("LEAD_TRACE_MAX_QUEUE", default=8192, cast=int)
+TRACE_SERVICE_NAME = config("LEAD_TRACE_SERVICE_NAME", default="leads-crud")
+
+# OTLP span kinds and status codes.
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_ERROR = 0, 2
+
+TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Trace id, parent span id and sampled flag of a W3C traceparent header, None if invalid."""
+    match = TRACEPARENT.match(value.strip().lower()) if value else None
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "status")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = {}
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def fail(self, description: str):
+        self.status = STATUS_ERROR
+        self.attributes.setdefault("error.type", description)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("lead_current_span", default=None)
+
+
+class _NoopScope:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+NOOP = _NoopScope()
+
+
+class _SpanScope:
+    __slots__ = ("tracer", "span", "token", "started")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        # Wall-clock start for the exporter, monotonic clock for the duration.
+        self.span.start_ns = time.time_ns()
+        self.started = time.perf_counter_ns()
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.span.end_ns = self.span.start_ns + time.perf_counter_ns() - self.started
+        _current.reset(self.token)
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.span.fail(exc_type.__name__)
+        self.tracer.finish(self.span)
+        return False
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """An OTLP/HTTP JSON export request holding `spans`."""
+    def attribute(key, value):
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": [attribute("service.name", service_name)]},
+        "scopeSpans": [{
+            "scope": {"name": "leads_crud"},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attribute(key, value) for key, value in span.attributes.items()],
+                "status": {"code": span.status},
+            } for span in spans],
+        }],
+    }]}
+
+
+class FileSpanExporter:
+    """Appends one OTLP JSON export request per batch to a JSON lines file."""
+    def __init__(self, path: str = TRACE_FILE, service_name: str = TRACE_SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+
+    async def export(self, spans: List[Span]):
+        with open(self.path, "a") as file:
+            file.write(json.dumps(to_otlp(spans, self.service_name), separators=(",", ":")) + "\n")
+
+    async def close(self):
+        pass
+
+
+class OtlpSpanExporter:
+    """Posts batches to an OTLP/HTTP collector in the JSON encoding."""
+    def __init__(self, endpoint: str = TRACE_OTLP_ENDPOINT, service_name: str = TRACE_SERVICE_NAME):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        # Not the Hunter pool: exports must not use its connections or show in its metrics.
+        self.client = httpx.AsyncClient(timeout=5.0)
+
+    async def export(self, spans: List[Span]):
+        response = await self.client.post(self.endpoint, json=to_otlp(spans, self.service_name))
+        response.raise_for_status()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class Tracer:
+    """
+    Records spans of sampled requests and exports them in batches.
+    A trace starts at the HTTP server span, sampled at `sample_rate` unless
+    the caller's traceparent decides; `span` only records inside a trace,
+    so code running outside of requests costs a context variable lookup.
+    Finished spans are exported every `flush_interval` seconds or once
+    `batch_size` are waiting; beyond `max_queue`, new spans are dropped.
+    """
+    def __init__(
+        self,
+        exporter: Optional[Any] = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        batch_size: int = TRACE_BATCH_SIZE,
+        flush_interval: float = TRACE_FLUSH_INTERVAL,
+        max_queue: int = TRACE_MAX_QUEUE,
+    ):
+        self.exporter = exporter
+        self.enabled = exporter is not None
+        self.sample_rate = sample_rate
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max(self.batch_size, max_queue)
+        self.pending: List[Span] = []
+        self.exported = 0
+        self.dropped = 0
+        self.failed_exports = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def start_trace(self, name: str, kind: int = SERVER, traceparent: Optional[str] = None):
+        """Scope of the root span of a request, continuing the caller's trace if any."""
+        if not self.enabled:
+            return NOOP
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = _new_id(128), None, random.random() < self.sample_rate
+        if not sampled:
+            return NOOP
+        return _SpanScope(self, Span(name, kind, trace_id, parent_id))
+
+    def span(self, name: str, kind: int = INTERNAL):
+        """Scope of a child of the current span; does nothing outside a trace."""
+        parent = _current.get()
+        if parent is None:
+            return NOOP
+        return _SpanScope(self, Span(name, kind, parent.trace_id, parent.span_id))
+
+    def finish(self, span: Span):
+        if len(self.pending) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.pending.append(span)
+        if len(self.pending) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def start(self):
+        if self.enabled:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def flush(self):
+        spans, self.pending = self.pending, []
+        if not spans:
+            return
+        try:
+            await self.exporter.export(spans)
+            self.exported += len(spans)
+        except Exception:
+            self.failed_exports += 1
+            logger.warning("Exporting %d spans failed", len(spans), exc_info=True)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.enabled:
+            await self.flush()
+            await self.exporter.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self.pending),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed_exports": self.failed_exports,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+
+def traced(name: Optional[str] = None, kind: int = INTERNAL):
+    """Decorator recording each call of a function, sync or async, as a span named `name` (its qualified name by default)."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current.get() is None:
+                    return await fn(*args, **kwargs)
+                with tracer.span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Outside a trace the call goes straight through.
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def create_exporter(kind: str = TRACE_EXPORTER):
+    if kind == "file":
+        return FileSpanExporter()
+    if kind == "otlp":
+        return OtlpSpanExporter()
+    if kind not in ("", "none"):
+        raise ValueError(f"Unknown LEAD_TRACE_EXPORTER {kind!r}, expected none, file or otlp")
+    return None
+
+
+tracer = Tracer(create_exporter())
@@ -0,0 +1,144 @@
+import codecs
+import csv
+import re
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+CsvRow = Union[Dict[str, Optional[str]], csv.Error]
+
+# Line ends csv.reader accepts, a bare CR included (old Excel and Mac exports).
+LINE_END = re.compile(r"\r\n|\r|\n")
+
+
+def _parse_record(record: str):
+    return next(csv.reader([record]))
+
+
+def _open_quote(line: str, quoted: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of `line`, given whether
+    one was open at its start. Quotes are read as csv.reader reads them:
+    they open a field only at its start, and inside one a doubled quote is a
+    literal quote.
+    """
+    if not quoted and '"' not in line:
+        return False
+    field_start = not quoted
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if quoted:
+            if char == '"':
+                if line.startswith('"', index + 1):
+                    index += 1
+                else:
+                    quoted = False
+        elif char == '"' and field_start:
+            quoted = True
+        field_start = char == "," and not quoted
+        index += 1
+    return quoted
+
+
+class _Records:
+    """Turns complete CSV records into numbered rows keyed by the header."""
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.row = 0
+
+    def fail(self, error: csv.Error) -> Tuple[int, CsvRow]:
+        if self.header is None:
+            raise error
+        self.row += 1
+        return self.row, error
+
+    def complete(self, text: str) -> Optional[Tuple[int, CsvRow]]:
+        if not text.strip():
+            return None
+        try:
+            values = _parse_record(text)
+        except csv.Error as exc:
+            return self.fail(exc)
+        if self.header is None:
+            self.header = [name.strip().lower() for name in values]
+            return None
+        self.row += 1
+        # Ragged rows are expected: missing cells are absent, extra ones dropped.
+        return self.row, {name: (value or None) for name, value in zip(self.header, values, strict=False)}
+
+
+def _split_lines(text: str, final: bool) -> Tuple[List[str], str]:
+    """
+    The complete lines of `text`, with their line ends, and the rest. Unless
+    `final`, a trailing CR is left in the rest: it may start a CRLF.
+    """
+    lines = []
+    start = 0
+    for match in LINE_END.finditer(text):
+        if not final and match.end() == len(text) and match.group() == "\r":
+            break
+        lines.append(text[start:match.end()])
+        start = match.end()
+    return lines, text[start:]
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8-sig",
+) -> AsyncIterator[Tuple[int, CsvRow]]:
+    """
+    Parses a CSV byte stream record by record without buffering it whole.
+    The first record is the header; every following record is yielded as
+    `(row number, {column: value})`, empty cells being None. A record the
+    csv module rejects is yielded as its csv.Error so the caller can report
+    it and go on. A line or record longer than csv.field_size_limit() is
+    reported the same way, then dropped: parsing resumes at the next line.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    records = _Records()
+    pending = ""
+    record: List[str] = []
+    record_size = 0
+    quoted = False
+    # Set while dropping the rest of an over-long line.
+    skipping = False
+
+    def parse(lines: List[str]):
+        nonlocal record, record_size, quoted, skipping
+        limit = csv.field_size_limit()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            record.append(line)
+            record_size += len(line)
+            # A line end inside a quoted field belongs to the field.
+            quoted = _open_quote(line, quoted)
+            if quoted:
+                if record_size > limit:
+                    record, record_size, quoted = [], 0, False
+                    yield records.fail(csv.Error(f"record larger than field limit ({limit})"))
+                continue
+            parsed = records.complete("".join(record))
+            record, record_size = [], 0
+            if parsed is not None:
+                yield parsed
+
+    async for chunk in chunks:
+        lines, pending = _split_lines(pending + decoder.decode(chunk), final=False)
+        for parsed in parse(lines):
+            yield parsed
+        limit = csv.field_size_limit()
+        if len(pending) > limit:
+            if not skipping:
+                record, record_size, quoted = [], 0, False
+                yield records.fail(csv.Error(f"line larger than field limit ({limit})"))
+            pending, skipping = "", True
+
+    lines, pending = _split_lines(pending + decoder.decode(b"", final=True), final=True)
+    for parsed in parse(lines + [pending]):
+        yield parsed
+    if record:
+        # A quoted field still open at the end of the stream.
+        parsed = records.complete("".join(record))
+        if parsed is not None:
+            yield parsed
@@ -1,30 +1,104 @@
+import csv
+import hmac
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
 import inject
-from fastapi import FastAPI, Path
+from decouple import config
+from fastapi import Body, FastAPI, HTTPException, Path, Query, Request, Response
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 
+from leads_crud.application.coalescing import WriteCoalescer
+from leads_crud.application.concurrency import map_unordered
+from leads_crud.application.jobs import JobRunner
+from leads_crud.application.service import BulkCreateLeadService
 from leads_crud.application.service import CreateLeadService
+from leads_crud.application.service import PeekLeadService
 from leads_crud.application.service import RetrieveLeadService
+from leads_crud.application.service import RetrieveLeadFieldsService
+from leads_crud.application.service import RetrieveManyLeadsService
 from leads_crud.application.service import UpdateLeadService
 from leads_crud.application.service import DeleteLeadService
+from leads_crud.application.service import ListLeadsService
+from leads_crud.application.service import RepositoryStatsService
+from leads_crud.application.service import SearchLeadsService
+from leads_crud.domain.job import COMPLETED, FAILED
+from leads_crud.domain.lead import Lead
 from leads_crud.domain.repositories import ILeadCRUD
-from leads_crud.infraestructure.hunter.hunter import HunterLeadCrud
+from leads_crud.infraestructure.cache.lead_cache import CACHE_BACKEND, CACHE_ENABLED, CachedLeadCrud
+from leads_crud.infraestructure.cache.sqlite_cache import SqliteLeadCache
+from leads_crud.infraestructure.hunter.client import pool
+from leads_crud.infraestructure.hunter.hunter import LIST_PAGE_SIZE, HunterLeadCrud
+from leads_crud.infraestructure.metrics import registry
+from leads_crud.infraestructure.tracing import tracer
+from leads_crud.infraestructure.sqlite.job_store import SqliteJobStore
+from leads_crud.infraestructure.sqlite.mirror import MIRROR_PATH, SqliteLeadMirror
+from leads_crud.presentation.csv_stream import iter_csv_rows
+from leads_crud.presentation.exporters import EXPORT_FORMATS, gzipped
+from leads_crud.presentation.job_handlers import JOB_HANDLERS, export_filename
 from leads_crud.presentation.mappers import EndpointMapper
-from leads_crud.presentation.serializers import LeadInput, LeadOutput
+from leads_crud.presentation.metrics import MetricsMiddleware
+from leads_crud.presentation.profiling import PROFILE_HEADER, PROFILE_TOKEN, ProfilingMiddleware, profiles
+from leads_crud.presentation.tracing import TracingMiddleware
+from leads_crud.presentation.responses import DuplexStreamingResponse
+from leads_crud.presentation.serializers import BulkCreateOutput, BulkLeadResult, LeadIdError, LeadInput, LeadOutput
+from leads_crud.presentation.serializers import JobInput, JobItemOutput, JobOutput
+from leads_crud.presentation.serializers import LeadSearchOutput, MultiLeadOutput, ProfileOutput
+
+BULK_CONCURRENCY = config("LEAD_BULK_CONCURRENCY", default=20, cast=int)
+BULK_MAX_ITEMS = config("LEAD_BULK_MAX_ITEMS", default=50000, cast=int)
+MULTI_GET_MAX_IDS = config("LEAD_MULTI_GET_MAX_IDS", default=1000, cast=int)
+FAST_READS = config("LEAD_FAST_READS", default=True, cast=bool)
+# Empty to leave the header out.
+READ_CACHE_CONTROL = config("LEAD_READ_CACHE_CONTROL", default="no-cache")
 
 
 # Configure dependency injection
 def configure_injection(binder):
-    binder.bind(ILeadCRUD, HunterLeadCrud())
+    repo = HunterLeadCrud()
+    if MIRROR_PATH:
+        repo = SqliteLeadMirror(repo)
+    if CACHE_ENABLED:
+        repo = CachedLeadCrud(repo, SqliteLeadCache() if CACHE_BACKEND == "sqlite" else None)
+    binder.bind(ILeadCRUD, repo)
+    binder.bind(WriteCoalescer, WriteCoalescer(repo))
+    binder.bind(JobRunner, JobRunner(
+        SqliteJobStore(),
+        JOB_HANDLERS,
+        describe_error=lambda exc: EndpointMapper.to_error(exc).model_dump(),
+    ))
 
 # Initialize injection
 inject.configure(configure_injection)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool.open()
+    await tracer.start()
+    repo = inject.instance(ILeadCRUD)
+    await repo.start()
+    jobs = inject.instance(JobRunner)
+    await jobs.start()
+    yield
+    await jobs.close()
+    await inject.instance(WriteCoalescer).close()
+    await repo.close()
+    await tracer.close()
+    await pool.close()
+
+
 app = FastAPI(
     title="Lead API Integration",
     description="API service for email discovery and verification",
     version="1.0.0",
     docs_url="/docs",  # Custom docs URL
+    lifespan=lifespan,
 )
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 @app.post("/leads",
     response_model=LeadOutput,
@@ -37,29 +111,289 @@ async def create(input : LeadInput) -> LeadOutput:
     output = EndpointMapper.to_client(outlead)
     return output
 
+@app.post("/leads/bulk",
+    response_model=BulkCreateOutput,
+    description = "Create many leads at once, reporting the result of every item",
+)
+async def bulk_create(
+    inputs : List[LeadInput] = Body(
+        max_length=BULK_MAX_ITEMS,
+    ),
+) -> BulkCreateOutput:
+    results: List[BulkLeadResult] = []
+    leads, positions = [], []
+    for index, input in enumerate(inputs):
+        try:
+            leads.append(EndpointMapper.to_entity(input))
+            positions.append(index)
+        except HTTPException as exc:
+            results.append(BulkLeadResult(index=index, error=EndpointMapper.to_error(exc)))
+
+    service = BulkCreateLeadService()
+    outleads = await service.execute(leads, concurrency=BULK_CONCURRENCY)
+    for index, outlead in zip(positions, outleads, strict=True):
+        if not isinstance(outlead, Exception):
+            try:
+                results.append(BulkLeadResult(index=index, lead=EndpointMapper.to_client(outlead)))
+                continue
+            except ValidationError as exc:
+                outlead = exc
+        results.append(BulkLeadResult(index=index, error=EndpointMapper.to_error(outlead)))
+
+    results.sort(key=lambda result: result.index)
+    created = sum(1 for result in results if result.error is None)
+    return BulkCreateOutput(created=created, failed=len(results)-created, results=results)
+
+@app.post("/leads/import",
+    response_class=DuplexStreamingResponse,
+    description = "Create leads from a CSV body (header row with lead field names), "
+        "streaming one NDJSON result line per row as soon as it completes",
+)
+async def import_csv(request : Request):
+    service = CreateLeadService()
+
+    async def create_row(item):
+        _, row = item
+        if isinstance(row, csv.Error):
+            raise HTTPException(
+                status_code=400,
+                detail="Malformed CSV row: "+str(row),
+            )
+        lead = EndpointMapper.to_entity(EndpointMapper.row_to_input(row))
+        outlead = await service.execute(lead)
+        return EndpointMapper.to_client(outlead)
+
+    async def lines():
+        rows = iter_csv_rows(request.stream())
+        try:
+            async for (row, _), result in map_unordered(rows, create_row, BULK_CONCURRENCY):
+                yield EndpointMapper.to_import_line(row, result)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            yield EndpointMapper.to_import_line(0, HTTPException(
+                status_code=400,
+                detail="Unreadable CSV: "+str(exc),
+            ))
+
+    return DuplexStreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/leads/export",
+    response_class=StreamingResponse,
+    description = "Export every lead as CSV, NDJSON or columnar NDJSON, optionally gzip compressed",
+)
+async def export(
+    format:Literal["csv", "ndjson", "columnar"] = Query(
+        default="csv",
+        title="output format",
+    ),
+    compression:Optional[Literal["gzip"]] = Query(
+        default=None,
+        title="compress the stream on the fly",
+    ),
+    page_size:int = Query(
+        default=LIST_PAGE_SIZE,
+        title="leads fetched from Hunter per page",
+        gt=0,
+        le=1000,
+    ),
+):
+    serializer, media_type, extension = EXPORT_FORMATS[format]
+    service = ListLeadsService()
+    # A later page failing aborts the download, so a cut file is never sent as complete.
+    body = serializer(await started(service.execute(page_size)))
+    if media_type == "application/x-ndjson":
+        body = EndpointMapper.with_error_line(body)
+    filename = "leads."+extension
+    if compression == "gzip":
+        body = gzipped(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/leads/search",
+    response_model=LeadSearchOutput,
+    description = "Search leads by exact email, company or position prefix and full text",
+)
+async def search(
+    email:Optional[str] = Query(
+        default=None,
+        title="exact email, case-insensitive",
+    ),
+    company:Optional[str] = Query(
+        default=None,
+        title="company name prefix, case-insensitive",
+    ),
+    position:Optional[str] = Query(
+        default=None,
+        title="position prefix, case-insensitive",
+    ),
+    q:Optional[str] = Query(
+        default=None,
+        title="words that must all start a word of the lead",
+        max_length=200,
+    ),
+    limit:int = Query(
+        default=100,
+        title="maximum number of leads returned",
+        gt=0,
+        le=1000,
+    ),
+    offset:int = Query(
+        default=0,
+        title="number of matching leads skipped",
+        ge=0,
+    ),
+) -> LeadSearchOutput:
+    if email is None and company is None and position is None and q is None:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of email, company, position or q is required",
+        )
+
+    service = SearchLeadsService()
+    outleads = await service.execute(email, company, position, q, limit, offset)
+
+    leads = []
+    for outlead in outleads:
+        try:
+            leads.append(EndpointMapper.to_client(outlead))
+        except ValidationError:
+            # Mirrored leads may lack fields LeadOutput requires, they are sent as stored.
+            leads.append(EndpointMapper.to_partial_client(outlead))
+    return LeadSearchOutput(leads=leads)
+
+@app.get("/leads",
+    response_model=MultiLeadOutput,
+    description = "Retrieve several leads by id, or stream every lead as NDJSON when no ids are given",
+    responses={200: {
+        "description": "The requested leads as JSON, or every lead as one NDJSON line each when no ids are given",
+        "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+    }},
+)
+async def retrieve_many(
+    ids:Optional[str] = Query(
+        default=None,
+        title="comma separated lead ids",
+        examples=["1,2,3"],
+    ),
+    page_size:int = Query(
+        default=LIST_PAGE_SIZE,
+        title="leads fetched from Hunter per page when streaming",
+        gt=0,
+        le=1000,
+    ),
+):
+    if ids is None:
+        service = ListLeadsService()
+        pages = await started(service.execute(page_size))
+        return StreamingResponse(
+            EndpointMapper.to_ndjson(pages),
+            media_type="application/x-ndjson",
+        )
+
+    unique_ids = EndpointMapper.to_ids(ids, MULTI_GET_MAX_IDS)
+    service = RetrieveManyLeadsService()
+    outleads = await service.execute(unique_ids)
+
+    leads, errors = [], []
+    for id in unique_ids:
+        outlead = outleads[id]
+        if not isinstance(outlead, Exception):
+            try:
+                leads.append(EndpointMapper.to_client(outlead))
+                continue
+            except ValidationError as exc:
+                outlead = exc
+        error = EndpointMapper.to_error(outlead)
+        errors.append(LeadIdError(id=id, **error.model_dump()))
+    return MultiLeadOutput(leads=leads, errors=errors)
+
+async def started(pages : AsyncIterator[List[Lead]]) -> AsyncIterator[List[Lead]]:
+    """
+    The same pages, the first one already fetched: an upstream failure on it
+    is raised here, before the 200 of a streaming response is sent.
+    """
+    iterator = aiter(pages)
+    try:
+        first = await anext(iterator)
+    except StopAsyncIteration:
+        return iterator
+
+    async def resumed():
+        yield first
+        async for page in iterator:
+            yield page
+    return resumed()
+
+def read_headers(etag : str) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if READ_CACHE_CONTROL:
+        headers["Cache-Control"] = READ_CACHE_CONTROL
+    return headers
+
+def not_modified(request : Request, etag : str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    # Weak comparison, as RFC 9110 asks for If-None-Match.
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
 @app.get("/leads/{id}",
     response_model=LeadOutput,
-    description = "Retrieve lead by id",
+    description = "Retrieve lead by id (304 when If-None-Match holds its current ETag)",
+    responses={304: {"description": "The lead did not change"}},
 )
 async def retrieve(
+    request : Request,
+    response : Response,
     id:int = Path(
     title="lead id",
     gt=0
     ),
 ) -> LeadOutput:
+    if "if-none-match" in request.headers:
+        # A lead known locally answers an unchanged poll without calling Hunter.
+        service = PeekLeadService()
+        lead = await service.execute(id)
+        if lead is not None:
+            etag = EndpointMapper.to_etag(lead.__dict__)
+            if not_modified(request, etag):
+                return Response(status_code=304, headers=read_headers(etag))
+
+    if FAST_READS:
+        # The body is encoded from the lead fields; no model is built or validated.
+        service = RetrieveLeadFieldsService()
+        fields = await service.execute(id)
+        etag = EndpointMapper.to_etag(fields)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=read_headers(etag))
+        return Response(
+            EndpointMapper.to_client_json(fields),
+            media_type="application/json",
+            headers=read_headers(etag),
+        )
 
     service = RetrieveLeadService()
     outlead = await service.execute(id)
+    etag = EndpointMapper.to_etag(outlead.__dict__)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=read_headers(etag))
+    response.headers.update(read_headers(etag))
     output = EndpointMapper.to_client(outlead)
     return output
 
 @app.put(
     "/leads/{id}",
-    description = "Modify specified fields of a lead",
+    description = "Modify specified fields of a lead (202 when the update is buffered)",
     status_code= 204
 )
 async def update(
     input:LeadInput,
+    response:Response,
     id:int = Path(
         title="lead id",
         gt=0
@@ -67,7 +401,8 @@ async def update(
 ):
     lead = EndpointMapper.to_entity(input)
     service = UpdateLeadService()
-    await service.execute(id=id, lead=lead)
+    if await service.execute(id=id, lead=lead):
+        response.status_code = 202
     return
 
 @app.delete(
@@ -85,5 +420,155 @@ async def delete(
     await service.execute(id=id)
     return
 
+@app.post("/jobs",
+    response_model=JobOutput,
+    status_code=202,
+    description = "Run a bulk create, update, delete or an export in the background; poll GET /jobs/{id} for progress",
+)
+async def submit_job(
+    input : JobInput = Body(discriminator="kind"),
+) -> JobOutput:
+    if input.kind == "export":
+        job = inject.instance(JobRunner).submit("export", params=input.model_dump(exclude={"kind"}))
+        return EndpointMapper.to_job(job, [])
+
+    if len(input.items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_MAX_ITEMS} items can be submitted at once",
+        )
+    if input.kind == "delete":
+        payloads = input.items
+    else:
+        payloads = [item.model_dump(exclude_none=True) for item in input.items]
+    job = inject.instance(JobRunner).submit(input.kind, payloads)
+    return EndpointMapper.to_job(job, [])
 
+@app.get("/jobs/{id}",
+    response_model=JobOutput,
+    description = "Progress, throughput and failed items of a job",
+)
+async def get_job(
+    id:str = Path(
+        title="job id",
+    ),
+    failures:int = Query(
+        default=100,
+        title="maximum number of failed items returned",
+        ge=0,
+        le=1000,
+    ),
+) -> JobOutput:
+    runner = inject.instance(JobRunner)
+    job = runner.get(id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="job not found",
+        )
+    failed_items = runner.store.items(id, status=FAILED, limit=failures) if failures and job.failed else []
+    return EndpointMapper.to_job(job, failed_items)
 
+@app.get("/jobs/{id}/items",
+    response_model=List[JobItemOutput],
+    description = "Outcome of the items of a job, in submission order",
+)
+async def get_job_items(
+    id:str = Path(
+        title="job id",
+    ),
+    status:Optional[Literal["pending", "succeeded", "failed"]] = Query(
+        default=None,
+        title="only return items in this state",
+    ),
+    offset:int = Query(
+        default=0,
+        ge=0,
+    ),
+    limit:int = Query(
+        default=100,
+        gt=0,
+        le=1000,
+    ),
+) -> List[JobItemOutput]:
+    runner = inject.instance(JobRunner)
+    if runner.get(id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="job not found",
+        )
+    items = runner.store.items(id, status=status, offset=offset, limit=limit)
+    return [EndpointMapper.to_job_item(item) for item in items]
+
+@app.get("/jobs/{id}/result",
+    response_class=FileResponse,
+    description = "Download the output of a completed export job",
+)
+async def get_job_result(
+    id:str = Path(
+        title="job id",
+    ),
+):
+    job = inject.instance(JobRunner).get(id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="job not found",
+        )
+    if job.status != COMPLETED or job.result is None:
+        raise HTTPException(
+            status_code=409,
+            detail="job has no result yet",
+        )
+    return FileResponse(job.result, filename=export_filename(job))
+
+@app.get(
+    "/stats",
+    description = "Counters of the lead repository layers (cache, upstream) and write coalescing",
+)
+async def stats() -> Dict[str, Any]:
+    service = RepositoryStatsService()
+    return await service.execute()
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    description = "Request, mapping and upstream metrics in the Prometheus text format",
+)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def check_profile_access(request : Request):
+    # Profiles hold stack samples of the service: never served without a token.
+    if not PROFILE_TOKEN:
+        raise HTTPException(
+            status_code=404,
+            detail="Not Found",
+        )
+    if not hmac.compare_digest(request.headers.get(PROFILE_HEADER, "").encode("latin-1"), PROFILE_TOKEN.encode()):
+        raise HTTPException(
+            status_code=403,
+            detail="profiles require the X-Profile header",
+        )
+
+@app.get(
+    "/profiles",
+    response_model=List[ProfileOutput],
+    description = "Profiles captured for recent requests, newest first",
+)
+async def list_profiles(request : Request) -> List[ProfileOutput]:
+    check_profile_access(request)
+    return [EndpointMapper.to_profile(profile) for profile in profiles.list()]
+
+@app.get(
+    "/profiles/{id}",
+    description = "Download a request profile as folded stacks (flamegraph.pl, speedscope, inferno)",
+)
+async def get_profile(request : Request, id : str) -> FileResponse:
+    check_profile_access(request)
+    if profiles.get(id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="profile not found",
+        )
+    return FileResponse(profiles.path(id), media_type="text/plain", filename=id+".folded")
@@ -0,0 +1,58 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, List, Tuple
+
+from leads_crud.domain.lead import Lead
+from leads_crud.infraestructure.json_codec import dumps
+
+EXPORT_FIELDS = ("id", "email", "first_name", "last_name", "position", "company")
+
+
+async def to_csv(pages: AsyncIterable[List[Lead]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    async for page in pages:
+        writer.writerows([getattr(lead, field) for field in EXPORT_FIELDS] for lead in page)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def to_ndjson(pages: AsyncIterable[List[Lead]]) -> AsyncIterator[bytes]:
+    async for page in pages:
+        yield b"".join(
+            dumps({field: getattr(lead, field) for field in EXPORT_FIELDS})+b"\n"
+            for lead in page
+        )
+
+
+async def to_columnar(pages: AsyncIterable[List[Lead]]) -> AsyncIterator[bytes]:
+    """
+    Column-oriented NDJSON: a schema line, then one row group per page
+    holding an array of values for every field.
+    """
+    yield dumps({"fields": EXPORT_FIELDS})+b"\n"
+    async for page in pages:
+        group = {"rows": len(page)}
+        for field in EXPORT_FIELDS:
+            group[field] = [getattr(lead, field) for lead in page]
+        yield dumps(group)+b"\n"
+
+
+async def gzipped(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# format name -> (serializer, media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[Callable[[AsyncIterable[List[Lead]]], AsyncIterator[bytes]], str, str]] = {
+    "csv": (to_csv, "text/csv", "csv"),
+    "ndjson": (to_ndjson, "application/x-ndjson", "ndjson"),
+    "columnar": (to_columnar, "application/x-ndjson", "columnar.ndjson"),
+}
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from decouple import config
+
+from leads_crud.application.jobs import ItemJob, TaskJob
+from leads_crud.application.service import CreateLeadService
+from leads_crud.application.service import DeleteLeadService
+from leads_crud.application.service import ListLeadsService
+from leads_crud.application.service import UpdateLeadService
+from leads_crud.domain.job import Job
+from leads_crud.domain.lead import Lead
+from leads_crud.presentation.exporters import EXPORT_FORMATS, gzipped
+from leads_crud.presentation.mappers import EndpointMapper
+from leads_crud.presentation.serializers import LeadInput, UpdateJobItem
+
+JOB_EXPORT_DIR = config("LEAD_JOB_EXPORT_DIR", default=tempfile.gettempdir())
+
+
+async def create_item(payload: Dict[str, Any]) -> Dict[str, Any]:
+    lead = EndpointMapper.to_entity(LeadInput.model_validate(payload))
+    outlead = await CreateLeadService().execute(lead)
+    return EndpointMapper.to_client(outlead).model_dump()
+
+
+async def update_item(payload: Dict[str, Any]) -> Dict[str, Any]:
+    item = UpdateJobItem.model_validate(payload)
+    lead = EndpointMapper.to_entity(item)
+    deferred = await UpdateLeadService().execute(id=item.id, lead=lead)
+    return {"deferred": deferred}
+
+
+async def delete_item(payload: int) -> None:
+    await DeleteLeadService().execute(id=payload)
+
+
+def export_filename(job: Job) -> str:
+    _, _, extension = EXPORT_FORMATS[job.params["format"]]
+    filename = "leads."+extension
+    if job.params.get("compression") == "gzip":
+        filename += ".gz"
+    return filename
+
+
+def export_path(job: Job) -> str:
+    return os.path.join(JOB_EXPORT_DIR, job.id+"-"+export_filename(job))
+
+
+async def export_job(job: Job, progress: Callable[[int], None]) -> Optional[str]:
+    serializer, _, _ = EXPORT_FORMATS[job.params["format"]]
+
+    async def pages() -> AsyncIterator[List[Lead]]:
+        async for page in ListLeadsService().execute(job.params["page_size"]):
+            yield page
+            progress(len(page))
+
+    body = serializer(pages())
+    if job.params.get("compression") == "gzip":
+        body = gzipped(body)
+
+    # Written next to the final file and renamed once complete, so a
+    # download never sees a partial export.
+    path = export_path(job)
+    partial = path+".partial"
+    with open(partial, "wb") as output:
+        async for chunk in body:
+            output.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+def discard_export(job: Job):
+    path = export_path(job)
+    for leftover in (path, path+".partial"):
+        try:
+            os.remove(leftover)
+        except FileNotFoundError:
+            pass
+
+
+JOB_HANDLERS = {
+    "create": ItemJob(create_item),
+    "update": ItemJob(update_item),
+    "delete": ItemJob(delete_item),
+    "export": TaskJob(export_job, discard_export),
+}
@@ -1,30 +1,172 @@
+import hashlib
+import time
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
 from pydantic import ValidationError
 from fastapi import HTTPException
 
+from leads_crud.domain.job import Job, JobItem
 from leads_crud.domain.lead import Lead
-from leads_crud.presentation.serializers import LeadInput, LeadOutput
+from leads_crud.infraestructure.json_codec import dumps
+from leads_crud.infraestructure.metrics import mapping_duration, timed
+from leads_crud.infraestructure.tracing import traced
+from leads_crud.presentation import exporters
+from leads_crud.presentation.serializers import ImportRowResult, JobItemOutput, JobOutput, LeadError, LeadInput, LeadOutput
+from leads_crud.presentation.serializers import PartialLeadOutput, ProfileOutput
+
+INPUT_FIELDS = tuple(LeadInput.model_fields)
+OUTPUT_FIELDS = tuple(name for name in LeadOutput.model_fields if name != "datetime")
+
+_timestamp = (0, "")
+
+
+def current_timestamp() -> str:
+    """The local time stamped on responses, formatted once per second."""
+    global _timestamp
+    second = int(time.time())
+    if _timestamp[0] != second:
+        _timestamp = (second, time.strftime("%d/%m/%Y, %H:%M:%S", time.localtime(second)))
+    return _timestamp[1]
 
 
 class EndpointMapper:
-    def to_entity(input: LeadInput) -> Lead:
+    def to_ids(ids : str, max_ids : int) -> List[int]:
         try:
-            lead = Lead.model_validate(input.model_dump())
-        except ValidationError:
-            raise HTTPException from None(
+            parsed = [int(id) for id in ids.split(",") if id.strip()]
+        except ValueError:
+            raise HTTPException(
                 status_code=400,
-                detail="Invalid request arguments",
+                detail="ids must be a comma separated list of integers",
+            ) from None
+
+        if not parsed or any(id <= 0 for id in parsed):
+            raise HTTPException(
+                status_code=400,
+                detail="ids must be positive integers",
+            )
+        unique_ids = list(dict.fromkeys(parsed))
+        if len(unique_ids) > max_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {max_ids} ids can be requested at once",
             )
+        return unique_ids
+
 
-        if all(value is None for value in lead.model_dump().values()):
+    @traced("EndpointMapper.to_entity")
+    @timed(mapping_duration, "endpoint", "to_entity")
+    def to_entity(input: LeadInput) -> Lead:
+        fields = {name: getattr(input, name) for name in INPUT_FIELDS}
+        if all(value is None for value in fields.values()):
             raise HTTPException(
                 status_code=400,
                 detail="All fields are None, invalid lead data",
             )
+        # Validating a plain dict in pydantic-core is cheaper than model_construct.
+        return Lead.model_validate(fields)
 
-        return lead
+    def row_to_input(row : Dict[str, Optional[str]]) -> LeadInput:
+        fields = {name: row[name] for name in LeadInput.model_fields if row.get(name)}
+        try:
+            return LeadInput.model_validate(fields)
+        except ValidationError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid row values",
+            ) from None
+
+    @traced("EndpointMapper.to_client")
+    @timed(mapping_duration, "endpoint", "to_client")
     def to_client(lead : Lead) -> LeadOutput:
-        output = LeadOutput.model_validate(lead.model_dump())
-        time=datetime.now()
-        output.datetime = time.strftime("%d/%m/%Y, %H:%M:%S")
+        # Raises a ValidationError naming the fields the lead lacks.
+        return LeadOutput.model_validate({**lead.__dict__, "datetime": current_timestamp()})
+
+    def to_partial_client(lead : Lead) -> PartialLeadOutput:
+        return PartialLeadOutput.model_validate(lead.__dict__)
+
+    @traced("EndpointMapper.to_client_json")
+    @timed(mapping_duration, "endpoint", "to_client_json")
+    def to_client_json(fields : Dict[str, Any]) -> bytes:
+        """The body `to_client` would produce, encoded straight from the lead fields."""
+        output = {name: fields.get(name) for name in OUTPUT_FIELDS}
+        output["datetime"] = current_timestamp()
+        if not all(isinstance(value, str) for value in output.values()):
+            # Raises the ValidationError of to_client for leads lacking fields.
+            output = LeadOutput.model_validate(output).model_dump()
+        return dumps(output)
+
+    def to_etag(fields : Dict[str, Any]) -> str:
+        # Weak: the response timestamp changes every second, the lead does not.
+        digest = hashlib.blake2b(dumps([fields.get(name) for name in OUTPUT_FIELDS]), digest_size=12)
+        return 'W/"'+digest.hexdigest()+'"'
+
+    def to_error(exc : Exception) -> LeadError:
+        if isinstance(exc, HTTPException):
+            return LeadError(status_code=exc.status_code, detail=str(exc.detail))
+        if isinstance(exc, httpx.HTTPError):
+            return LeadError(status_code=502, detail="Upstream request failed: "+type(exc).__name__)
+        if isinstance(exc, ValidationError):
+            return LeadError(status_code=502, detail="Invalid lead data returned by upstream")
+        return LeadError(status_code=500, detail="Internal error")
+
+    def to_ndjson(pages : AsyncIterator[List[Lead]]) -> AsyncIterator[bytes]:
+        # The lines of the NDJSON export: listed leads may lack fields
+        # LeadOutput requires, they are sent as stored.
+        return EndpointMapper.with_error_line(exporters.to_ndjson(pages))
+
+    async def with_error_line(chunks : AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as exc:
+            # A failure after the 200 ends the stream with an error line, and the
+            # re-raise aborts the response, so it cannot pass for a complete one.
+            yield ('{"error":'+EndpointMapper.to_error(exc).model_dump_json()+"}\n").encode()
+            raise
+
+    def to_import_line(row : int, result : Any) -> bytes:
+        if isinstance(result, LeadOutput):
+            line = ImportRowResult(row=row, lead=result)
+        else:
+            line = ImportRowResult(row=row, error=EndpointMapper.to_error(result))
+        return (line.model_dump_json(exclude_none=True)+"\n").encode()
+
+    def to_job(job : Job, failures : List[JobItem]) -> JobOutput:
+        output = JobOutput(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            total=job.total,
+            succeeded=job.succeeded,
+            failed=job.failed,
+            created_at=EndpointMapper.to_timestamp(job.created_at),
+            failures=[EndpointMapper.to_job_item(item) for item in failures],
+        )
+        if job.started_at is not None:
+            elapsed = (job.finished_at or time.time()) - job.started_at
+            output.elapsed_seconds = round(elapsed, 3)
+            if elapsed > 0:
+                output.items_per_second = round((job.succeeded + job.failed) / elapsed, 3)
+        if job.finished_at is not None:
+            output.finished_at = EndpointMapper.to_timestamp(job.finished_at)
+        if job.result is not None:
+            output.result_url = "/jobs/"+job.id+"/result"
+        if job.error is not None:
+            output.error = LeadError(**job.error)
         return output
+
+    def to_job_item(item : JobItem) -> JobItemOutput:
+        return JobItemOutput(
+            index=item.index,
+            status=item.status,
+            result=item.result,
+            error=None if item.error is None else LeadError(**item.error),
+        )
+
+    def to_profile(profile : Dict[str, Any]) -> ProfileOutput:
+        return ProfileOutput(**{**profile, "created_at": EndpointMapper.to_timestamp(profile["created_at"])})
+
+    def to_timestamp(moment : float) -> str:
+        return datetime.fromtimestamp(moment).strftime("%d/%m/%Y, %H:%M:%S")
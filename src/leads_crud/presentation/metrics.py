@@ -0,0 +1,62 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from leads_crud.infraestructure.metrics import registry
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests by method, route and status",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Records the duration of every HTTP request by method, route template
+    and status, up to the last byte of the response body. Plain ASGI
+    middleware: it does not wrap requests or responses in extra objects.
+    A request failing before its response starts is recorded as a 500.
+    The metrics are process-wide, shared by every instance.
+    """
+    in_flight = 0
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        MetricsMiddleware.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            MetricsMiddleware.in_flight -= 1
+            # The router stores the matched route in the scope; templates keep the label set small.
+            route = scope.get("route")
+            request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status),
+            )
+
+
+registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    lambda: [((), MetricsMiddleware.in_flight)],
+)
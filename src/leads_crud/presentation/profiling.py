@@ -0,0 +1,121 @@
+import asyncio
+import hmac
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from decouple import config
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from leads_crud.infraestructure.profiling import StackSampler
+
+PROFILE_TOKEN = config("LEAD_PROFILE_TOKEN", default="")
+PROFILE_SAMPLE_RATE = config("LEAD_PROFILE_SAMPLE_RATE", default=0.0, cast=float)
+PROFILE_INTERVAL = config("LEAD_PROFILE_INTERVAL", default=0.001, cast=float)
+PROFILE_DIR = config("LEAD_PROFILE_DIR", default=os.path.join(tempfile.gettempdir(), "lead-profiles"))
+PROFILE_KEEP = config("LEAD_PROFILE_KEEP", default=100, cast=int)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+
+
+class ProfileStore:
+    """
+    Keeps the last `keep` profiles as folded stack files in `directory`;
+    older ones are deleted.
+    """
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def save(self, id: str, info: Dict[str, Any], folded: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(id), "w") as file:
+            file.write(folded)
+        self.profiles[id] = {"id": id, **info}
+        while len(self.profiles) > self.keep:
+            old, _ = self.profiles.popitem(last=False)
+            try:
+                os.remove(self.path(old))
+            except FileNotFoundError:
+                pass
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        return self.profiles.get(id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.profiles.values()))
+
+    def path(self, id: str) -> str:
+        return os.path.join(self.directory, id + ".folded")
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when it carries the `X-Profile: <LEAD_PROFILE_TOKEN>`
+    header, or at random with probability `sample_rate`. The request task is
+    sampled every `interval` seconds, waits included, and the profile is
+    stored in `store`; its id is returned in the X-Profile-Id header.
+    With no token and a zero rate, requests go straight through.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[ProfileStore] = None,
+        token: str = PROFILE_TOKEN,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        interval: float = PROFILE_INTERVAL,
+    ):
+        self.app = app
+        self.store = store if store is not None else profiles
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.sampler = StackSampler(interval)
+        self.enabled = bool(token or sample_rate > 0)
+
+    def wanted(self, scope: Scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                # Compared in constant time, so timing does not leak the token.
+                if name == PROFILE_HEADER.encode() and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.encode(), id.encode())]
+            await send(message)
+
+        created_at = time.time()
+        profile = self.sampler.start(asyncio.current_task())
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.sampler.stop(profile)
+            route = scope.get("route")
+            self.store.save(id, {
+                "method": scope["method"],
+                "route": getattr(route, "path", scope["path"]),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - profile.started) * 1000, 3),
+                "samples": sum(profile.samples.values()),
+                "created_at": created_at,
+            }, profile.folded())
+
+
+profiles = ProfileStore()
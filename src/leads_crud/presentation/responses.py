@@ -0,0 +1,16 @@
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request body is
+    still being read. StreamingResponse normally listens for the client
+    disconnect by calling `receive`, which would swallow request body chunks;
+    here the body iterator is the only reader, and it sees the disconnect
+    itself through Request.stream().
+    """
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
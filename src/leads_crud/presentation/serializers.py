@@ -1,3 +1,5 @@
+from typing import Any, List, Literal, Optional, Union
+
 from pydantic import BaseModel, Field
 
 
@@ -55,3 +57,288 @@ class LeadOutput(BaseModel):
         default=None,
         description="Timestamp of lead creation",
     )
+
+
+class PartialLeadOutput(BaseModel):
+    """
+    A lead lacking some of the fields LeadOutput requires, as it is stored.
+    """
+    id: Optional[str] = Field(
+        default=None,
+        description="Unique identifier for the lead",
+    )
+    email: Optional[str] = Field(
+        default=None,
+        description="Email address of the lead",
+    )
+    first_name: Optional[str] = Field(
+        default=None,
+        description="First name of the lead",
+    )
+    last_name: Optional[str] = Field(
+        default=None,
+        description="Last name of the lead",
+    )
+    position: Optional[str] = Field(
+        default=None,
+        description="Job position of the lead",
+    )
+    company: Optional[str] = Field(
+        default=None,
+        description="Company where the lead works",
+    )
+
+
+class LeadError(BaseModel):
+    """
+    Describes why the operation on a single lead failed.
+    """
+    status_code: int = Field(
+        description="HTTP status code of the failure",
+    )
+    detail: str = Field(
+        description="Human readable reason of the failure",
+    )
+
+
+class BulkLeadResult(BaseModel):
+    """
+    Outcome of one item of a bulk request.
+    Exactly one of `lead` and `error` is set.
+    """
+    index: int = Field(
+        description="Position of the item in the request",
+    )
+    lead: Optional[LeadOutput] = Field(
+        default=None,
+        description="Created lead",
+    )
+    error: Optional[LeadError] = Field(
+        default=None,
+        description="Failure of the item",
+    )
+
+
+class ImportRowResult(BaseModel):
+    """
+    Outcome of one row of a CSV import, streamed as one NDJSON line.
+    Exactly one of `lead` and `error` is set.
+    """
+    row: int = Field(
+        description="Number of the data row in the file, starting at 1 after the header",
+    )
+    lead: Optional[LeadOutput] = Field(
+        default=None,
+        description="Created lead",
+    )
+    error: Optional[LeadError] = Field(
+        default=None,
+        description="Failure of the row",
+    )
+
+
+class BulkCreateOutput(BaseModel):
+    """
+    Per-item results of a bulk lead creation.
+    """
+    created: int = Field(
+        description="Number of leads created",
+    )
+    failed: int = Field(
+        description="Number of items that failed",
+    )
+    results: List[BulkLeadResult] = Field(
+        description="Results in the same order as the request items",
+    )
+
+
+class LeadIdError(LeadError):
+    """
+    Failure to fetch one of the leads of a multi-get.
+    """
+    id: int = Field(
+        description="Id of the lead that could not be retrieved",
+    )
+
+
+class MultiLeadOutput(BaseModel):
+    """
+    Leads found by a multi-get, plus the ids that failed.
+    """
+    leads: List[LeadOutput] = Field(
+        description="Retrieved leads, in the order of the requested ids",
+    )
+    errors: List[LeadIdError] = Field(
+        description="Ids that could not be retrieved and why",
+    )
+
+
+class LeadSearchOutput(BaseModel):
+    """
+    Leads matching a search.
+    """
+    leads: List[Union[LeadOutput, PartialLeadOutput]] = Field(
+        description="Matching leads, in the order they were first seen; leads lacking fields are sent as stored",
+    )
+
+
+class CreateJobInput(BaseModel):
+    """
+    Job creating every lead of `items`.
+    """
+    kind: Literal["create"]
+    items: List[LeadInput] = Field(
+        description="Leads to create",
+    )
+
+
+class UpdateJobItem(LeadInput):
+    """
+    Fields to change on one lead.
+    """
+    id: int = Field(
+        gt=0,
+        description="Id of the lead to update",
+    )
+
+
+class UpdateJobInput(BaseModel):
+    """
+    Job updating the leads of `items`.
+    """
+    kind: Literal["update"]
+    items: List[UpdateJobItem] = Field(
+        description="Lead ids with the fields to change",
+    )
+
+
+class DeleteJobInput(BaseModel):
+    """
+    Job deleting the leads of `items`.
+    """
+    kind: Literal["delete"]
+    items: List[int] = Field(
+        description="Ids of the leads to delete",
+    )
+
+
+class ExportJobInput(BaseModel):
+    """
+    Job exporting every lead to a file downloadable once the job completes.
+    """
+    kind: Literal["export"]
+    format: Literal["csv", "ndjson", "columnar"] = Field(
+        default="csv",
+        description="Output format",
+    )
+    compression: Optional[Literal["gzip"]] = Field(
+        default=None,
+        description="Compress the output",
+    )
+    page_size: int = Field(
+        default=100,
+        gt=0,
+        le=1000,
+        description="Leads fetched from Hunter per page",
+    )
+
+
+JobInput = Union[CreateJobInput, UpdateJobInput, DeleteJobInput, ExportJobInput]
+
+
+class JobItemOutput(BaseModel):
+    """
+    Outcome of one item of a job.
+    """
+    index: int = Field(
+        description="Position of the item in the submitted job",
+    )
+    status: str = Field(
+        description="pending, succeeded or failed",
+    )
+    result: Any = Field(
+        default=None,
+        description="What the item produced, e.g. the created lead",
+    )
+    error: Optional[LeadError] = Field(
+        default=None,
+        description="Failure of the item",
+    )
+
+
+class JobOutput(BaseModel):
+    """
+    State and progress of a job.
+    """
+    id: str = Field(
+        description="Job id",
+    )
+    kind: str = Field(
+        description="create, update, delete or export",
+    )
+    status: str = Field(
+        description="queued, running, completed or failed",
+    )
+    total: int = Field(
+        description="Number of items of the job (0 for exports)",
+    )
+    succeeded: int = Field(
+        description="Items processed successfully (leads written for exports)",
+    )
+    failed: int = Field(
+        description="Items that failed",
+    )
+    elapsed_seconds: Optional[float] = Field(
+        default=None,
+        description="Time since the job started, up to its end",
+    )
+    items_per_second: Optional[float] = Field(
+        default=None,
+        description="Processing throughput",
+    )
+    created_at: str = Field(
+        description="Submission time",
+    )
+    finished_at: Optional[str] = Field(
+        default=None,
+        description="Completion time",
+    )
+    result_url: Optional[str] = Field(
+        default=None,
+        description="Where to download the output of a completed export",
+    )
+    error: Optional[LeadError] = Field(
+        default=None,
+        description="Why the job as a whole failed",
+    )
+    failures: List[JobItemOutput] = Field(
+        default=[],
+        description="First failed items",
+    )
+
+
+class ProfileOutput(BaseModel):
+    """
+    A profile captured for one request.
+    """
+    id: str = Field(
+        description="Profile id, also sent in the X-Profile-Id header of the profiled response",
+    )
+    method: str = Field(
+        description="HTTP method of the request",
+    )
+    route: str = Field(
+        description="Route template of the request",
+    )
+    status: int = Field(
+        description="Status code of the response",
+    )
+    duration_ms: float = Field(
+        description="Wall-clock duration of the request",
+    )
+    samples: int = Field(
+        description="Stack samples taken, one per sampling interval",
+    )
+    created_at: str = Field(
+        description="When the request was profiled",
+    )
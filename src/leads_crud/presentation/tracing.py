@@ -0,0 +1,55 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from leads_crud.infraestructure.tracing import SERVER, Tracer, tracer as default_tracer
+
+TRACE_ID_HEADER = "x-trace-id"
+
+
+class TracingMiddleware:
+    """
+    Opens the server span of each sampled request, continuing the trace of
+    an incoming traceparent header. The span is named after the route
+    template once routing is done, and the trace id is returned in the
+    X-Trace-Id header. With tracing disabled, requests go straight through.
+    """
+    def __init__(self, app: ASGIApp, tracer: Tracer = default_tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.tracer.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span_scope = self.tracer.start_trace(scope["method"], SERVER, traceparent)
+        with span_scope as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            status = 500
+
+            async def send_with_trace_id(message: Message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = [*message.get("headers", []), (TRACE_ID_HEADER.encode(), span.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set("http.route", route.path)
+                span.set("http.request.method", scope["method"])
+                span.set("url.path", scope["path"])
+                span.set("http.response.status_code", status)
+                if status >= 500:
+                    span.fail(str(status))
@@ -0,0 +1,234 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+
+from leads_crud.domain.lead import Lead # type: ignore
+from leads_crud.infraestructure.cache.lead_cache import CachedLeadCrud, LRUTTLCache # type: ignore
+from leads_crud.infraestructure.cache.sqlite_cache import SqliteLeadCache # type: ignore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def inner():
+    repo = AsyncMock()
+    repo.retrieve.side_effect = lambda id: Lead(id=str(id), email=f"lead{id}@example.com")
+    repo.stats = lambda: {}
+    return repo
+
+
+@pytest.fixture
+def cache(clock):
+    return LRUTTLCache(max_entries=2, ttl=10, stale_ttl=20, clock=clock)
+
+
+class TestLRUTTLCache:
+    """
+    Unit tests for the bounded LRU/TTL map
+    """
+
+    def test_evicts_least_recently_used(self, cache):
+        cache.set("1", Lead(id="1"))
+        cache.set("2", Lead(id="2"))
+        cache.get("1")
+        cache.set("3", Lead(id="3"))
+
+        assert cache.get("2") == (None, False)
+        assert cache.get("1")[0].id == "1"
+        assert cache.stats()["evictions"] == 1
+
+    def test_entry_goes_stale_then_expires(self, cache, clock):
+        cache.set("1", Lead(id="1"))
+
+        clock.now = 15
+        lead, stale = cache.get("1")
+        assert lead.id == "1" and stale
+
+        clock.now = 31
+        assert cache.get("1") == (None, False)
+        assert cache.stats()["expirations"] == 1
+
+    def test_peek_returns_fresh_entries_only(self, cache, clock):
+        cache.set("1", Lead(id="1"))
+
+        assert cache.peek("1").id == "1"
+        clock.now = 15
+        assert cache.peek("1") is None
+        assert cache.stats()["hits"] == 0
+
+
+@pytest.fixture
+def shared_cache(tmp_path, clock):
+    def open_cache(**options):
+        return SqliteLeadCache(path=str(tmp_path / "cache.sqlite3"), ttl=10, stale_ttl=20, clock=clock, **options)
+    return open_cache
+
+
+class TestSqliteLeadCache:
+    """
+    Unit tests for the cache shared across processes through SQLite
+    """
+
+    def test_entries_and_invalidations_are_shared(self, shared_cache):
+        worker1, worker2 = shared_cache(), shared_cache()
+
+        worker1.set("1", Lead(id="1", email="a@example.com"))
+        assert worker2.get("1") == (Lead(id="1", email="a@example.com"), False)
+
+        worker2.invalidate("1")
+        assert worker1.get("1") == (None, False)
+
+    def test_read_started_before_invalidation_is_not_stored(self, shared_cache, clock):
+        worker1, worker2 = shared_cache(), shared_cache()
+        clock.now = 100
+
+        worker2.invalidate("1")
+        worker1.set("1", Lead(id="1"), since=99)
+        assert worker1.get("1") == (None, False)
+
+        worker1.set("1", Lead(id="1"), since=101)
+        assert worker2.get("1")[0].id == "1"
+
+    def test_read_started_before_a_newer_store_is_not_stored(self, shared_cache, clock):
+        worker1, worker2 = shared_cache(), shared_cache()
+        clock.now = 2
+
+        worker1.invalidate("1")
+        clock.now = 3
+        worker1.set("1", Lead(id="1", email="new@example.com"), since=2.5)
+        worker2.set("1", Lead(id="1", email="old@example.com"), since=1)
+
+        assert worker2.get("1") == (Lead(id="1", email="new@example.com"), False)
+
+    def test_entry_goes_stale_then_expires(self, shared_cache, clock):
+        cache = shared_cache()
+        cache.set("1", Lead(id="1"))
+
+        clock.now = 15
+        assert cache.get("1") == (Lead(id="1"), True)
+        assert cache.peek("1") is None
+
+        clock.now = 31
+        assert cache.get("1") == (None, False)
+        assert cache.stats()["expirations"] == 1
+
+    def test_prune_evicts_oldest_entries(self, shared_cache, clock):
+        cache = shared_cache(max_entries=2, prune_every=3)
+
+        for id in range(3):
+            clock.now = id
+            cache.set(str(id), Lead(id=str(id)))
+
+        assert len(cache) == 2
+        assert cache.get("0") == (None, False)
+        assert cache.stats()["evictions"] == 1
+
+    def test_prune_keeps_tombstones_until_they_expire(self, shared_cache, clock):
+        cache = shared_cache(max_entries=2, prune_every=1)
+        cache.invalidate("0")
+
+        for id in range(1, 3):
+            clock.now = id
+            cache.set(str(id), Lead(id=str(id)))
+        clock.now = 3
+        cache.set("0", Lead(id="0"), since=0)
+
+        assert cache.get("0") == (None, False)
+        assert len(cache) == 2
+
+        clock.now = 40
+        cache.prune()
+        assert cache.db.execute("SELECT COUNT(*) FROM leads_cache").fetchone()[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_backs_cached_repository(self, inner, shared_cache):
+        repo = CachedLeadCrud(inner, shared_cache())
+        other_worker = CachedLeadCrud(inner, shared_cache())
+
+        await repo.retrieve(1)
+        await other_worker.retrieve(1)
+        await other_worker.update(1, Lead(position="CTO"))
+        await repo.retrieve(1)
+
+        assert inner.retrieve.call_count == 2
+
+
+class TestCachedLeadCrud:
+    """
+    Tests for the read-through cache wrapper
+    """
+
+    @pytest.mark.asyncio
+    async def test_repeated_retrieve_hits_cache(self, inner, cache):
+        repo = CachedLeadCrud(inner, cache)
+
+        first = await repo.retrieve(1)
+        second = await repo.retrieve(1)
+
+        assert first == second
+        inner.retrieve.assert_called_once_with(1)
+        stats = repo.stats()["cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_invalidate(self, inner, cache):
+        repo = CachedLeadCrud(inner, cache)
+
+        await repo.retrieve(1)
+        await repo.update(1, Lead(company="Avangenio"))
+        await repo.retrieve(1)
+        await repo.delete(1)
+        await repo.retrieve(1)
+
+        assert inner.retrieve.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_and_refreshed(self, inner, cache, clock):
+        repo = CachedLeadCrud(inner, cache)
+        await repo.retrieve(1)
+        inner.retrieve.side_effect = lambda id: Lead(id=str(id), email="new@example.com")
+
+        clock.now = 15
+        stale = await repo.retrieve(1)
+        await asyncio.sleep(0)
+
+        assert stale.email == "lead1@example.com"
+        assert cache.get("1")[0].email == "new@example.com"
+        assert repo.stats()["cache"]["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_of_deleted_lead_drops_entry(self, inner, cache, clock):
+        repo = CachedLeadCrud(inner, cache)
+        await repo.retrieve(1)
+        inner.retrieve.side_effect = HTTPException(status_code=404, detail="id not found")
+
+        clock.now = 15
+        await repo.retrieve(1)
+        await asyncio.sleep(0)
+
+        assert cache.get("1") == (None, False)
+
+    @pytest.mark.asyncio
+    async def test_retrieve_many_only_fetches_missing(self, inner, cache):
+        inner.retrieve_many.side_effect = lambda ids: {id: Lead(id=str(id)) for id in ids}
+        repo = CachedLeadCrud(inner, cache)
+        await repo.retrieve(1)
+
+        results = await repo.retrieve_many([1, 2, 2])
+
+        assert sorted(results) == [1, 2]
+        inner.retrieve_many.assert_called_once_with([2])
+        assert cache.get("2")[0].id == "2"
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import HTTPException
+
+from leads_crud.application.coalescing import WriteCoalescer # type: ignore
+from leads_crud.domain.lead import Lead # type: ignore
+
+
+@pytest.fixture
+def repo():
+    repo = AsyncMock()
+    repo.peek = Mock(return_value=None)
+    return repo
+
+
+class TestWriteCoalescer:
+    """
+    Tests for the write-behind coalescing of lead updates
+    """
+
+    @pytest.mark.asyncio
+    async def test_disabled_writes_through(self, repo):
+        writes = WriteCoalescer(repo, window=0)
+
+        deferred = await writes.update(1, Lead(company="Acme"))
+
+        assert deferred is False
+        repo.update.assert_awaited_once_with(1, Lead(company="Acme"))
+
+    @pytest.mark.asyncio
+    async def test_updates_in_window_are_merged(self, repo):
+        writes = WriteCoalescer(repo, window=0.05)
+
+        assert await writes.update(1, Lead(company="Acme", position="CEO"))
+        assert await writes.update(1, Lead(position="CTO"))
+        assert await writes.update(2, Lead(company="Globex"))
+        repo.update.assert_not_called()
+
+        await asyncio.sleep(0.1)
+
+        assert repo.update.await_count == 2
+        repo.update.assert_any_await(1, Lead(company="Acme", position="CTO"))
+        repo.update.assert_any_await(2, Lead(company="Globex"))
+        assert writes.stats()["merged"] == 1
+        assert writes.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batches_of_a_lead_are_sent_in_order(self, repo):
+        writes = WriteCoalescer(repo, window=10)
+        sent = []
+        release = asyncio.Event()
+
+        async def update(id, lead):
+            sent.append(lead.position)
+            if lead.position == "first":
+                await release.wait()
+        repo.update.side_effect = update
+
+        await writes.update(1, Lead(position="first"))
+        flushing = asyncio.ensure_future(writes.flush([1]))
+        await asyncio.sleep(0.01)
+        assert sent == ["first"]
+        await writes.update(1, Lead(position="second"))
+        second = asyncio.ensure_future(writes.flush([1]))
+        await asyncio.sleep(0.01)
+        assert sent == ["first"]
+
+        release.set()
+        await asyncio.gather(flushing, second)
+
+        assert sent == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_and_stops_buffering(self, repo):
+        writes = WriteCoalescer(repo, window=10)
+        await writes.update(1, Lead(company="Acme"))
+
+        await writes.close()
+
+        repo.update.assert_awaited_once_with(1, Lead(company="Acme"))
+        assert await writes.update(1, Lead(company="Globex")) is False
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_counted(self, repo):
+        repo.update.side_effect = HTTPException(status_code=404, detail="id not found")
+        writes = WriteCoalescer(repo, window=10)
+        await writes.update(1, Lead(company="Acme"))
+
+        await writes.flush()
+
+        assert writes.stats()["failed"] == 1
+        assert writes.stats()["sent"] == 0
+
+    @pytest.mark.asyncio
+    async def test_updates_are_sent_whole_by_default(self, repo):
+        # The local copy may be stale, so it is not trusted unless asked to.
+        repo.peek.return_value = Lead(id="1", company="Acme", position="CEO")
+        writes = WriteCoalescer(repo, window=0)
+
+        await writes.update(1, Lead(company="Acme"))
+
+        repo.update.assert_awaited_once_with(1, Lead(company="Acme"))
+        assert writes.stats()["skipped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unchanged_fields_are_not_sent(self, repo):
+        repo.peek.return_value = Lead(id="1", company="Acme", position="CEO")
+        writes = WriteCoalescer(repo, window=0, skip_noop=True)
+
+        await writes.update(1, Lead(company="Acme", position="CTO"))
+        await writes.update(1, Lead(company="Acme"))
+
+        repo.update.assert_awaited_once_with(1, Lead(position="CTO"))
+        assert writes.stats()["trimmed"] == 1
+        assert writes.stats()["skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_diff_sees_pending_batch(self, repo):
+        repo.peek.return_value = Lead(id="1", position="CEO")
+        writes = WriteCoalescer(repo, window=10, skip_noop=True)
+
+        await writes.update(1, Lead(position="CTO"))
+        assert await writes.update(1, Lead(position="CEO"))
+        assert not await writes.update(1, Lead(position="CEO"))
+        await writes.flush()
+
+        repo.update.assert_awaited_once_with(1, Lead(position="CEO"))
+        assert writes.stats()["skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_skipping_while_a_batch_is_sent(self, repo):
+        repo.peek.return_value = Lead(id="1", position="CEO")
+        release = asyncio.Event()
+
+        async def update(id, lead):
+            await release.wait()
+        repo.update.side_effect = update
+        writes = WriteCoalescer(repo, window=10, skip_noop=True)
+        await writes.update(1, Lead(position="CTO"))
+        flushing = asyncio.ensure_future(writes.flush())
+        await asyncio.sleep(0.01)
+
+        assert await writes.update(1, Lead(position="CEO"))
+
+        release.set()
+        await flushing
+        await writes.flush()
+        assert repo.update.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_skipping_while_a_direct_update_is_sent(self, repo):
+        repo.peek.return_value = Lead(id="1", company="Old")
+        release = asyncio.Event()
+
+        async def update(id, lead):
+            await release.wait()
+        repo.update.side_effect = update
+        writes = WriteCoalescer(repo, window=0, skip_noop=True)
+        sending = asyncio.ensure_future(writes.update(1, Lead(company="X")))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(writes.update(1, Lead(company="Old")))
+        await asyncio.sleep(0.01)
+
+        release.set()
+        await asyncio.gather(sending, second)
+        assert repo.update.await_args_list[-1].args == (1, Lead(company="Old"))
+        assert writes.stats()["skipped"] == 0
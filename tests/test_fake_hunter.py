@@ -0,0 +1,103 @@
+import random
+
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+
+from fake_hunter.server import FakeHunter, create_app, parse_latency # type: ignore
+from leads_crud.domain.lead import Lead # type: ignore
+from leads_crud.infraestructure.hunter import hunter # type: ignore
+from leads_crud.infraestructure.hunter.client import pool # type: ignore
+from leads_crud.infraestructure.hunter.ratelimit import TokenBucket # type: ignore
+from leads_crud.infraestructure.hunter.resilience import CircuitBreaker, RetryPolicy # type: ignore
+
+
+@pytest.fixture
+def serve():
+    """Routes the Hunter client to an in-process fake Hunter server, over real HTTP semantics."""
+    def start(fake):
+        transport = httpx.ASGITransport(app=create_app(fake))
+        pool._client = httpx.AsyncClient(transport=transport)
+        return fake
+
+    with patch.object(hunter, "BASE_URL", "http://fake-hunter/v2"), \
+         patch.object(hunter, "limiter", TokenBucket(rate=0, burst=1)), \
+         patch.object(hunter, "retry_policy", RetryPolicy(attempts=2, base_delay=0, max_delay=0)), \
+         patch.object(hunter, "breaker", CircuitBreaker(failure_rate=1, window=100, min_calls=100, open_seconds=1)):
+        yield start
+    pool._client = None
+
+
+class TestFakeHunter:
+    """
+    End-to-end tests of the Hunter client against the fake Hunter server
+    """
+
+    @pytest.mark.asyncio
+    async def test_crud_round_trip(self, serve):
+        fake = serve(FakeHunter())
+        repo = hunter.HunterLeadCrud()
+
+        created = await repo.create(Lead(email="ada@example.com", company="Engines"))
+        await repo.update(created.id, Lead(position="CTO"))
+        retrieved = await repo.retrieve(created.id)
+        await repo.delete(created.id)
+
+        assert created.id == "1"
+        assert retrieved == Lead(id="1", email="ada@example.com", position="CTO", company="Engines")
+        with pytest.raises(HTTPException) as exc:
+            await repo.retrieve(created.id)
+        assert exc.value.status_code == 404
+        assert exc.value.detail == "This lead does not exist"
+        assert fake.counters["requests"] == 5
+
+    @pytest.mark.asyncio
+    async def test_listing_walks_every_page(self, serve):
+        serve(FakeHunter(seed_leads=5))
+
+        pages = [page async for page in hunter.HunterLeadCrud().list(page_size=2)]
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert pages[-1][0].id == "5"
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_retried(self, serve):
+        fake = serve(FakeHunter(seed_leads=1, error_rate=1.0))
+
+        with pytest.raises(HTTPException) as exc:
+            await hunter.HunterLeadCrud().retrieve(1)
+
+        assert exc.value.status_code == 500
+        assert fake.counters["errors"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_answers_429_with_headers(self, serve):
+        fake = serve(FakeHunter(seed_leads=1, rate_limit_rps=0.001, rate_limit_burst=1, retry_after=0))
+        client = pool.client
+
+        first = await client.get("http://fake-hunter/v2/leads/1", headers={"X-API-KEY": "key"})
+        second = await client.get("http://fake-hunter/v2/leads/1", headers={"X-API-KEY": "key"})
+
+        assert first.status_code == 200
+        assert first.headers["x-ratelimit-remaining"] == "0"
+        assert second.status_code == 429
+        assert second.headers["retry-after"] == "0"
+        assert fake.counters["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key_is_rejected(self, serve):
+        serve(FakeHunter())
+
+        response = await pool.client.get("http://fake-hunter/v2/leads")
+
+        assert response.status_code == 401
+
+    def test_latency_distributions(self):
+        rng = random.Random(0)
+
+        assert parse_latency("constant:0.2")(rng) == 0.2
+        assert 0.1 <= parse_latency("uniform:0.1:0.3")(rng) <= 0.3
+        assert parse_latency("lognormal:0.05:0.5")(rng) > 0
+        with pytest.raises(ValueError):
+            parse_latency("normal:1")
@@ -0,0 +1,386 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+from leads_crud.infraestructure.hunter import hunter # type: ignore
+from fastapi import HTTPException
+from leads_crud.infraestructure.hunter.client import ClientPool # type: ignore
+from leads_crud.infraestructure.hunter.ratelimit import TokenBucket, parse_retry_after # type: ignore
+from leads_crud.infraestructure.hunter.resilience import CircuitBreaker, RetryPolicy # type: ignore
+from leads_crud.infraestructure.hunter.singleflight import SingleFlight # type: ignore
+
+
+class FakeTime:
+    """Clock whose sleep advances time instantly"""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestSingleFlight:
+    """
+    Tests for coalescing of concurrent upstream reads
+    """
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "lead"
+
+        results = await asyncio.gather(*(flights.do("1", fetch) for _ in range(5)))
+
+        assert results == ["lead"] * 5
+        assert calls == 1
+        assert flights.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_waiter(self):
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(*(flights.do("1", fetch) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "lead"
+
+        first = asyncio.ensure_future(flights.do("1", fetch))
+        second = asyncio.ensure_future(flights.do("1", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "lead"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_call_is_cancelled_when_every_waiter_leaves(self):
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = False
+
+        async def fetch():
+            nonlocal cancelled
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        waiter = asyncio.ensure_future(flights.do("1", fetch))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+
+        assert cancelled
+        assert flights.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_caller_after_cancellation_starts_a_new_call(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return calls
+
+        first = asyncio.ensure_future(flights.do("1", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+
+        assert await flights.do("1", fetch) == 2
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_forget_starts_a_new_call(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            call = calls
+            await asyncio.sleep(0.01)
+            return call
+
+        first = asyncio.ensure_future(flights.do("1", fetch))
+        await asyncio.sleep(0)
+        flights.forget("1")
+        second = asyncio.ensure_future(flights.do("1", fetch))
+
+        assert await first == 1
+        assert await second == 2
+
+
+class TestTokenBucket:
+    """
+    Tests for client side pacing of Hunter calls
+    """
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        fake = FakeTime()
+        bucket = TokenBucket(rate=2, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+        for _ in range(4):
+            await bucket.acquire()
+
+        assert fake.now == pytest.approx(1.0)
+        assert bucket.stats()["delayed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_calls_that_do_not_sleep_are_not_delayed(self):
+        ticks = iter(range(100))
+        bucket = TokenBucket(rate=0, burst=1, clock=lambda: next(ticks) * 0.001)
+
+        for _ in range(3):
+            await bucket.acquire()
+
+        assert bucket.stats()["delayed"] == 0
+        assert bucket.stats()["waited_seconds"] == 0
+
+    @pytest.mark.asyncio
+    async def test_429_pauses_for_retry_after(self):
+        fake = FakeTime()
+        bucket = TokenBucket(rate=100, burst=100, clock=fake.clock, sleep=fake.sleep)
+
+        bucket.observe(httpx.Response(429, headers={"Retry-After": "3"}))
+        await bucket.acquire()
+
+        assert fake.now == pytest.approx(3.0)
+        assert bucket.stats()["throttled_responses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pause_while_waiting_delays_the_booked_slot(self):
+        fake = FakeTime()
+        bucket = TokenBucket(rate=1, burst=1, clock=fake.clock, sleep=fake.sleep)
+        throttled = False
+
+        async def sleep_then_throttled(seconds):
+            nonlocal throttled
+            if not throttled:
+                throttled = True
+                bucket.pause(2)
+            await fake.sleep(seconds)
+
+        await bucket.acquire()
+        bucket._sleep = sleep_then_throttled
+        await bucket.acquire()
+
+        assert fake.now == pytest.approx(3.0)
+
+    @pytest.mark.asyncio
+    async def test_queued_callers_stay_paced_after_a_pause(self):
+        fake = FakeTime()
+        released = []
+
+        async def sleep(seconds):
+            wake = fake.now + seconds
+            while fake.now < wake:
+                await asyncio.sleep(0)
+
+        bucket = TokenBucket(rate=4, burst=2, clock=fake.clock, sleep=sleep)
+
+        async def caller():
+            await bucket.acquire()
+            released.append(fake.now)
+
+        tasks = [asyncio.create_task(caller()) for _ in range(12)]
+        for step in range(16):
+            fake.now = step * 0.25
+            for _ in range(5):
+                await asyncio.sleep(0)
+            if fake.now == 0.5:
+                bucket.pause(1)
+        await asyncio.gather(*tasks)
+
+        assert released[:4] == [0.0, 0.0, 0.25, 0.5]
+        assert released[4:] == [1.75 + 0.25 * i for i in range(8)]
+
+    @pytest.mark.asyncio
+    async def test_pause_is_capped(self):
+        fake = FakeTime()
+        bucket = TokenBucket(rate=0, burst=1, clock=fake.clock, sleep=fake.sleep, max_pause=5)
+
+        bucket.observe(httpx.Response(429, headers={"Retry-After": "86400"}))
+        await bucket.acquire()
+
+        assert fake.now == pytest.approx(5.0)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_quota_waits_for_reset(self):
+        fake = FakeTime()
+        bucket = TokenBucket(rate=0, burst=1, clock=fake.clock, sleep=fake.sleep)
+
+        bucket.observe(httpx.Response(200, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2"}))
+        await bucket.acquire()
+
+        assert fake.now == pytest.approx(2.0)
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:05 GMT", now=1445412480.0) == 5.0
+        assert parse_retry_after("soon") is None
+
+    @pytest.mark.asyncio
+    async def test_send_requeues_rate_limited_request(self):
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"data": {}}),
+        ]
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = responses
+
+            response = await hunter.send("get", hunter.BASE_URL+"/leads/1")
+
+            assert response.status_code == 200
+            assert mock_get.call_count == 2
+
+
+@pytest.fixture
+def resilience():
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=3, open_seconds=30)
+    policy = RetryPolicy(attempts=2, base_delay=0, max_delay=0)
+    with patch.object(hunter, "breaker", breaker), patch.object(hunter, "retry_policy", policy):
+        yield breaker
+
+
+class TestCircuitBreaker:
+    """
+    Tests for the breaker state machine
+    """
+
+    def test_opens_on_failure_rate_and_recovers(self):
+        fake = FakeTime()
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, open_seconds=10, clock=fake.clock)
+
+        for outcome in [True, False, True, False]:
+            assert breaker.allow()
+            breaker.record_success() if outcome else breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        fake.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats()["rejected"] == 2
+
+    def test_failed_probe_reopens(self):
+        fake = FakeTime()
+        breaker = CircuitBreaker(failure_rate=0.5, window=2, min_calls=1, open_seconds=10, clock=fake.clock)
+        breaker.record_failure()
+
+        fake.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["opened"] == 2
+
+
+class TestSendResilience:
+    """
+    Tests for retries and fail-fast around Hunter calls
+    """
+
+    @pytest.mark.asyncio
+    async def test_idempotent_request_is_retried_on_5xx(self, resilience):
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = [httpx.Response(503), httpx.Response(200)]
+
+            response = await hunter.send("get", hunter.BASE_URL+"/leads/1")
+
+            assert response.status_code == 200
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_create_is_not_retried(self, resilience):
+        with patch('httpx.AsyncClient.post') as mock_post:
+            mock_post.side_effect = [httpx.Response(503), httpx.Response(200)]
+
+            response = await hunter.send("post", hunter.BASE_URL+"/leads")
+
+            assert response.status_code == 503
+            assert mock_post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_transport_error_becomes_gateway_error(self, resilience):
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = httpx.ConnectTimeout("timed out")
+
+            with pytest.raises(HTTPException) as error:
+                await hunter.send("get", hunter.BASE_URL+"/leads/1")
+
+            assert error.value.status_code == 504
+            assert mock_get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast(self, resilience):
+        with patch('httpx.AsyncClient.delete') as mock_delete:
+            mock_delete.side_effect = httpx.ConnectError("refused")
+
+            with pytest.raises(HTTPException):
+                await hunter.send("delete", hunter.BASE_URL+"/leads/1")
+            with pytest.raises(HTTPException) as error:
+                await hunter.send("delete", hunter.BASE_URL+"/leads/1")
+
+            assert error.value.status_code == 503
+            assert resilience.state == CircuitBreaker.OPEN
+            assert mock_delete.call_count == 3
+
+
+class TestClientPool:
+    """
+    Tests for the lifespan managed upstream client
+    """
+
+    @pytest.mark.asyncio
+    async def test_open_request_close(self):
+        pool = ClientPool(max_connections=4, max_keepalive_connections=2, keepalive_expiry=1)
+        client = await pool.open()
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.return_value = httpx.Response(200)
+            await pool.request("get", "https://api.hunter.io/v2/leads/1")
+
+        stats = pool.stats()
+        assert stats["max_connections"] == 4
+        assert stats["requests"] == 1
+        assert stats["peak_in_flight"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["connections"] == 0
+
+        await pool.close()
+        assert client.is_closed
@@ -1,13 +1,20 @@
+import inject
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+import gzip
 import json
+import time
 from datetime import datetime
 from typing import Dict, Any
 
+from leads_crud.application.coalescing import WriteCoalescer # type: ignore
+from leads_crud.application.service import SearchLeadsService # type: ignore
 from leads_crud.presentation.endpoints import app # type: ignore
 from leads_crud.domain.lead import Lead # type: ignore
+from leads_crud.domain.repositories import ILeadCRUD # type: ignore
 from leads_crud.infraestructure.hunter.hunter import HunterLeadCrud # type: ignore
+from leads_crud.presentation.mappers import EndpointMapper # type: ignore
 
 client = TestClient(app)
 
@@ -79,6 +86,33 @@ def hunter_error_response_404():
         ]
     }
 
+def hunter_listing(lead, total):
+    """Side effect serving `total` copies of `lead` through Hunter's offset pagination"""
+    def hunter_get(url, params, **kwargs):
+        offset, limit = params["offset"], params["limit"]
+        leads = [dict(lead, id=str(i)) for i in range(offset, min(offset + limit, total))]
+        mock_response = MagicMock()
+        mock_response.is_success = True
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"data": {"leads": leads}, "meta": {"total": total}}
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
+        return mock_response
+    return hunter_get
+
+def hunter_listing_failing(lead, fail_at):
+    """Side effect serving pages of `lead` until offset `fail_at`, which Hunter answers with a 401"""
+    serve = hunter_listing(lead, total=fail_at + 10)
+    def hunter_get(url, params, **kwargs):
+        if params["offset"] < fail_at:
+            return serve(url, params, **kwargs)
+        mock_response = MagicMock()
+        mock_response.is_success = False
+        mock_response.status_code = 401
+        mock_response.json.return_value = {"errors": [{"id": "authentication_failed", "code": 401, "details": "No user found for the API key supplied"}]}
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
+        return mock_response
+    return hunter_get
+
 class TestHunterApiIntegration:
     """
     Integration tests for the complete flow from API endpoints to Hunter.io
@@ -91,10 +125,11 @@ class TestHunterApiIntegration:
         # Mock the external Hunter.io API call
         with patch('httpx.AsyncClient.post') as mock_post:
             # Configure mock response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = True
             mock_response.status_code = 200
             mock_response.json.return_value = hunter_success_response
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_post.return_value = mock_response
 
             # Make request to our API
@@ -120,10 +155,11 @@ class TestHunterApiIntegration:
         
         with patch('httpx.AsyncClient.post') as mock_post:
             # Configure mock error response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = False
             mock_response.status_code = 400
             mock_response.json.return_value = hunter_error_response_400
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_post.return_value = mock_response
 
             # Make request to our API
@@ -141,10 +177,11 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.get') as mock_get:
             # Configure mock response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = True
             mock_response.status_code = 200
             mock_response.json.return_value = hunter_success_response
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_get.return_value = mock_response
 
             # Make request to our API
@@ -161,6 +198,74 @@ class TestHunterApiIntegration:
             call_args = mock_get.call_args
             assert f"https://api.hunter.io/v2/leads/{lead_id}" in str(call_args)
 
+    @pytest.mark.asyncio
+    async def test_retrieve_lead_fast_and_model_bodies_match(self, hunter_success_response):
+        """Test the fast read path answers the same body as the model path"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_response = MagicMock()
+            mock_response.is_success = True
+            mock_response.status_code = 200
+            mock_response.content = json.dumps(hunter_success_response).encode()
+            mock_get.return_value = mock_response
+
+            bodies = []
+            for fast in (True, False):
+                with patch("leads_crud.presentation.endpoints.FAST_READS", fast):
+                    response = client.get("/leads/1")
+                assert response.status_code == 200
+                assert response.headers["content-type"] == "application/json"
+                bodies.append(response.json())
+
+            assert bodies[0].pop("datetime")
+            assert bodies[1].pop("datetime")
+            assert bodies[0] == bodies[1]
+
+    @pytest.mark.asyncio
+    async def test_retrieve_lead_etag_and_not_modified(self, hunter_success_response):
+        """Test reads carry a stable ETag and a matching If-None-Match gets an empty 304"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_response = MagicMock()
+            mock_response.is_success = True
+            mock_response.status_code = 200
+            mock_response.content = json.dumps(hunter_success_response).encode()
+            mock_get.return_value = mock_response
+
+            first = client.get("/leads/1")
+            with patch("leads_crud.presentation.endpoints.FAST_READS", False):
+                second = client.get("/leads/1")
+            etag = first.headers["etag"]
+            not_modified = client.get("/leads/1", headers={"If-None-Match": '"other", '+etag})
+            unprefixed = client.get("/leads/1", headers={"If-None-Match": etag.removeprefix("W/")})
+            changed = client.get("/leads/1", headers={"If-None-Match": 'W/"other"'})
+
+            assert etag.startswith('W/"')
+            assert first.headers["cache-control"] == "no-cache"
+            assert second.headers["etag"] == etag
+            assert not_modified.status_code == 304
+            assert not_modified.content == b""
+            assert not_modified.headers["etag"] == etag
+            assert unprefixed.status_code == 304
+            assert changed.status_code == 200
+            assert mock_get.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_retrieve_lead_not_modified_from_local_copy(self, expected_lead_data):
+        """Test a lead known locally answers a matching If-None-Match without calling Hunter"""
+
+        repo = inject.instance(ILeadCRUD)
+        lead = Lead(**expected_lead_data)
+        etag = EndpointMapper.to_etag(lead.model_dump())
+
+        with patch('httpx.AsyncClient.get') as mock_get, \
+             patch.object(repo, "peek", return_value=lead):
+            response = client.get("/leads/1", headers={"If-None-Match": etag})
+
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+            mock_get.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_retrieve_lead_not_found(self, hunter_error_response_404):
         """Test retrieval of non-existent lead"""
@@ -169,10 +274,11 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.get') as mock_get:
             # Configure mock error response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = False
             mock_response.status_code = 404
             mock_response.json.return_value = hunter_error_response_404
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_get.return_value = mock_response
 
             # Make request to our API
@@ -190,9 +296,10 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.put') as mock_put:
             # Configure mock response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = True
             mock_response.status_code = 204
+            mock_put.return_value = mock_response
 
             # Make request to our API
             response = client.put(f"/leads/{lead_id}", json=update_lead_data)
@@ -205,6 +312,31 @@ class TestHunterApiIntegration:
             call_args = mock_put.call_args
             assert f"https://api.hunter.io/v2/leads/{lead_id}" in str(call_args)
 
+    @pytest.mark.asyncio
+    async def test_update_lead_coalesced(self, hunter_success_response):
+        """Test buffered updates are merged into one upstream call before the lead is read"""
+
+        writes = inject.instance(WriteCoalescer)
+        with patch.object(writes, "window", 10), patch.object(writes, "closed", False), \
+             patch('httpx.AsyncClient.put') as mock_put, patch('httpx.AsyncClient.get') as mock_get:
+            mock_put.return_value = MagicMock(status_code=204, is_success=True)
+            mock_put.return_value.json.return_value = {}
+            mock_put.return_value.content = json.dumps(mock_put.return_value.json.return_value).encode()
+            mock_get.return_value = MagicMock(status_code=200, is_success=True)
+            mock_get.return_value.json.return_value = hunter_success_response
+            mock_get.return_value.content = json.dumps(mock_get.return_value.json.return_value).encode()
+
+            with TestClient(app) as local_client:
+                first = local_client.put("/leads/1", json={"position": "CEO"})
+                second = local_client.put("/leads/1", json={"company": "Acme"})
+                mock_put.assert_not_called()
+                response = local_client.get("/leads/1")
+
+            assert (first.status_code, second.status_code) == (202, 202)
+            assert response.status_code == 200
+            mock_put.assert_called_once()
+            assert mock_put.call_args.kwargs["json"] == {"position": "CEO", "company": "Acme"}
+
     @pytest.mark.asyncio
     async def test_update_lead_invalid(self,hunter_error_response_400):
         """Test error handling when updating a lead with invalid data"""
@@ -213,10 +345,11 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.put') as mock_put:
             # Configure mock error response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = False
             mock_response.status_code = 400
             mock_response.json.return_value = hunter_error_response_400
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_put.return_value = mock_response
 
             # Make request to our API
@@ -234,7 +367,7 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.delete') as mock_delete:
             # Configure mock response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = True
             mock_response.status_code = 204
             mock_delete.return_value = mock_response
@@ -258,10 +391,11 @@ class TestHunterApiIntegration:
 
         with patch('httpx.AsyncClient.delete') as mock_delete:
             # Configure mock error response
-            mock_response = AsyncMock()
+            mock_response = MagicMock()
             mock_response.is_success = False
             mock_response.status_code = 404
             mock_response.json.return_value = hunter_error_response_404
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
             mock_delete.return_value = mock_response
 
             # Make request to our API
@@ -271,4 +405,286 @@ class TestHunterApiIntegration:
             assert response.status_code == 404
             assert "id not found" in response.json()["detail"]
 
-    
\ No newline at end of file
+    
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_reports_each_item(self, input_lead_data, hunter_success_response, hunter_error_response_400):
+        """Test bulk creation keeps going when single items fail"""
+
+        ok_response = MagicMock()
+        ok_response.is_success = True
+        ok_response.status_code = 200
+        ok_response.json.return_value = hunter_success_response
+        ok_response.content = json.dumps(ok_response.json.return_value).encode()
+        error_response = MagicMock()
+        error_response.is_success = False
+        error_response.status_code = 400
+        error_response.json.return_value = hunter_error_response_400
+        error_response.content = json.dumps(error_response.json.return_value).encode()
+
+        with patch('httpx.AsyncClient.post') as mock_post:
+            mock_post.side_effect = [ok_response, error_response]
+
+            response = client.post("/leads/bulk", json=[input_lead_data, {}, input_lead_data])
+
+            assert response.status_code == 200
+            body = response.json()
+            assert body["created"] == 1
+            assert body["failed"] == 2
+            results = body["results"]
+            assert [result["index"] for result in results] == [0, 1, 2]
+            assert results[0]["lead"]["email"] == input_lead_data["email"]
+            assert results[1]["error"]["status_code"] == 400
+            assert results[2]["error"]["detail"] == "You are missing a parameter"
+            assert mock_post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retrieve_many_returns_partial_results(self, hunter_success_response, hunter_error_response_404):
+        """Test multi-get deduplicates ids and reports missing ones"""
+
+        def hunter_get(url, **kwargs):
+            mock_response = MagicMock()
+            if url.endswith("/leads/1"):
+                mock_response.is_success = True
+                mock_response.status_code = 200
+                mock_response.json.return_value = hunter_success_response
+                mock_response.content = json.dumps(mock_response.json.return_value).encode()
+            else:
+                mock_response.is_success = False
+                mock_response.status_code = 404
+                mock_response.json.return_value = hunter_error_response_404
+                mock_response.content = json.dumps(mock_response.json.return_value).encode()
+            return mock_response
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_get
+
+            response = client.get("/leads", params={"ids": "1,999,1"})
+
+            assert response.status_code == 200
+            body = response.json()
+            assert [lead["id"] for lead in body["leads"]] == ["1"]
+            assert body["errors"] == [{"id": 999, "status_code": 404, "detail": "id not found"}]
+            assert mock_get.call_count == 2
+
+    def test_retrieve_many_invalid_ids(self):
+        """Test multi-get rejects malformed id lists"""
+
+        response = client.get("/leads", params={"ids": "1,abc"})
+
+        assert response.status_code == 400
+
+    def test_search_requires_a_criterion(self):
+        """Test search rejects a query without any filter"""
+
+        response = client.get("/leads/search")
+
+        assert response.status_code == 400
+
+    def test_search_without_mirror(self):
+        """Test search is reported as unavailable when no local mirror is configured"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            response = client.get("/leads/search", params={"company": "Acme"})
+
+            assert response.status_code == 501
+            mock_get.assert_not_called()
+
+    def test_search_returns_partial_leads_as_stored(self, expected_lead_data):
+        """Test search answers leads lacking fields instead of failing"""
+
+        full = Lead(**expected_lead_data)
+        partial = Lead(id="2", email="partial@example.com")
+        with patch.object(SearchLeadsService, "execute", AsyncMock(return_value=[full, partial])):
+            response = client.get("/leads/search", params={"company": "Acme"})
+
+            assert response.status_code == 200
+            leads = response.json()["leads"]
+            assert leads[0]["company"] == "Test Corp" and leads[0]["datetime"]
+            assert leads[1] == {"id": "2", "email": "partial@example.com", "first_name": None,
+                                "last_name": None, "position": None, "company": None}
+
+    def test_listing_documents_both_content_types(self):
+        """Test the OpenAPI schema of GET /leads covers the JSON multi-get and the NDJSON stream"""
+
+        content = app.openapi()["paths"]["/leads"]["get"]["responses"]["200"]["content"]
+
+        assert set(content) == {"application/json", "application/x-ndjson"}
+
+    @pytest.mark.asyncio
+    async def test_list_leads_streams_every_page(self, hunter_success_response):
+        """Test the NDJSON listing walks Hunter's pages until the last one"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing(hunter_success_response["data"], total=5)
+
+            response = client.get("/leads", params={"page_size": 2})
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert [line["id"] for line in lines] == ["0", "1", "2", "3", "4"]
+            assert mock_get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_list_leads_first_page_failure_keeps_its_status(self, hunter_success_response):
+        """Test a Hunter failure on the first page is answered with its status, not an empty 200"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing_failing(hunter_success_response["data"], fail_at=0)
+
+            response = client.get("/leads", params={"page_size": 2})
+
+            assert response.status_code == 401
+            assert response.json() == {"detail": "No user found for the API key supplied"}
+
+    @pytest.mark.asyncio
+    async def test_list_leads_later_page_failure_aborts_the_stream(self, hunter_success_response):
+        """Test a Hunter failure after the first page aborts the stream instead of ending it cleanly"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing_failing(hunter_success_response["data"], fail_at=2)
+
+            with pytest.raises(RuntimeError, match="response already started"):
+                client.get("/leads", params={"page_size": 2})
+
+    @pytest.mark.asyncio
+    async def test_import_csv_streams_row_results(self, hunter_success_response):
+        """Test a CSV import creates every valid row and reports the others"""
+
+        def hunter_post(url, **kwargs):
+            mock_response = MagicMock()
+            mock_response.is_success = True
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"data": dict(hunter_success_response["data"], **kwargs["json"])}
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
+            return mock_response
+
+        body = (
+            "email,first_name,last_name,position,company\n"
+            "a@example.com,Ann,Lee,CTO,\"Acme, Inc\"\n"
+            ",Bob,,,\n"
+            "c@example.com,Cid,Ray,CEO,Initech\n"
+        )
+
+        with patch('httpx.AsyncClient.post') as mock_post:
+            mock_post.side_effect = hunter_post
+
+            response = client.post("/leads/import", content=body, headers={"Content-Type": "text/csv"})
+
+            assert response.status_code == 200
+            lines = {line["row"]: line for line in map(json.loads, response.text.splitlines())}
+            assert lines[1]["lead"]["company"] == "Acme, Inc"
+            assert lines[2]["error"] == {"status_code": 400, "detail": "required field 'email' missing"}
+            assert lines[3]["lead"]["email"] == "c@example.com"
+            assert mock_post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_export_csv(self, hunter_success_response):
+        """Test the CSV export writes a header and one row per lead"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing(hunter_success_response["data"], total=3)
+
+            response = client.get("/leads/export", params={"format": "csv", "page_size": 2})
+
+            assert response.status_code == 200
+            assert response.headers["content-disposition"] == 'attachment; filename="leads.csv"'
+            lines = response.text.splitlines()
+            assert lines[0] == "id,email,first_name,last_name,position,company"
+            assert lines[1:] == [f"{i},test@example.com,John,Doe,Developer,Test Corp" for i in range(3)]
+
+    @pytest.mark.asyncio
+    async def test_export_first_page_failure_keeps_its_status(self, hunter_success_response):
+        """Test a Hunter failure on the first page is answered with its status, not an empty download"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing_failing(hunter_success_response["data"], fail_at=0)
+
+            response = client.get("/leads/export", params={"format": "csv", "page_size": 2})
+
+            assert response.status_code == 401
+            assert "content-disposition" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_export_later_page_failure_aborts_the_download(self, hunter_success_response):
+        """Test a Hunter failure after the first page aborts the download instead of ending it cleanly"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing_failing(hunter_success_response["data"], fail_at=2)
+
+            with pytest.raises(RuntimeError, match="response already started"):
+                client.get("/leads/export", params={"format": "csv", "page_size": 2})
+
+    @pytest.mark.asyncio
+    async def test_export_columnar_gzip(self, hunter_success_response):
+        """Test the columnar export is gzip compressed on the fly"""
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_get.side_effect = hunter_listing(hunter_success_response["data"], total=3)
+
+            response = client.get("/leads/export", params={"format": "columnar", "compression": "gzip", "page_size": 2})
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/gzip"
+            lines = [json.loads(line) for line in gzip.decompress(response.content).splitlines()]
+            assert lines[0]["fields"][0] == "id"
+            assert [line["rows"] for line in lines[1:]] == [2, 1]
+            assert lines[2]["id"] == ["2"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_job(self, input_lead_data, hunter_success_response):
+        """Test a create job runs in the background and reports every item"""
+
+        ok_response = MagicMock()
+        ok_response.is_success = True
+        ok_response.status_code = 200
+        ok_response.json.return_value = hunter_success_response
+        ok_response.content = json.dumps(ok_response.json.return_value).encode()
+
+        with patch('httpx.AsyncClient.post') as mock_post, TestClient(app) as local_client:
+            mock_post.return_value = ok_response
+
+            response = local_client.post("/jobs", json={"kind": "create", "items": [input_lead_data, {}]})
+            assert response.status_code == 202
+            id = response.json()["id"]
+            for _ in range(100):
+                job = local_client.get(f"/jobs/{id}").json()
+                if job["status"] == "completed":
+                    break
+                time.sleep(0.01)
+
+            assert (job["total"], job["succeeded"], job["failed"]) == (2, 1, 1)
+            assert job["failures"][0]["index"] == 1
+            assert job["failures"][0]["error"]["status_code"] == 400
+            items = local_client.get(f"/jobs/{id}/items", params={"status": "succeeded"}).json()
+            assert items[0]["result"]["email"] == input_lead_data["email"]
+            assert mock_post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_export_job_result(self, hunter_success_response, tmp_path):
+        """Test an export job writes a downloadable file"""
+
+        with patch('httpx.AsyncClient.get') as mock_get, \
+             patch('leads_crud.presentation.job_handlers.JOB_EXPORT_DIR', str(tmp_path)), \
+             TestClient(app) as local_client:
+            mock_get.side_effect = hunter_listing(hunter_success_response["data"], total=3)
+
+            id = local_client.post("/jobs", json={"kind": "export", "format": "ndjson"}).json()["id"]
+            for _ in range(100):
+                job = local_client.get(f"/jobs/{id}").json()
+                if job["status"] == "completed":
+                    break
+                time.sleep(0.01)
+
+            assert job["succeeded"] == 3
+            response = local_client.get(job["result_url"])
+            assert response.status_code == 200
+            assert [json.loads(line)["id"] for line in response.text.splitlines()] == ["0", "1", "2"]
+
+    def test_unknown_job(self):
+        """Test polling a job that does not exist"""
+
+        response = client.get("/jobs/missing")
+
+        assert response.status_code == 404
@@ -0,0 +1,216 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from leads_crud.application.jobs import ItemJob, JobRunner, TaskJob # type: ignore
+from leads_crud.domain.job import COMPLETED, FAILED, PENDING, QUEUED, RUNNING, SUCCEEDED, JobItem # type: ignore
+from leads_crud.infraestructure.sqlite.job_store import SqliteJobStore # type: ignore
+
+
+def describe_error(exc):
+    return {"status_code": getattr(exc, "status_code", 500), "detail": str(getattr(exc, "detail", exc))}
+
+
+async def double(payload):
+    if payload < 0:
+        raise HTTPException(status_code=400, detail="negative")
+    return payload * 2
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+async def wait_for(runner, id, status=COMPLETED):
+    for _ in range(200):
+        job = runner.get(id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {id} is still {job.status}")
+
+
+class TestJobRunner:
+    """
+    Tests for the background job runner and its SQLite store
+    """
+
+    @pytest.mark.asyncio
+    async def test_item_job_records_results_and_failures(self, store):
+        runner = JobRunner(store, {"double": ItemJob(double)}, describe_error, checkpoint_every=2)
+        await runner.start()
+        try:
+            job = runner.submit("double", [1, -1, 3, 4, 5])
+            job = await wait_for(runner, job.id)
+        finally:
+            await runner.close()
+
+        assert (job.total, job.succeeded, job.failed) == (5, 4, 1)
+        assert job.finished_at is not None
+        items = store.items(job.id)
+        assert [item.result for item in items] == [2, None, 6, 8, 10]
+        assert store.items(job.id, status=FAILED) == [
+            JobItem(index=1, status=FAILED, payload=-1, error={"status_code": 400, "detail": "negative"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_restart_resumes_pending_items(self, store, tmp_path):
+        calls = []
+
+        async def record(payload):
+            calls.append(payload)
+            return payload
+
+        runner = JobRunner(store, {"record": ItemJob(record)}, describe_error)
+        job = runner.submit("record", ["a", "b", "c"])
+        store.record(job.id, [JobItem(index=0, status=SUCCEEDED, result="a")])
+
+        # A new process opens the same store and picks the job up.
+        reopened = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        runner = JobRunner(reopened, {"record": ItemJob(record)}, describe_error)
+        await runner.start()
+        try:
+            job = await wait_for(runner, job.id)
+        finally:
+            await runner.close()
+            reopened.close()
+
+        assert sorted(calls) == ["b", "c"]
+        assert (job.succeeded, job.failed) == (3, 0)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_keeps_progress(self, store):
+        release = asyncio.Event()
+
+        async def slow(payload):
+            if payload:
+                await release.wait()
+            return payload
+
+        runner = JobRunner(store, {"slow": ItemJob(slow)}, describe_error, concurrency=1)
+        await runner.start()
+        job = runner.submit("slow", [0, 1])
+        await asyncio.sleep(0.05)
+        await runner.close()
+
+        assert [item.status for item in store.items(job.id)] == [SUCCEEDED, PENDING]
+        assert store.claimable() == [job.id]
+
+    @pytest.mark.asyncio
+    async def test_runners_sharing_a_store_run_a_job_once(self, store, tmp_path):
+        calls = []
+
+        async def record(payload):
+            calls.append(payload)
+            await asyncio.sleep(0.01)
+            return payload
+
+        other_store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        runners = [
+            JobRunner(store, {"record": ItemJob(record)}, describe_error),
+            JobRunner(other_store, {"record": ItemJob(record)}, describe_error),
+        ]
+        job = runners[0].submit("record", ["a", "b"])
+        for runner in runners:
+            await runner.start()
+        try:
+            job = await wait_for(runners[0], job.id)
+        finally:
+            for runner in runners:
+                await runner.close()
+            other_store.close()
+
+        assert sorted(calls) == ["a", "b"]
+        assert (job.succeeded, job.failed) == (2, 0)
+
+    def test_claims_are_exclusive_until_the_lease_expires(self, store):
+        runner = JobRunner(store, {}, describe_error)
+        job = runner.submit("record", ["a"])
+
+        assert store.claim(job.id, "first", time.time() + 30).status == RUNNING
+        assert store.claim(job.id, "second", time.time() + 30) is None
+        assert store.claimable() == []
+
+        store.renew("first", time.time() - 1)
+        assert store.claimable() == [job.id]
+        assert store.claim(job.id, "second", time.time() + 30) is not None
+
+        store.release("second")
+        assert store.get(job.id).status == QUEUED
+
+    @pytest.mark.asyncio
+    async def test_task_job_reports_progress_and_result(self, store):
+        async def export(job, progress):
+            progress(2)
+            progress(3)
+            return "/tmp/"+job.id
+
+        async def broken(job, progress):
+            raise HTTPException(status_code=502, detail="Hunter unreachable")
+
+        runner = JobRunner(store, {"export": TaskJob(export), "broken": TaskJob(broken)}, describe_error)
+        await runner.start()
+        try:
+            done = await wait_for(runner, runner.submit("export", params={"format": "csv"}).id)
+            failed = await wait_for(runner, runner.submit("broken").id, status=FAILED)
+        finally:
+            await runner.close()
+
+        assert done.succeeded == 5
+        assert done.result == "/tmp/"+done.id
+        assert done.params == {"format": "csv"}
+        assert failed.error == {"status_code": 502, "detail": "Hunter unreachable"}
+
+    @pytest.mark.asyncio
+    async def test_expired_jobs_are_deleted_with_their_output(self, store):
+        discarded = []
+
+        async def export(job, progress):
+            return "/tmp/"+job.id
+
+        handlers = {"export": TaskJob(export, discarded.append), "double": ItemJob(double)}
+        runner = JobRunner(store, handlers, describe_error)
+        await runner.start()
+        try:
+            done = await wait_for(runner, runner.submit("export").id)
+            items = await wait_for(runner, runner.submit("double", [1]).id)
+        finally:
+            await runner.close()
+        queued = runner.submit("double", [2])
+
+        # The next runner to start removes what finished before its retention.
+        runner = JobRunner(store, handlers, describe_error, retention=0)
+        await runner.start()
+        await runner.close()
+
+        assert store.get(done.id) is None and store.get(items.id) is None
+        assert store.items(items.id) == []
+        assert [job.id for job in discarded] == [done.id]
+        assert store.get(queued.id).status == QUEUED
+
+    @pytest.mark.asyncio
+    async def test_lease_renewal_survives_store_errors(self, store):
+        renewals = []
+        renew = store.renew
+
+        def flaky_renew(owner, lease_until):
+            renewals.append(lease_until)
+            if len(renewals) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            renew(owner, lease_until)
+
+        store.renew = flaky_renew
+        runner = JobRunner(store, {}, describe_error, lease=0.03)
+        await runner.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await runner.close()
+
+        assert len(renewals) >= 2
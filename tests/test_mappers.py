@@ -0,0 +1,161 @@
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from unittest.mock import patch
+
+from leads_crud.domain.lead import Lead # type: ignore
+from leads_crud.infraestructure import json_codec # type: ignore
+from leads_crud.infraestructure.hunter.mappers import HunterMapper # type: ignore
+from leads_crud.presentation import exporters, mappers # type: ignore
+from leads_crud.presentation.mappers import EndpointMapper # type: ignore
+from leads_crud.presentation.serializers import LeadInput, LeadOutput # type: ignore
+
+LEAD = {
+    "email": "ada@example.com",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "position": "CTO",
+    "company": "Engines",
+}
+
+
+class TestEndpointMapper:
+    """
+    Unit tests of the mapping between API models and leads
+    """
+
+    def test_to_entity_matches_validated_lead(self):
+        lead = EndpointMapper.to_entity(LeadInput(email="ada@example.com", company="Engines"))
+
+        assert lead == Lead.model_validate({"email": "ada@example.com", "company": "Engines"})
+        assert lead.id is None
+
+    def test_to_entity_rejects_empty_input(self):
+        with pytest.raises(HTTPException) as exc:
+            EndpointMapper.to_entity(LeadInput())
+
+        assert exc.value.status_code == 400
+
+    def test_to_client_matches_validated_output(self):
+        output = EndpointMapper.to_client(Lead(id="1", **LEAD))
+
+        assert output.model_dump(exclude={"datetime"}) == LeadOutput(id="1", **LEAD).model_dump(exclude={"datetime"})
+        assert time.strptime(output.datetime, "%d/%m/%Y, %H:%M:%S")
+
+    def test_to_client_still_rejects_missing_fields(self):
+        with pytest.raises(ValidationError) as exc:
+            EndpointMapper.to_client(Lead(id="1", email="ada@example.com"))
+
+        assert {error["loc"][0] for error in exc.value.errors()} == {"first_name", "last_name", "position", "company"}
+
+    def test_to_client_json_matches_to_client(self):
+        body = EndpointMapper.to_client_json({"id": "1", **LEAD, "notes": "ignored"})
+
+        assert json.loads(body) == EndpointMapper.to_client(Lead(id="1", **LEAD)).model_dump()
+
+    def test_to_client_json_rejects_missing_fields(self):
+        with pytest.raises(ValidationError) as exc:
+            EndpointMapper.to_client_json({"id": "1", "email": "ada@example.com", "first_name": None})
+
+        assert {error["loc"][0] for error in exc.value.errors()} == {"first_name", "last_name", "position", "company"}
+
+    def test_etag_only_depends_on_lead_fields(self):
+        etag = EndpointMapper.to_etag({"id": "1", **LEAD})
+
+        assert etag.startswith('W/"')
+        assert EndpointMapper.to_etag({"id": "1", **LEAD, "datetime": "01/01/2024, 10:00:00"}) == etag
+        assert EndpointMapper.to_etag(Lead(id="1", **LEAD).__dict__) == etag
+        assert EndpointMapper.to_etag({"id": "1", **LEAD, "company": "Other"}) != etag
+
+    def test_timestamp_is_formatted_once_per_second(self):
+        with patch.object(mappers, "_timestamp", (0, "")), \
+             patch.object(mappers.time, "strftime", wraps=time.strftime) as strftime, \
+             patch.object(mappers.time, "time", return_value=1_700_000_000.5):
+            first = mappers.current_timestamp()
+            second = mappers.current_timestamp()
+
+        assert first == second == time.strftime("%d/%m/%Y, %H:%M:%S", time.localtime(1_700_000_000))
+        assert strftime.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_to_ndjson_ends_a_failed_listing_with_an_error_line(self):
+        async def pages():
+            yield [Lead(id="1", **LEAD)]
+            raise HTTPException(status_code=503, detail="Hunter API is unavailable")
+
+        chunks = []
+        with pytest.raises(HTTPException):
+            async for chunk in EndpointMapper.to_ndjson(pages()):
+                chunks.append(chunk)
+
+        lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert lines[0]["id"] == "1"
+        assert lines[1] == {"error": {"status_code": 503, "detail": "Hunter API is unavailable"}}
+
+
+    @pytest.mark.asyncio
+    async def test_listing_and_export_send_the_same_ndjson_lines(self):
+        async def pages():
+            yield [Lead(id="1", **LEAD), Lead(id="2", email="partial@example.com")]
+
+        listed = b"".join([chunk async for chunk in EndpointMapper.to_ndjson(pages())])
+        exported = b"".join([chunk async for chunk in exporters.to_ndjson(pages())])
+
+        assert listed == exported
+
+    @pytest.mark.asyncio
+    async def test_columnar_export_ends_with_an_error_line(self):
+        async def pages():
+            yield [Lead(id="1", **LEAD)]
+            raise HTTPException(status_code=401, detail="Invalid API key")
+
+        chunks = []
+        with pytest.raises(HTTPException):
+            async for chunk in EndpointMapper.with_error_line(exporters.to_columnar(pages())):
+                chunks.append(chunk)
+
+        lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert lines[1]["id"] == ["1"]
+        assert lines[-1] == {"error": {"status_code": 401, "detail": "Invalid API key"}}
+
+class TestHunterMapper:
+    """
+    Unit tests of the mapping of Hunter answers to leads
+    """
+
+    def test_to_entity_page(self):
+        page = {"data": {"leads": [{"id": 1, **LEAD}, {"id": 2, **LEAD}]}, "meta": {"total": 2}}
+
+        leads, total = HunterMapper.to_entity_page(page)
+
+        assert leads == [Lead(id="1", **LEAD), Lead(id="2", **LEAD)]
+        assert total == 2
+
+    def test_to_fields_matches_to_entity(self):
+        answer = {"data": {"id": 7, **LEAD, "website": None}, "meta": {}}
+
+        assert HunterMapper.to_fields(answer) == HunterMapper.to_entity(answer).model_dump()
+
+
+class TestJsonCodec:
+    """
+    Tests of the JSON codec with and without orjson
+    """
+
+    @pytest.mark.parametrize("fast", [True, False])
+    def test_round_trip(self, fast):
+        value = {"id": "1", "name": "Zoë", "tags": ["a", None], "count": 2}
+        with patch.object(json_codec, "orjson", json_codec.orjson if fast else None):
+            body = json_codec.dumps(value)
+
+            assert body == json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+            assert json_codec.loads(body) == value
+
+    @pytest.mark.parametrize("fast", [True, False])
+    def test_malformed_documents_raise_value_error(self, fast):
+        with patch.object(json_codec, "orjson", json_codec.orjson if fast else None):
+            with pytest.raises(ValueError):
+                json_codec.loads(b"<html>")
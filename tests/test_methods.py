@@ -1,7 +1,7 @@
 import pytest 
 import httpx
 from fastapi.testclient import TestClient
-from src.api import app , BASE_URL
+from src.api import app , BASE_URL, call_hunter, pool
 import logging
 
 
@@ -225,7 +225,31 @@ def test_delete_lead(mocker,testcase):
     assert response.json() == testcase["expected"]["data"]
 
 
+@pytest.mark.asyncio
+async def test_call_hunter_reuses_pooled_client(mocker):
+    mock_get = mocker.patch("httpx.AsyncClient.get", return_value=httpx.Response(200, json=LEADS[0]))
 
+    first = await call_hunter("get", BASE_URL+"/leads/1")
+    client = pool.client
+    second = await call_hunter("get", BASE_URL+"/leads/2")
 
+    assert first.json() == LEADS[0]
+    assert second.status_code == 200
+    assert mock_get.call_count == 2
+    assert pool.client is client
 
 
+@pytest.mark.asyncio
+async def test_call_hunter_invalid_method():
+    with pytest.raises(Exception):
+        await call_hunter("patch", BASE_URL+"/leads/1")
+
+
+def test_update_lead_empty_response(mocker):
+    mocker.patch("src.api.call_hunter", return_value=httpx.Response(204))
+
+    client = TestClient(app)
+    response = client.put("/leads/1", json=LEADS[0])
+
+    assert response.status_code == 200
+    assert response.json() is None
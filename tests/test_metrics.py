@@ -0,0 +1,133 @@
+import json
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from leads_crud.infraestructure.metrics import MetricsRegistry, registry # type: ignore
+from leads_crud.presentation.endpoints import app # type: ignore
+from leads_crud.presentation.metrics import MetricsMiddleware # type: ignore
+
+
+def sample(text, name, **labels):
+    """Value of one sample in a Prometheus text exposition, 0 when absent."""
+    pattern = re.escape(name) + r"\{" + ",".join(
+        re.escape(f'{key}="{value}"') for key, value in labels.items()
+    ) + r"\} (\S+)" if labels else re.escape(name) + r" (\S+)"
+    match = re.search("^" + pattern + "$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+class TestMetricsRegistry:
+    """
+    Unit tests of the metric types and their text format
+    """
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/leads")
+        text = registry.render()
+
+        assert sample(text, "latency_seconds_bucket", route="/leads", le="0.1") == 2
+        assert sample(text, "latency_seconds_bucket", route="/leads", le="1.0") == 3
+        assert sample(text, "latency_seconds_bucket", route="/leads", le="+Inf") == 4
+        assert sample(text, "latency_seconds_count", route="/leads") == 4
+        assert sample(text, "latency_seconds_sum", route="/leads") == 3.65
+        assert "# TYPE latency_seconds histogram" in text
+
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "Errors", ("detail",))
+        registry.gauge("open", "Open", lambda: [((), True)])
+
+        counter.inc('say "hi"\n')
+        counter.inc('say "hi"\n', amount=2)
+        text = registry.render()
+
+        assert 'errors_total{detail="say \\"hi\\"\\n"} 3' in text
+        assert "open 1" in text
+
+    def test_metric_names_are_unique(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors")
+
+        with pytest.raises(ValueError):
+            registry.counter("errors_total", "Errors")
+
+
+class TestMetricsMiddleware:
+    """
+    Tests of the request metrics recorded by the ASGI middleware
+    """
+
+    def test_requests_are_labelled_with_route_template_and_status(self):
+        before = registry.render()
+        local_app = FastAPI()
+        local_app.add_middleware(MetricsMiddleware)
+
+        @local_app.get("/items/{id}")
+        async def item(id: int):
+            return {"id": id}
+
+        local_client = TestClient(local_app)
+        local_client.get("/items/1")
+        local_client.get("/items/2")
+        local_client.get("/items/x")
+        local_client.get("/missing")
+        after = registry.render()
+
+        def delta(name, **labels):
+            return sample(after, name, **labels) - sample(before, name, **labels)
+
+        assert delta("http_request_duration_seconds_count", method="GET", route="/items/{id}", status="200") == 2
+        assert delta("http_request_duration_seconds_count", method="GET", route="/items/{id}", status="422") == 1
+        assert delta("http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404") == 1
+        assert sample(after, "http_requests_in_flight") == 0
+
+    def test_middleware_can_be_built_for_several_apps(self):
+        for _ in range(2):
+            local_app = FastAPI()
+            local_app.add_middleware(MetricsMiddleware)
+            assert TestClient(local_app).get("/missing").status_code == 404
+
+
+class TestMetricsEndpoint:
+    """
+    Tests of GET /metrics on the lead API
+    """
+
+    def test_request_upstream_and_mapping_metrics(self):
+        client = TestClient(app)
+        before = client.get("/metrics").text
+
+        with patch('httpx.AsyncClient.get') as mock_get:
+            mock_response = MagicMock()
+            mock_response.is_success = True
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"data": {
+                "id": 7, "email": "ada@example.com", "first_name": "Ada",
+                "last_name": "Lovelace", "position": "CTO", "company": "Engines",
+            }}
+            mock_response.content = json.dumps(mock_response.json.return_value).encode()
+            mock_get.return_value = mock_response
+            assert client.get("/leads/7").status_code == 200
+
+        response = client.get("/metrics")
+        after = response.text
+
+        def delta(name, **labels):
+            return sample(after, name, **labels) - sample(before, name, **labels)
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert delta("http_request_duration_seconds_count", method="GET", route="/leads/{id}", status="200") == 1
+        assert delta("hunter_request_duration_seconds_count", operation="retrieve") == 1
+        assert delta("hunter_responses_total", operation="retrieve", status="200") == 1
+        assert delta("lead_mapping_duration_seconds_count", mapper="hunter", operation="to_fields") == 1
+        assert delta("lead_mapping_duration_seconds_count", mapper="endpoint", operation="to_client_json") == 1
+        assert sample(after, "hunter_circuit_breaker_state", state="closed") == 1
+        assert "hunter_pool_saturation " in after
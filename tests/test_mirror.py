@@ -0,0 +1,203 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+
+from leads_crud.domain.lead import Lead # type: ignore
+from leads_crud.infraestructure.sqlite.mirror import SqliteLeadMirror # type: ignore
+
+
+def make_lead(id, **fields):
+    return Lead(id=str(id), email=f"lead{id}@example.com", **fields)
+
+
+class FakeHunter:
+    """In-memory stand-in for the upstream repository"""
+    def __init__(self, leads):
+        self.leads = {lead.id: lead for lead in leads}
+        self.retrieve = AsyncMock(side_effect=lambda id: self.leads[str(id)])
+        self.update = AsyncMock()
+        self.delete = AsyncMock()
+        self.create = AsyncMock(side_effect=lambda lead: lead.model_copy(update={"id": "99"}))
+        self.retrieve_many = AsyncMock(side_effect=lambda ids: {
+            id: self.leads.get(str(id)) or HTTPException(status_code=404, detail="id not found") for id in ids
+        })
+
+    async def list(self, page_size):
+        leads = list(self.leads.values())
+        for start in range(0, len(leads), page_size):
+            yield leads[start:start+page_size]
+
+    def stats(self):
+        return {}
+
+
+@pytest.fixture
+def hunter():
+    return FakeHunter([make_lead(i, company="Acme") for i in range(1, 6)])
+
+
+@pytest.fixture
+def mirror(hunter, tmp_path):
+    mirror = SqliteLeadMirror(hunter, path=str(tmp_path / "leads.sqlite3"), page_size=2)
+    yield mirror
+    mirror.db.close()
+
+
+class TestSqliteLeadMirror:
+    """
+    Tests for the local SQLite replica of Hunter leads
+    """
+
+    @pytest.mark.asyncio
+    async def test_full_sync_then_local_reads(self, hunter, mirror):
+        assert await mirror.sync(full=True) == 5
+
+        lead = await mirror.retrieve(3)
+
+        assert lead == hunter.leads["3"]
+        hunter.retrieve.assert_not_called()
+        pages = [page async for page in mirror.list(page_size=2)]
+        assert [len(page) for page in pages] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_refresh_only_counts_changes(self, hunter, mirror):
+        await mirror.sync(full=True)
+        hunter.leads["2"] = make_lead(2, company="Initech")
+        hunter.leads["7"] = make_lead(7)
+
+        assert await mirror.sync() == 2
+        assert (await mirror.retrieve(2)).company == "Initech"
+
+    @pytest.mark.asyncio
+    async def test_full_sync_drops_leads_deleted_upstream(self, hunter, mirror):
+        await mirror.sync(full=True)
+        del hunter.leads["4"]
+
+        await mirror.sync(full=True)
+
+        assert mirror.get(4) is None
+        assert mirror.stats()["mirror"]["leads"] == 4
+
+    @pytest.mark.asyncio
+    async def test_full_sync_keeps_leads_skipped_by_shifted_pages(self, hunter, mirror):
+        await mirror.sync(full=True)
+        list_pages = hunter.list
+
+        async def shifting_list(page_size):
+            # Lead 1 is deleted after the first page, so lead 3 moves onto it.
+            pages = list_pages(page_size)
+            yield await anext(pages)
+            del hunter.leads["1"]
+            leads = list(hunter.leads.values())
+            for start in range(page_size, len(leads), page_size):
+                yield leads[start:start+page_size]
+
+        hunter.list = shifting_list
+        await mirror.sync(full=True)
+
+        assert mirror.get(3) == hunter.leads["3"]
+        hunter.retrieve_many.assert_called_once_with([3])
+
+    @pytest.mark.asyncio
+    async def test_writes_go_through_then_apply_locally(self, hunter, mirror):
+        await mirror.sync(full=True)
+
+        await mirror.update(1, Lead(position="CTO"))
+        await mirror.delete(2)
+        created = await mirror.create(Lead(email="new@example.com"))
+
+        hunter.update.assert_called_once()
+        assert mirror.get(1).position == "CTO"
+        assert mirror.get(1).company == "Acme"
+        assert mirror.get(2) is None
+        assert mirror.get(created.id).email == "new@example.com"
+
+    @pytest.mark.asyncio
+    async def test_refresh_keeps_local_writes_made_while_reading(self, hunter, mirror):
+        await mirror.sync(full=True)
+        stale = list(hunter.leads.values())
+
+        async def list_prefetching(page_size):
+            # The page was requested before the update and arrives after it.
+            await mirror.update(1, Lead(position="CTO"))
+            yield stale
+
+        hunter.list = list_prefetching
+        await mirror.sync()
+
+        assert mirror.get(1).position == "CTO"
+        hunter.list = FakeHunter.list.__get__(hunter)
+        hunter.leads["1"] = make_lead(1, company="Acme", position="CEO")
+        await mirror.sync()
+        assert mirror.get(1).position == "CEO"
+
+    @pytest.mark.asyncio
+    async def test_refresh_keeps_local_deletes_made_while_reading(self, hunter, mirror):
+        await mirror.sync(full=True)
+        stale = list(hunter.leads.values())
+
+        async def list_prefetching(page_size):
+            await mirror.delete(1)
+            yield stale
+
+        hunter.list = list_prefetching
+        await mirror.sync()
+
+        assert mirror.peek(1) is None
+        assert mirror.db.execute("SELECT COUNT(*) FROM deleted_leads").fetchone()[0] == 1
+        hunter.list = FakeHunter.list.__get__(hunter)
+        await mirror.sync()
+        assert mirror.db.execute("SELECT COUNT(*) FROM deleted_leads").fetchone()[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_upstream_write_leaves_mirror_untouched(self, hunter, mirror):
+        await mirror.sync(full=True)
+        hunter.update.side_effect = HTTPException(status_code=400, detail="bad")
+
+        with pytest.raises(HTTPException):
+            await mirror.update(1, Lead(position="CTO"))
+
+        assert mirror.get(1).position is None
+
+    @pytest.mark.asyncio
+    async def test_missing_lead_is_read_through(self, hunter, mirror):
+        lead = await mirror.retrieve(5)
+
+        assert lead.id == "5"
+        hunter.retrieve.assert_called_once_with(5)
+        assert mirror.get(5) == lead
+
+    @pytest.mark.asyncio
+    async def test_search_by_email_prefix_and_text(self, hunter, mirror):
+        hunter.leads["2"] = make_lead(2, company="Globex", position="Chief Technology Officer", first_name="Ada")
+        hunter.leads["3"] = make_lead(3, company="Acme Labs", position="Engineer")
+        await mirror.sync(full=True)
+
+        by_email = await mirror.search(email="LEAD4@example.com")
+        by_company = await mirror.search(company="acme l")
+        by_text = await mirror.search(text="ada chief")
+        combined = await mirror.search(company="acme", position="eng")
+
+        assert [lead.id for lead in by_email] == ["4"]
+        assert [lead.id for lead in by_company] == ["3"]
+        assert [lead.id for lead in by_text] == ["2"]
+        assert [lead.id for lead in combined] == ["3"]
+        page = await mirror.search(company="Acme", limit=2, offset=1)
+        assert [lead.id for lead in page] == ["3", "4"]
+
+    @pytest.mark.asyncio
+    async def test_search_follows_writes(self, hunter, mirror):
+        await mirror.sync(full=True)
+
+        await mirror.update(1, Lead(company="Initech"))
+        await mirror.delete(2)
+
+        assert [lead.id for lead in await mirror.search(text="initech")] == ["1"]
+        assert [lead.id for lead in await mirror.search(company="Acme")] == ["3", "4", "5"]
+
+    @pytest.mark.asyncio
+    async def test_search_before_first_sync_is_unavailable(self, mirror):
+        with pytest.raises(HTTPException) as exc:
+            await mirror.search(email="lead1@example.com")
+
+        assert exc.value.status_code == 503
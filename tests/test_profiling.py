@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from leads_crud.infraestructure.profiling import AWAITING, task_stack # type: ignore
+from leads_crud.presentation import endpoints # type: ignore
+from leads_crud.presentation.profiling import ProfileStore, ProfilingMiddleware # type: ignore
+
+
+def profiled_app(store, **options):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, interval=0.001, **options)
+
+    async def wait_for_hunter():
+        await asyncio.sleep(0.05)
+
+    @app.get("/slow")
+    async def slow():
+        await wait_for_hunter()
+        return {"done": True}
+
+    return app
+
+
+class TestStackSampling:
+    """
+    Unit tests of the logical stack of a task
+    """
+
+    @pytest.mark.asyncio
+    async def test_suspended_task_shows_its_await_chain(self):
+        async def inner():
+            await asyncio.sleep(1)
+
+        async def outer():
+            await inner()
+
+        task = asyncio.create_task(outer())
+        await asyncio.sleep(0)
+        stack = task_stack(task, None)
+        task.cancel()
+
+        assert [frame.split(" ")[0] for frame in stack] == [
+            "TestStackSampling.test_suspended_task_shows_its_await_chain.<locals>.outer",
+            "TestStackSampling.test_suspended_task_shows_its_await_chain.<locals>.inner",
+            "sleep",
+            AWAITING,
+        ]
+
+
+class TestProfilingMiddleware:
+    """
+    Tests of request profiling triggered by header or sampling
+    """
+
+    def test_header_with_token_profiles_the_request(self, tmp_path):
+        store = ProfileStore(directory=str(tmp_path), keep=10)
+        client = TestClient(profiled_app(store, token="secret"))
+
+        response = client.get("/slow", headers={"X-Profile": "secret"})
+
+        id = response.headers["X-Profile-Id"]
+        profile = store.get(id)
+        assert profile["route"] == "/slow"
+        assert profile["status"] == 200
+        assert profile["samples"] > 0
+        folded = open(store.path(id)).read()
+        assert "wait_for_hunter" in folded
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+    def test_requests_without_trigger_are_not_profiled(self, tmp_path):
+        store = ProfileStore(directory=str(tmp_path))
+        client = TestClient(profiled_app(store, token="secret"))
+
+        wrong_token = client.get("/slow", headers={"X-Profile": "guess"})
+        no_header = client.get("/slow")
+
+        assert "X-Profile-Id" not in wrong_token.headers
+        assert "X-Profile-Id" not in no_header.headers
+        assert store.list() == []
+
+    def test_sample_rate_profiles_without_header(self, tmp_path):
+        store = ProfileStore(directory=str(tmp_path))
+        client = TestClient(profiled_app(store, sample_rate=1.0))
+
+        response = client.get("/slow")
+
+        assert store.get(response.headers["X-Profile-Id"]) is not None
+
+    def test_store_keeps_the_latest_profiles(self, tmp_path):
+        store = ProfileStore(directory=str(tmp_path), keep=2)
+
+        for id in ("a", "b", "c"):
+            store.save(id, {"route": "/leads"}, "main 1\n")
+
+        assert [profile["id"] for profile in store.list()] == ["c", "b"]
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["b.folded", "c.folded"]
+
+
+class TestProfileEndpoints:
+    """
+    Tests of listing and downloading profiles from the lead API
+    """
+
+    def test_download_profile(self, tmp_path):
+        store = ProfileStore(directory=str(tmp_path))
+        store.save("abc", {
+            "method": "GET", "route": "/leads/{id}", "status": 200,
+            "duration_ms": 12.5, "samples": 10, "created_at": 0,
+        }, "main;retrieve 10\n")
+        client = TestClient(endpoints.app)
+        headers = {"X-Profile": "secret"}
+
+        with patch.object(endpoints, "profiles", store), patch.object(endpoints, "PROFILE_TOKEN", "secret"):
+            listed = client.get("/profiles", headers=headers)
+            downloaded = client.get("/profiles/abc", headers=headers)
+            missing = client.get("/profiles/nope", headers=headers)
+
+        assert listed.json()[0]["route"] == "/leads/{id}"
+        assert downloaded.text == "main;retrieve 10\n"
+        assert missing.status_code == 404
+
+    def test_profiles_require_token_when_configured(self, tmp_path):
+        client = TestClient(endpoints.app)
+
+        with patch.object(endpoints, "profiles", ProfileStore(directory=str(tmp_path))), \
+             patch.object(endpoints, "PROFILE_TOKEN", "secret"):
+            denied = client.get("/profiles")
+            allowed = client.get("/profiles", headers={"X-Profile": "secret"})
+
+        assert denied.status_code == 403
+        assert allowed.json() == []
+
+    def test_profiles_are_not_served_without_token(self, tmp_path):
+        client = TestClient(endpoints.app)
+
+        with patch.object(endpoints, "profiles", ProfileStore(directory=str(tmp_path))), \
+             patch.object(endpoints, "PROFILE_TOKEN", ""):
+            listed = client.get("/profiles")
+            downloaded = client.get("/profiles/abc")
+
+        assert listed.status_code == 404
+        assert downloaded.status_code == 404
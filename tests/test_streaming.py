@@ -0,0 +1,143 @@
+import asyncio
+import csv
+import pytest
+
+from leads_crud.application.concurrency import map_unordered # type: ignore
+from leads_crud.presentation.csv_stream import iter_csv_rows # type: ignore
+
+
+async def chunks_of(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start+size]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestCsvStream:
+    """
+    Tests for incremental CSV parsing
+    """
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    async def test_rows_survive_any_chunking(self, chunk_size):
+        data = (
+            "﻿Email,Company\r\n"
+            "a@example.com,\"Acme\nLabs\"\r\n"
+            "\r\n"
+            "b@example.com,\"Ünïcode \"\"Co\"\"\"\r\n"
+            "c@example.com,"
+        ).encode()
+
+        rows = await collect(iter_csv_rows(chunks_of(data, chunk_size)))
+
+        assert rows == [
+            (1, {"email": "a@example.com", "company": "Acme\nLabs"}),
+            (2, {"email": "b@example.com", "company": 'Ünïcode "Co"'}),
+            (3, {"email": "c@example.com", "company": None}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_quote_inside_unquoted_field_is_literal(self):
+        data = b'email,last_name\na@x,O"Brien\nb@x,Smith\nc@x,"Doe ""Jr"""\n'
+
+        rows = await collect(iter_csv_rows(chunks_of(data, 5)))
+
+        assert rows == [
+            (1, {"email": "a@x", "last_name": 'O"Brien'}),
+            (2, {"email": "b@x", "last_name": "Smith"}),
+            (3, {"email": "c@x", "last_name": 'Doe "Jr"'}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bad_row_is_reported_in_place(self):
+        csv.field_size_limit(16)
+        try:
+            data = b"email\na@example.com\n" + b"x" * 20 + b"\nb@example.com\n"
+            rows = await collect(iter_csv_rows(chunks_of(data, 8)))
+        finally:
+            csv.field_size_limit(131072)
+
+        assert rows[0] == (1, {"email": "a@example.com"})
+        assert isinstance(rows[1][1], csv.Error)
+        assert rows[2] == (3, {"email": "b@example.com"})
+
+
+    @pytest.mark.asyncio
+    async def test_unterminated_quote_is_reported_and_skipped(self):
+        csv.field_size_limit(16)
+        try:
+            data = b'email,last_name\na@x,"Open\nb@x,Smith\nc@x,Doe\nd@x,"Late\n'
+            rows = await collect(iter_csv_rows(chunks_of(data, 4)))
+        finally:
+            csv.field_size_limit(131072)
+
+        assert isinstance(rows[0][1], csv.Error)
+        assert rows[1] == (2, {"email": "c@x", "last_name": "Doe"})
+        assert rows[2] == (3, {"email": "d@x", "last_name": "Late\n"})
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    async def test_cr_line_ends(self, chunk_size):
+        data = b'email,company\ra@x,Acme\rb@x,"Multi\rLine"\r\nc@x,\r'
+
+        rows = await collect(iter_csv_rows(chunks_of(data, chunk_size)))
+
+        assert rows == [
+            (1, {"email": "a@x", "company": "Acme"}),
+            (2, {"email": "b@x", "company": "Multi\rLine"}),
+            (3, {"email": "c@x", "company": None}),
+        ]
+
+
+class TestMapUnordered:
+    """
+    Tests for the bounded streaming fan-out
+    """
+
+    @pytest.mark.asyncio
+    async def test_results_arrive_as_they_complete(self):
+        async def items():
+            for delay in [0.03, 0.01, 0.02]:
+                yield delay
+
+        async def work(delay):
+            await asyncio.sleep(delay)
+            if delay == 0.02:
+                raise ValueError("failed")
+            return delay
+
+        results = await collect(map_unordered(items(), work, limit=3))
+
+        assert [item for item, _ in results] == [0.01, 0.02, 0.03]
+        assert isinstance(results[1][1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_input_is_read_lazily(self):
+        read = 0
+        running = 0
+        peak = 0
+
+        async def items():
+            nonlocal read
+            for item in range(10):
+                read += 1
+                yield item
+
+        async def work(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return item
+
+        iterator = map_unordered(items(), work, limit=2)
+        await iterator.__anext__()
+        assert read <= 3
+        rest = await collect(iterator)
+
+        assert len(rest) == 9
+        assert peak <= 2
@@ -0,0 +1,189 @@
+import json
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from fake_hunter.server import FakeHunter, create_app # type: ignore
+from leads_crud.infraestructure.hunter import hunter # type: ignore
+from leads_crud.infraestructure.hunter.client import pool # type: ignore
+from leads_crud.infraestructure.hunter.ratelimit import TokenBucket # type: ignore
+from leads_crud.infraestructure.tracing import CLIENT, SERVER, FileSpanExporter, OtlpSpanExporter, Span # type: ignore
+from leads_crud.infraestructure.tracing import Tracer, parse_traceparent, to_otlp, tracer # type: ignore
+from leads_crud.presentation.endpoints import app # type: ignore
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    async def export(self, spans):
+        self.spans.extend(spans)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake():
+    """Lead API with tracing on, in front of an in-process fake Hunter."""
+    fake = FakeHunter(seed_leads=3)
+    pool._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(fake)))
+    with patch.object(hunter, "BASE_URL", "http://fake-hunter/v2"), \
+         patch.object(hunter, "limiter", TokenBucket(rate=0, burst=1)), \
+         patch.object(tracer, "exporter", MemoryExporter()), \
+         patch.object(tracer, "enabled", True), \
+         patch.object(tracer, "sample_rate", 1.0), \
+         patch.object(tracer, "pending", []):
+        yield fake
+    pool._client = None
+
+
+def api():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+
+
+class TestTraceparent:
+    """
+    Unit tests of W3C trace context parsing
+    """
+
+    def test_parse(self):
+        assert parse_traceparent(PARENT) == ("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+        assert parse_traceparent(PARENT[:-2] + "00")[2] is False
+
+    @pytest.mark.parametrize("value", [
+        None,
+        "",
+        "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331",
+        "00-00000000000000000000000000000000-b7ad6b7169203331-01",
+        "ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+        "00-0af7651916cd43dd8448eb211c80319c-xyz-01",
+    ])
+    def test_invalid_headers_are_ignored(self, value):
+        assert parse_traceparent(value) is None
+
+
+class TestRequestTracing:
+    """
+    End-to-end tests of the spans recorded for a request
+    """
+
+    @pytest.mark.asyncio
+    async def test_spans_cover_every_layer(self, fake):
+        async with api() as client:
+            response = await client.get("/leads/1", headers={"traceparent": PARENT})
+
+        spans = {span.name: span for span in tracer.pending}
+        server = spans["GET /leads/{id}"]
+        execute = spans["RetrieveLeadFieldsService.execute"]
+        upstream = spans["hunter retrieve"]
+
+        assert response.status_code == 200
+        assert response.headers["X-Trace-Id"] == "0af7651916cd43dd8448eb211c80319c"
+        assert {span.trace_id for span in tracer.pending} == {"0af7651916cd43dd8448eb211c80319c"}
+        assert server.kind == SERVER and server.parent_id == "b7ad6b7169203331"
+        assert spans["RetrieveLeadFieldsService.__init__"].parent_id == server.span_id
+        assert execute.parent_id == server.span_id
+        assert upstream.kind == CLIENT and upstream.parent_id == execute.span_id
+        assert upstream.attributes["http.response.status_code"] == 200
+        assert spans["HunterMapper.to_fields"].parent_id == execute.span_id
+        assert spans["EndpointMapper.to_client_json"].parent_id == server.span_id
+        assert all(span.end_ns >= span.start_ns > 0 for span in tracer.pending)
+        assert fake.counters["traced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsampled_parent_is_not_traced(self, fake):
+        async with api() as client:
+            response = await client.get("/leads/1", headers={"traceparent": PARENT[:-2] + "00"})
+
+        assert response.status_code == 200
+        assert "X-Trace-Id" not in response.headers
+        assert tracer.pending == []
+        assert fake.counters["traced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_upstream_errors_mark_spans(self, fake):
+        async with api() as client:
+            response = await client.get("/leads/99")
+
+        spans = {span.name: span for span in tracer.pending}
+        assert response.status_code == 404
+        assert spans["hunter retrieve"].status == 2
+        assert spans["RetrieveLeadFieldsService.execute"].attributes["error.type"] == "HTTPException"
+        assert spans["GET /leads/{id}"].status == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_tracer_records_nothing(self, fake):
+        with patch.object(tracer, "enabled", False):
+            async with api() as client:
+                response = await client.get("/leads/1", headers={"traceparent": PARENT})
+
+        assert response.status_code == 200
+        assert tracer.pending == []
+        assert fake.counters["traced"] == 0
+
+
+class TestExport:
+    """
+    Tests of span batching and exporters
+    """
+
+    def spans(self, count):
+        spans = []
+        for index in range(count):
+            span = Span(f"span {index}", SERVER, "0af7651916cd43dd8448eb211c80319c", None)
+            span.start_ns, span.end_ns = 1000, 2000
+            span.set("http.response.status_code", 200)
+            spans.append(span)
+        return spans
+
+    def test_otlp_encoding(self):
+        body = to_otlp(self.spans(1), "leads-crud")
+
+        resource = body["resourceSpans"][0]
+        span = resource["scopeSpans"][0]["spans"][0]
+        assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "leads-crud"}}]
+        assert span["traceId"] == "0af7651916cd43dd8448eb211c80319c"
+        assert span["parentSpanId"] == ""
+        assert span["startTimeUnixNano"] == "1000"
+        assert span["attributes"] == [{"key": "http.response.status_code", "value": {"intValue": "200"}}]
+
+    @pytest.mark.asyncio
+    async def test_file_exporter(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        local_tracer = Tracer(FileSpanExporter(path=str(path)))
+
+        for span in self.spans(3):
+            local_tracer.finish(span)
+        await local_tracer.close()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        assert len(json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]) == 3
+        assert local_tracer.stats()["exported"] == 3
+
+    @pytest.mark.asyncio
+    async def test_otlp_exporter_posts_to_fake_collector(self):
+        fake = FakeHunter()
+        exporter = OtlpSpanExporter(endpoint="http://collector/v1/traces")
+        exporter.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(fake)))
+        local_tracer = Tracer(exporter)
+
+        for span in self.spans(2):
+            local_tracer.finish(span)
+        await local_tracer.flush()
+        await exporter.close()
+
+        assert [span["name"] for span in fake.spans] == ["span 0", "span 1"]
+
+    def test_queue_overflow_drops_spans(self):
+        local_tracer = Tracer(MemoryExporter(), batch_size=2, max_queue=2)
+
+        for span in self.spans(3):
+            local_tracer.finish(span)
+
+        assert len(local_tracer.pending) == 2
+        assert local_tracer.stats()["dropped"] == 1